@@ -3,7 +3,9 @@ import datetime
 import os
 import json
 import pandas as pd
-from utils.pricing import calculate_price
+from utils.pricing import calculate_price_cached, minimum_cleaners, MAX_WORK_DAY_HOURS
+from utils.money import percentage_of, round_money
+from utils.price_cube import get_price_from_cube
 from utils.email_service import send_customer_email, send_business_email
 from utils.data_storage import save_quote_to_csv
 from utils.database import save_quote_to_db, initialize_db
@@ -159,7 +161,7 @@ with st.form("quote_form"):
         )
     
     # Note about cleaners
-    st.info("**Note:** The number of cleaners will be determined based on your property size, service type, and additional options to ensure the job is completed within a reasonable timeframe (maximum 7.5 hour working day).")
+    st.info(f"**Note:** The number of cleaners will be determined based on your property size, service type, and additional options to ensure the job is completed within a reasonable timeframe (maximum {MAX_WORK_DAY_HOURS:g} hour working day).")
     
     # Additional Services
     st.subheader("Additional Services")
@@ -276,8 +278,8 @@ with st.form("quote_form"):
                 }
             }
             
-            # Calculate price
-            price_details = calculate_price(quote_data)
+            # Calculate price (from the precomputed cube when enabled and ready)
+            price_details = get_price_from_cube(quote_data) or calculate_price_cached(quote_data)
             quote_data["price_details"] = price_details
             
             # Initialize database
@@ -398,7 +400,7 @@ if st.session_state.form_submitted:
             else:
                 reason_text = reasons[0]
             
-            st.info(f"This job will require {price_details['cleaners_required']} cleaner{'s' if price_details['cleaners_required'] > 1 else ''} to complete within our standard working day (7.5 hours maximum per cleaner). Services like {reason_text} affect the number of cleaners needed.")
+            st.info(f"This job will require {price_details['cleaners_required']} cleaner{'s' if price_details['cleaners_required'] > 1 else ''} to complete within our standard working day ({MAX_WORK_DAY_HOURS:g} hours maximum per cleaner). Services like {reason_text} affect the number of cleaners needed.")
             
         if quote_data['service_info']['cleaning_materials']:
             st.write("**Cleaning Materials:** Included")
@@ -421,8 +423,8 @@ if st.session_state.form_submitted:
                 
                 # Calculate discounted price
                 original_price = price_details['total_price']
-                discount_amount = original_price * (discount_percentage / 100)
-                discounted_price = original_price - discount_amount
+                discount_amount = percentage_of(original_price, discount_percentage)
+                discounted_price = round_money(original_price - discount_amount)
                 
                 # Update price details
                 price_details['regular_client_discount_percentage'] = discount_percentage
@@ -441,6 +443,11 @@ if st.session_state.form_submitted:
                                            value=original_cleaners,
                                            help="Override the calculated number of cleaners")
             
+            # Warn when the override can't fit the job into a working day
+            smallest_crew = minimum_cleaners(price_details['hours_required'] * original_cleaners)
+            if custom_cleaners < smallest_crew:
+                st.warning(f"At least {smallest_crew} cleaners are needed to keep each cleaner within the {MAX_WORK_DAY_HOURS:g} hour working day.")
+            
             if custom_cleaners != original_cleaners:
                 # Adjust hours and recalculate price if needed
                 hours_per_cleaner = price_details['hours_required'] / original_cleaners
@@ -465,8 +472,8 @@ if st.session_state.form_submitted:
                 original_markup = price_details['markup']
                 
                 # Calculate new markup and total
-                new_markup = price_details['subtotal'] * (custom_markup / 100)
-                new_total = price_details['subtotal'] + new_markup
+                new_markup = percentage_of(price_details['subtotal'], custom_markup)
+                new_total = round_money(price_details['subtotal'] + new_markup)
                 
                 # Store original values and update
                 price_details['original_markup_percentage'] = original_markup_pct
@@ -476,9 +483,9 @@ if st.session_state.form_submitted:
                 
                 # If we also have a regular client discount, apply it after the new markup
                 if regular_client:
-                    discount_amount = new_total * (discount_percentage / 100)
+                    discount_amount = percentage_of(new_total, discount_percentage)
                     price_details['regular_client_discount_amount'] = discount_amount
-                    price_details['total_price'] = new_total - discount_amount
+                    price_details['total_price'] = round_money(new_total - discount_amount)
                 else:
                     price_details['total_price'] = new_total
                 
@@ -550,7 +557,7 @@ if st.session_state.form_submitted:
         # List factors affecting cleaner count
         total_labor_hours = price_details['hours_required'] * price_details['cleaners_required']
         st.write(f"- *Total job time: {total_labor_hours:.2f} hours*")
-        st.write(f"- *Maximum hours per cleaner: 7.5 hours per day*")
+        st.write(f"- *Maximum hours per cleaner: {MAX_WORK_DAY_HOURS:g} hours per day*")
         
         if is_large_property:
             st.write(f"- *Large property ({property_size})*")
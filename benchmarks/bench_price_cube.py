@@ -0,0 +1,60 @@
+"""
+Price cube benchmark
+
+Compares quote latency and memory between live calculate_price and the
+precomputed price cube (utils/price_cube.py).
+
+Run from the project root:
+    python benchmarks/bench_price_cube.py
+"""
+
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pricing import calculate_price, get_compiled_pricing, get_pricing_config_version
+from utils.price_cube import build_price_cube, save_price_cube, load_price_cube, _cube_path
+from bench_pricing import SAMPLE_QUOTE
+
+ITERATIONS = 100000
+
+def time_per_call(func):
+    """Return the best per-call time in microseconds"""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=5, number=ITERATIONS)) / ITERATIONS * 1e6
+
+def directory_size(path):
+    """Return the total size of the files in a directory"""
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def main():
+    compiled = get_compiled_pricing()
+    version = get_pricing_config_version()
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    cube = build_price_cube(compiled)
+    build_seconds = time.perf_counter() - start
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    save_price_cube(cube, version)
+    mapped_cube = load_price_cube(compiled, version)
+    
+    assert mapped_cube.lookup(SAMPLE_QUOTE) == calculate_price(SAMPLE_QUOTE)
+    
+    live_time = time_per_call(lambda: calculate_price(SAMPLE_QUOTE))
+    cube_time = time_per_call(lambda: mapped_cube.lookup(SAMPLE_QUOTE))
+    
+    print(f"Cube build:              {build_seconds * 1000:.1f} ms (peak {build_peak / 1024:.0f} KiB)")
+    print(f"Cube tables:             {cube.nbytes / 1024:.0f} KiB in memory, "
+          f"{directory_size(_cube_path(version)) / 1024:.0f} KiB on disk")
+    print(f"Live calculate_price:    {live_time:.3f} us/quote")
+    print(f"Memory-mapped cube:      {cube_time:.3f} us/quote ({live_time / cube_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Pricing micro-benchmark
+
+Compares the nested-dictionary lookups calculate_price used to do on every
+quote with the indexed loads on a CompiledPricing table, and times a full
+calculate_price call with a warm config cache.
+
+Run from the project root:
+    python benchmarks/bench_pricing.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pricing import load_pricing_config, get_compiled_pricing, calculate_price
+
+ITERATIONS = 100000
+
+SAMPLE_QUOTE = {
+    "property_info": {
+        "region": "Hertfordshire",
+        "property_size": "4 Bedroom",
+        "num_bathrooms": 2,
+        "num_reception_rooms": 2
+    },
+    "service_info": {
+        "service_type": "Deep Clean",
+        "cleanliness_level": "Somewhat Dirty",
+        "pet_status": "Small Pet (e.g., cat, small dog)",
+        "cleaning_materials": True,
+        "additional_services": {
+            "oven_clean": True,
+            "carpet_cleaning": True,
+            "carpet_rooms": 1,
+            "internal_windows": False,
+            "external_windows": False,
+            "balcony_patio": False
+        }
+    }
+}
+
+def dict_lookups(pricing_config, service_type, property_size, region, cleanliness_level, pet_status):
+    """The per-quote config walk calculate_price performed before CompiledPricing"""
+    hours = pricing_config["property_hours"][service_type][property_size]
+    cleanliness = pricing_config["cleanliness_multiplier"].get(cleanliness_level, 1.0)
+    pets = pricing_config["pet_multiplier"].get(pet_status, 1.0)
+    cleaners = pricing_config["cleaners_required"][service_type][property_size]
+    property_size_mapping = {
+        "1 Bedroom": "small",
+        "2 Bedroom": "small",
+        "3 Bedroom": "medium",
+        "4 Bedroom": "large",
+        "5+ Bedroom": "large"
+    }
+    category = property_size_mapping.get(property_size, "medium")
+    region_multiplier = pricing_config["region_multiplier"][region]
+    return hours, cleanliness, pets, cleaners, category, region_multiplier
+
+def compiled_lookups(compiled, service_type, property_size, region, cleanliness_level, pet_status):
+    """The same values read from the compiled tables"""
+    service_code = compiled.service_codes[service_type]
+    size_code = compiled.size_codes[property_size]
+    hours = compiled.base_hours(service_code, size_code)
+    cleanliness_code = compiled.cleanliness_codes.get(cleanliness_level)
+    cleanliness = 1.0 if cleanliness_code is None else compiled.cleanliness_multipliers[cleanliness_code]
+    pet_code = compiled.pet_codes.get(pet_status)
+    pets = 1.0 if pet_code is None else compiled.pet_multipliers[pet_code]
+    cleaners = compiled.default_cleaners(service_code, size_code)
+    category = compiled.size_categories[size_code]
+    region_multiplier = compiled.region_multipliers[compiled.region_codes[region]]
+    return hours, cleanliness, pets, cleaners, category, region_multiplier
+
+def time_per_call(func):
+    """Return the best per-call time in microseconds"""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=5, number=ITERATIONS)) / ITERATIONS * 1e6
+
+def main():
+    pricing_config = load_pricing_config()
+    compiled = get_compiled_pricing()
+    args = ("Deep Clean", "4 Bedroom", "Hertfordshire", "Somewhat Dirty", "Small Pet (e.g., cat, small dog)")
+    
+    dict_time = time_per_call(lambda: dict_lookups(pricing_config, *args))
+    compiled_time = time_per_call(lambda: compiled_lookups(compiled, *args))
+    quote_time = time_per_call(lambda: calculate_price(SAMPLE_QUOTE))
+    
+    print(f"Nested dict lookups:     {dict_time:.3f} us/quote")
+    print(f"Compiled table lookups:  {compiled_time:.3f} us/quote ({dict_time / compiled_time:.2f}x)")
+    print(f"calculate_price (warm):  {quote_time:.3f} us/quote")
+
+if __name__ == "__main__":
+    main()
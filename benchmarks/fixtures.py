@@ -0,0 +1,130 @@
+"""
+Synthetic quote data for the benchmark suite
+
+Builds realistic quote_data dictionaries and flat quotes-table frames
+without needing a database, email service or the Streamlit app.
+"""
+
+import datetime
+import numpy as np
+import pandas as pd
+from utils.pricing import get_compiled_pricing
+from utils.batch_pricing import calculate_prices_batch
+
+# Column order of data/quotes.csv (see utils.data_storage.initialize_csv_if_needed)
+CSV_COLUMNS = [
+    "quote_id", "timestamp", "status", "admin_created", "sent_to_customer",
+    "customer_name", "customer_email", "customer_phone", "customer_address", "customer_postcode",
+    "referral_source", "referral_other",
+    "region", "property_size", "num_bathrooms", "num_reception_rooms",
+    "service_type", "cleaning_date", "time_preference", "cleanliness_level", "pet_status", "cleaner_preference", "customer_notes",
+    "oven_clean", "carpet_cleaning", "carpet_rooms", "internal_windows", "external_windows", "balcony_patio", "cleaning_materials",
+    "base_price", "extra_bathrooms_cost", "extra_reception_cost", "additional_services_cost", "materials_cost",
+    "subtotal", "markup_percentage", "markup", "total_price",
+    "hourly_rate", "hours_required", "cleaners_required", "region_multiplier",
+    "admin_notes", "regular_client_discount_percentage", "regular_client_discount_amount",
+    "original_price", "original_cleaners", "original_hours", "original_markup_percentage", "original_markup"
+]
+
+STATUSES = ["Enquiry", "Quoted", "Schedule Requested", "Scheduled", "Completed", "Cancelled"]
+REFERRAL_SOURCES = ["Google", "Facebook", "Word of Mouth", "Family/Friend Recommendation", "Other", "Please select..."]
+
+def make_quote_data(index=0):
+    """Return a nested quote_data dict as built by app.py, with price details"""
+    from utils.pricing import calculate_price
+
+    compiled = get_compiled_pricing()
+    quote_data = {
+        "quote_id": f"QBENCH{index:08d}",
+        "status": "Enquiry",
+        "admin_created": False,
+        "sent_to_customer": False,
+        "customer_info": {
+            "name": f"Customer {index}",
+            "email": f"customer{index}@example.com",
+            "phone": "07700 900000",
+            "address": f"{index} High Street",
+            "postcode": "MK40 1AA",
+            "referral_source": "Google",
+            "referral_other": ""
+        },
+        "property_info": {
+            "region": compiled.regions[index % len(compiled.regions)],
+            "property_size": compiled.property_sizes[index % len(compiled.property_sizes)],
+            "num_bathrooms": 1 + index % 3,
+            "num_reception_rooms": 1 + index % 2
+        },
+        "service_info": {
+            "service_type": compiled.service_types[index % len(compiled.service_types)],
+            "cleaning_date": "01/06/2025",
+            "cleanliness_level": "Normal",
+            "pet_status": "No Pets",
+            "cleaner_preference": "No Preference",
+            "customer_notes": "Please use the side gate.",
+            "additional_services": {
+                "oven_clean": index % 2 == 0,
+                "carpet_cleaning": index % 3 == 0,
+                "carpet_rooms": 1 if index % 3 == 0 else 0,
+                "internal_windows": index % 4 == 0,
+                "external_windows": False,
+                "balcony_patio": index % 5 == 0
+            },
+            "cleaning_materials": index % 2 == 1
+        }
+    }
+    quote_data["price_details"] = calculate_price(quote_data)
+    return quote_data
+
+def make_quotes_frame(num_rows, seed=0):
+    """Return a flat quotes-table DataFrame with num_rows priced synthetic quotes"""
+    compiled = get_compiled_pricing()
+    rng = np.random.default_rng(seed)
+
+    def pick(options):
+        return np.asarray(options, dtype=object)[rng.integers(0, len(options), num_rows)]
+
+    start = datetime.datetime(2023, 1, 1)
+    seconds = np.sort(rng.integers(0, 3 * 365 * 24 * 3600, num_rows))
+    ids = np.arange(num_rows)
+
+    df = pd.DataFrame({
+        "quote_id": [f"Q{1672531200 + i:010d}" for i in ids],
+        "timestamp": pd.to_datetime(start) + pd.to_timedelta(seconds, unit="s"),
+        "status": pick(STATUSES),
+        "admin_created": rng.random(num_rows) < 0.3,
+        "sent_to_customer": rng.random(num_rows) < 0.5,
+        "customer_name": [f"Customer {i}" for i in ids],
+        "customer_email": [f"customer{i}@example.com" for i in ids],
+        "customer_phone": "07700 900000",
+        "customer_address": [f"{i} High Street" for i in ids],
+        "customer_postcode": "MK40 1AA",
+        "referral_source": pick(REFERRAL_SOURCES),
+        "referral_other": "",
+        "region": pick(compiled.regions),
+        "property_size": pick(compiled.property_sizes),
+        "num_bathrooms": rng.integers(1, 4, num_rows),
+        "num_reception_rooms": rng.integers(1, 3, num_rows),
+        "service_type": pick(compiled.service_types),
+        "cleaning_date": "2025-06-01",
+        "time_preference": "Morning (8am-12pm)",
+        "cleanliness_level": pick(compiled.cleanliness_levels),
+        "pet_status": pick(compiled.pet_statuses),
+        "cleaner_preference": "No Preference",
+        "customer_notes": "Please use the side gate and ring the bell on arrival.",
+        "oven_clean": rng.random(num_rows) < 0.3,
+        "carpet_cleaning": rng.random(num_rows) < 0.2,
+        "internal_windows": rng.random(num_rows) < 0.3,
+        "external_windows": False,
+        "balcony_patio": rng.random(num_rows) < 0.1,
+        "cleaning_materials": rng.random(num_rows) < 0.5,
+    })
+    df["carpet_rooms"] = df["carpet_cleaning"].astype(int)
+
+    prices = calculate_prices_batch(df)
+    for column in prices.columns:
+        df[column] = prices[column]
+
+    for column in CSV_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+    return df[CSV_COLUMNS]
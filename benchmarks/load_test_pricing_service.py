@@ -0,0 +1,141 @@
+"""
+Load test for pricing_service.py
+
+Starts the service in a subprocess on a free local port, then drives it
+with keep-alive asyncio clients for a fixed time and reports throughput
+and latency for single-quote and batch requests. Nothing external is
+needed.
+
+Usage (from the project root):
+    python benchmarks/load_test_pricing_service.py
+    python benchmarks/load_test_pricing_service.py --connections 32 --duration 10 --batch-size 100
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from bench_pricing import SAMPLE_QUOTE
+
+def free_port():
+    """Return a local TCP port nobody is listening on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def build_request(path, payload, port):
+    """Return the raw bytes of a keep-alive JSON POST"""
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: 127.0.0.1:{port}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"\r\n"
+    )
+    return head.encode("latin-1") + body
+
+async def read_response(reader):
+    """Read one response and return (status, body bytes)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+async def client(port, request, deadline, latencies, errors):
+    """Send requests back to back on one keep-alive connection until the deadline"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run_load(port, request, connections, duration):
+    """Run connections concurrent clients and return (latencies, errors, elapsed)"""
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(port, request, deadline, latencies, errors) for _ in range(connections)))
+    return latencies, errors, time.perf_counter() - start
+
+def report(label, latencies, errors, elapsed, quotes_per_request=1):
+    """Print throughput and latency percentiles"""
+    if not latencies:
+        print(f"{label}: no requests completed")
+        return
+    latencies = sorted(latencies)
+    requests_per_second = len(latencies) / elapsed
+    print(f"{label}:")
+    print(f"  requests        {len(latencies)} ({len(errors)} errors)")
+    print(f"  requests/sec    {requests_per_second:,.0f}")
+    print(f"  quotes/sec      {requests_per_second * quotes_per_request:,.0f}")
+    print(f"  latency p50     {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"  latency p99     {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+
+def wait_until_ready(port, timeout=15):
+    """Poll /health until the service answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as sock:
+                sock.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+                if sock.recv(64).startswith(b"HTTP/1.1 200"):
+                    return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the quote pricing HTTP service")
+    parser.add_argument("--connections", type=int, default=16, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--batch-size", type=int, default=100, help="quotes per /quotes request")
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ, PRICING_SERVICE_API_KEY="")
+    service = subprocess.Popen(
+        [sys.executable, os.path.join(PROJECT_ROOT, "pricing_service.py"), "--port", str(port)],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        if not wait_until_ready(port):
+            print("Pricing service did not start")
+            return 1
+
+        single = build_request("/quote", SAMPLE_QUOTE, port)
+        latencies, errors, elapsed = asyncio.run(run_load(port, single, args.connections, args.duration))
+        report(f"POST /quote x {args.connections} connections", latencies, errors, elapsed)
+
+        batch = build_request("/quotes", {"quotes": [SAMPLE_QUOTE] * args.batch_size}, port)
+        latencies, errors, elapsed = asyncio.run(run_load(port, batch, args.connections, args.duration))
+        report(f"POST /quotes ({args.batch_size} per request) x {args.connections} connections",
+               latencies, errors, elapsed, args.batch_size)
+    finally:
+        service.terminate()
+        service.wait()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,596 @@
+"""
+Pricing and storage benchmark suite
+
+Runs fully offline: every benchmark works in a throwaway directory with
+its own copy of the config, a local data/quotes.csv and the embedded
+SQLite backend (DATABASE_BACKEND=sqlite), so nothing touches the real data
+or sends email.
+
+The backends benchmark also runs against Postgres when
+BENCHMARK_POSTGRES_URL points at a scratch database. Its quotes tables
+are dropped and reloaded, so never point it at real data.
+
+Results are written as JSON (benchmarks/results/latest.json by default).
+Every tracked metric is then compared against the baseline and the run
+exits with status 1 when one is slower than the allowed threshold. A
+missing baseline is an error too, unless --allow-missing-baseline is
+given; baselines are machine-specific, so record one with
+--update-baseline on the machine that runs the comparison.
+
+Usage (from the project root):
+    python benchmarks/run_benchmarks.py                      # run and compare
+    python benchmarks/run_benchmarks.py --sizes 1000,100000  # smaller CSV/DB tables
+    python benchmarks/run_benchmarks.py --only csv,db        # subset by name
+    python benchmarks/run_benchmarks.py --update-baseline    # accept current numbers
+    python benchmarks/run_benchmarks.py --allow-missing-baseline  # just record results
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.join(PROJECT_ROOT, "benchmarks")
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, BENCHMARK_DIR)
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_RESULTS_PATH = os.path.join(BENCHMARK_DIR, "results", "latest.json")
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+def measure(func, repeat=5, number=1):
+    """Time func and return min/median milliseconds per call"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number * 1000)
+    return {
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "runs": repeat * number
+    }
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the debug prints the app code emits"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def repeat_for(num_rows):
+    """Use fewer repetitions for the big tables"""
+    return 5 if num_rows <= 100000 else 2
+
+# ---------------------------------------------------------------------------
+# Benchmarks. Each takes the run context and returns {metric: timing}.
+# ---------------------------------------------------------------------------
+
+def bench_pricing(ctx):
+    """calculate_price with a cold and a warm config cache"""
+    from utils.pricing import calculate_price, invalidate_pricing_config_cache
+    from fixtures import make_quote_data
+
+    quote_data = make_quote_data(1)
+
+    def cold():
+        invalidate_pricing_config_cache()
+        calculate_price(quote_data)
+
+    calculate_price(quote_data)
+    return {
+        "calculate_price.cold": measure(cold, repeat=5, number=200),
+        "calculate_price.warm": measure(lambda: calculate_price(quote_data), repeat=5, number=5000)
+    }
+
+def bench_batch(ctx):
+    """calculate_prices_batch over tables of each size"""
+    from utils.batch_pricing import calculate_prices_batch
+
+    return {
+        f"calculate_prices_batch.rows_{num_rows}": measure(
+            lambda: calculate_prices_batch(ctx.quotes_frame(num_rows)), repeat=repeat_for(num_rows))
+        for num_rows in ctx.sizes
+    }
+
+def bench_db_format(ctx):
+    """quote_data_to_db_format flattening"""
+    from utils.database import quote_data_to_db_format
+    from fixtures import make_quote_data
+
+    quote_data = make_quote_data(2)
+    return {
+        "quote_data_to_db_format": measure(lambda: quote_data_to_db_format(quote_data), repeat=5, number=5000)
+    }
+
+def bench_email(ctx):
+    """HTML generation for the customer and business emails"""
+    from utils.email_service import create_customer_email_content, create_business_email_content
+    from fixtures import make_quote_data
+
+    # No carpet cleaning: the business email looks up a "carpet_cleaning" cost key
+    # that the pricing config doesn't define
+    quote_data = make_quote_data(4)
+    with quiet():
+        return {
+            "email.customer_html": measure(lambda: create_customer_email_content(quote_data), repeat=5, number=200),
+            "email.business_html": measure(lambda: create_business_email_content(quote_data), repeat=5, number=200)
+        }
+
+def bench_quote_ids(ctx):
+    """generate_quote_id one at a time, and generate_quote_ids for a bulk import"""
+    from utils.quote_ids import generate_quote_id, generate_quote_ids
+
+    return {
+        "generate_quote_id": measure(generate_quote_id, repeat=5, number=100000),
+        "generate_quote_ids.1000000": measure(lambda: generate_quote_ids(1000000), repeat=3)
+    }
+
+def bench_csv(ctx):
+    """save_quote_to_csv / update_csv_field against tables of each size, and folding 1,000 edits into the CSV"""
+    from utils.data_storage import save_quote_to_csv, update_csv_field, compact_quote_events, get_event_log_path
+    from fixtures import make_quote_data
+
+    results = {}
+    csv_path = os.path.join("data", "quotes.csv")
+    for num_rows in ctx.sizes:
+        ctx.quotes_frame(num_rows).to_csv(csv_path, index=False)
+        for path in (get_event_log_path(), get_event_log_path() + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+        counter = iter(range(10 ** 9))
+
+        def append_new():
+            quote_data = make_quote_data(next(counter))
+            quote_data["quote_id"] = f"QNEW{next(counter):09d}"
+            save_quote_to_csv(quote_data)
+
+        existing = make_quote_data(4)
+        existing["quote_id"] = ctx.quotes_frame(num_rows)["quote_id"].iloc[num_rows // 2]
+
+        with quiet():
+            results[f"save_quote_to_csv.append.rows_{num_rows}"] = measure(append_new, repeat=repeat_for(num_rows))
+            results[f"save_quote_to_csv.update.rows_{num_rows}"] = measure(
+                lambda: save_quote_to_csv(existing), repeat=repeat_for(num_rows))
+            results[f"update_csv_field.rows_{num_rows}"] = measure(
+                lambda: update_csv_field(existing["quote_id"], "cleaning_date", "01/07/2025"),
+                repeat=repeat_for(num_rows))
+
+            def compact_after_edits():
+                for index in range(1000):
+                    update_csv_field(existing["quote_id"], "admin_notes", f"Edit {index}")
+                compact_quote_events()
+
+            results[f"compact_quote_events.1000_edits.rows_{num_rows}"] = measure(compact_after_edits, repeat=2)
+    return results
+
+def bench_csv_lookup(ctx):
+    """Finding a quote through the sidecar index (as every update does) vs a pandas full scan, and building the index"""
+    import pandas as pd
+    from utils.csv_index import load_csv_index, index_path_for
+    from utils.data_storage import _csv_quote_exists, get_event_log_path
+
+    results = {}
+    csv_path = os.path.join("data", "quotes.csv")
+    for num_rows in ctx.sizes:
+        frame = ctx.quotes_frame(num_rows)
+        frame.to_csv(csv_path, index=False)
+        for path in (index_path_for(csv_path), get_event_log_path(), get_event_log_path() + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+        quote_ids = frame["quote_id"].iloc[::max(1, num_rows // 100)].tolist()
+
+        def full_scan(quote_id):
+            quotes = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+            return (quotes["quote_id"] == quote_id).any()
+
+        # tests/test_csv_index.py checks the index against a full scan
+        results[f"csv_index.build.rows_{num_rows}"] = measure(lambda: load_csv_index(csv_path), repeat=1)
+
+        lookups = iter(quote_ids * 1000)
+        with quiet():
+            results[f"csv_quote_exists.rows_{num_rows}"] = measure(
+                lambda: _csv_quote_exists(next(lookups)), repeat=5, number=20)
+            results[f"full_scan_lookup.rows_{num_rows}"] = measure(
+                lambda: full_scan(quote_ids[0]), repeat=repeat_for(num_rows))
+    return results
+
+def bench_parquet(ctx):
+    """get_quotes_dataframe from quotes.csv vs the Parquet dataset (whole table, and 4 columns of one month)"""
+    from utils.data_storage import get_quotes_dataframe, _csv_quote_exists, get_parquet_path, get_event_log_path
+    from utils.parquet_store import dataset_size
+
+    results = {}
+    csv_path = os.path.join("data", "quotes.csv")
+    columns = ["quote_id", "timestamp", "status", "total_price"]
+    try:
+        for num_rows in ctx.sizes:
+            frame = ctx.quotes_frame(num_rows)
+            frame.to_csv(csv_path, index=False)
+            for path in (get_event_log_path(), get_event_log_path() + ".idx"):
+                if os.path.exists(path):
+                    os.remove(path)
+            shutil.rmtree(get_parquet_path(), ignore_errors=True)
+            month_start = frame["timestamp"].max().normalize().replace(day=1)
+            month = {"start_date": month_start, "end_date": month_start + datetime.timedelta(days=32)}
+            sizes_mb = {
+                "csv": os.path.getsize(csv_path) / 1024 ** 2
+            }
+
+            with quiet():
+                os.environ["QUOTE_STORE_BACKEND"] = "csv"
+                results[f"quotes_load.csv.rows_{num_rows}"] = measure(get_quotes_dataframe, repeat=repeat_for(num_rows))
+                results[f"quotes_load.csv.month_4_columns.rows_{num_rows}"] = measure(
+                    lambda: get_quotes_dataframe(columns, **month), repeat=repeat_for(num_rows))
+
+                os.environ["QUOTE_STORE_BACKEND"] = "parquet"
+                # The first read converts quotes.csv into the dataset
+                _csv_quote_exists(frame["quote_id"].iloc[0])
+                sizes_mb["parquet"] = dataset_size(get_parquet_path()) / 1024 ** 2
+                results[f"quotes_load.parquet.rows_{num_rows}"] = measure(get_quotes_dataframe, repeat=repeat_for(num_rows))
+                results[f"quotes_load.parquet.month_4_columns.rows_{num_rows}"] = measure(
+                    lambda: get_quotes_dataframe(columns, **month), repeat=repeat_for(num_rows))
+                results[f"csv_quote_exists.parquet.rows_{num_rows}"] = measure(
+                    lambda: _csv_quote_exists(frame["quote_id"].iloc[num_rows // 2]), repeat=5, number=5)
+
+            for backend, size_mb in sizes_mb.items():
+                results[f"quotes_load.{backend}.rows_{num_rows}"]["file_mb"] = size_mb
+    finally:
+        os.environ.pop("QUOTE_STORE_BACKEND", None)
+    return results
+
+def bench_db(ctx):
+    """get_quotes_from_db against a SQLite database of each size"""
+    from utils.database import get_quotes_from_db
+
+    results = {}
+    for num_rows in ctx.sizes:
+        ctx.use_sqlite_database(num_rows)
+        with quiet():
+            results[f"get_quotes_from_db.rows_{num_rows}"] = measure(get_quotes_from_db, repeat=repeat_for(num_rows))
+    return results
+
+# Same projection as QUOTE_LIST_COLUMNS in pages/view_quotes.py
+LIST_VIEW_COLUMNS = [
+    "quote_id", "timestamp", "status", "admin_created", "sent_to_customer",
+    "customer_name", "customer_email", "customer_phone", "customer_address", "customer_postcode",
+    "referral_source", "referral_other",
+    "property_size", "region", "num_bathrooms", "num_reception_rooms",
+    "service_type", "cleaning_date", "cleanliness_level", "pet_status", "cleaner_preference",
+    "oven_clean", "carpet_cleaning", "carpet_rooms", "internal_windows",
+    "external_windows", "balcony_patio", "cleaning_materials",
+    "hours_required", "cleaners_required", "total_price"
+]
+
+def bench_db_projection(ctx):
+    """Full-row load vs the list-view projection with categoricals (time and DataFrame memory)"""
+    from utils.database import get_quotes_from_db
+
+    variants = {
+        "all_columns": {},
+        "list_columns": {"columns": LIST_VIEW_COLUMNS},
+        "list_columns_categorical": {"columns": LIST_VIEW_COLUMNS, "categorical": True},
+    }
+    results = {}
+    for num_rows in ctx.sizes:
+        ctx.use_sqlite_database(num_rows)
+        for name, kwargs in variants.items():
+            with quiet():
+                timing = measure(lambda: get_quotes_from_db(**kwargs), repeat=repeat_for(num_rows))
+                timing["memory_mb"] = get_quotes_from_db(**kwargs).memory_usage(deep=True).sum() / 2 ** 20
+            results[f"get_quotes_from_db.{name}.rows_{num_rows}"] = timing
+    return results
+
+def bench_db_save(ctx):
+    """save_quote_to_db inserting new quotes and re-saving existing ones against a SQLite database"""
+    from utils.database import save_quote_to_db
+    from fixtures import make_quote_data
+
+    results = {}
+    for num_rows in ctx.sizes:
+        ctx.use_sqlite_database(num_rows)
+        counter = iter(range(10 ** 9))
+
+        def insert_new():
+            quote_data = make_quote_data(4)
+            quote_data["quote_id"] = f"QSAVE{num_rows}_{next(counter):09d}"
+            save_quote_to_db(quote_data)
+
+        existing = make_quote_data(4)
+        existing["quote_id"] = ctx.quotes_frame(num_rows)["quote_id"].iloc[num_rows // 2]
+
+        with quiet():
+            results[f"save_quote_to_db.insert.rows_{num_rows}"] = measure(insert_new, repeat=5, number=20)
+            results[f"save_quote_to_db.update.rows_{num_rows}"] = measure(
+                lambda: save_quote_to_db(existing), repeat=5, number=20)
+    return results
+
+def bench_db_lookup(ctx):
+    """get_quote_by_id uncached (a database round trip) and from its TTL cache"""
+    from utils.database import get_quote_by_id, invalidate_quote_cache
+
+    results = {}
+    for num_rows in ctx.sizes:
+        ctx.use_sqlite_database(num_rows)
+        quote_id = ctx.quotes_frame(num_rows)["quote_id"].iloc[num_rows // 2]
+
+        def uncached():
+            invalidate_quote_cache(quote_id)
+            get_quote_by_id(quote_id)
+
+        results[f"get_quote_by_id.uncached.rows_{num_rows}"] = measure(uncached, repeat=5, number=100)
+        get_quote_by_id(quote_id)
+        results[f"get_quote_by_id.cached.rows_{num_rows}"] = measure(
+            lambda: get_quote_by_id(quote_id), repeat=5, number=1000)
+    return results
+
+def bench_dashboard(ctx):
+    """Every aggregate the dashboard shows on load, unfiltered: rollup-backed figures and referral figures"""
+    from utils import analytics
+
+    def rollup_figures(filters):
+        analytics.get_summary_metrics(filters)
+        analytics.get_revenue_by_period("Daily", filters)
+        analytics.get_breakdown("region", filters)
+        analytics.get_breakdown("service_type", filters)
+        analytics.get_addon_counts(filters)
+
+    def referral_figures(filters):
+        analytics.get_breakdown("referral_source", filters)
+        analytics.get_other_referrals(filters)
+
+    results = {}
+    for num_rows in ctx.sizes:
+        ctx.use_sqlite_database(num_rows)
+        filters = analytics.dashboard_filters(*analytics.get_quote_date_range())
+        results[f"dashboard_rollup.rows_{num_rows}"] = measure(
+            lambda: rollup_figures(filters), repeat=repeat_for(num_rows))
+        results[f"dashboard_referrals.rows_{num_rows}"] = measure(
+            lambda: referral_figures(filters), repeat=repeat_for(num_rows))
+    return results
+
+def bench_backends(ctx):
+    """Read and write throughput of the SQLite (WAL) backend, and Postgres if BENCHMARK_POSTGRES_URL is set"""
+    import threading
+    from utils.database import get_quotes_from_db, get_quote_by_id, invalidate_quote_cache, save_quote_to_db
+    from fixtures import make_quote_data
+
+    backends = [("sqlite", ctx.use_sqlite_database)]
+    if os.getenv("BENCHMARK_POSTGRES_URL"):
+        backends.append(("postgres", ctx.use_postgres_database))
+    else:
+        print("  (set BENCHMARK_POSTGRES_URL to a scratch database to compare with Postgres)")
+
+    results = {}
+    for num_rows in ctx.sizes:
+        for backend, use_database in backends:
+            use_database(num_rows)
+            counter = iter(range(10 ** 9))
+            quote_ids = ctx.quotes_frame(num_rows)["quote_id"]
+
+            def read_page():
+                get_quotes_from_db(filters={"status": "Scheduled"}, limit=50)
+
+            def read_quote():
+                quote_id = quote_ids.iloc[next(counter) % num_rows]
+                invalidate_quote_cache(quote_id)
+                get_quote_by_id(quote_id)
+
+            def write_quote():
+                quote_data = make_quote_data(4)
+                quote_data["quote_id"] = f"QBACKEND{num_rows}_{next(counter):09d}"
+                save_quote_to_db(quote_data)
+
+            def write_concurrently(threads=4, per_thread=10):
+                workers = [threading.Thread(target=lambda: [write_quote() for _ in range(per_thread)])
+                           for _ in range(threads)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+
+            prefix = f"{backend}.rows_{num_rows}"
+            with quiet():
+                results[f"{prefix}.read_page"] = measure(read_page, repeat=5, number=20)
+                results[f"{prefix}.read_quote"] = measure(read_quote, repeat=5, number=100)
+                results[f"{prefix}.write_quote"] = measure(write_quote, repeat=5, number=20)
+                # 40 quotes saved by 4 sessions at once, reported per quote
+                timing = measure(write_concurrently, repeat=3)
+                timing["min_ms"] /= 40
+                timing["median_ms"] /= 40
+                results[f"{prefix}.write_quote_4_sessions"] = timing
+    return results
+
+def bench_repricing(ctx):
+    """simulate_repricing with a 10% hourly rate rise against a SQLite database of each size"""
+    from utils.pricing import load_pricing_config
+    from utils.repricing import simulate_repricing
+
+    candidate_config = dict(load_pricing_config())
+    candidate_config["hourly_rate"] = candidate_config["hourly_rate"] * 1.1
+
+    results = {}
+    for num_rows in ctx.sizes:
+        ctx.use_sqlite_database(num_rows)
+        results[f"simulate_repricing.rows_{num_rows}"] = measure(
+            lambda: simulate_repricing(candidate_config), repeat=repeat_for(num_rows))
+    return results
+
+BENCHMARKS = {
+    "pricing": bench_pricing,
+    "batch": bench_batch,
+    "db_format": bench_db_format,
+    "email": bench_email,
+    "quote_ids": bench_quote_ids,
+    "csv": bench_csv,
+    "csv_lookup": bench_csv_lookup,
+    "parquet": bench_parquet,
+    "db": bench_db,
+    "db_save": bench_db_save,
+    "db_projection": bench_db_projection,
+    "db_lookup": bench_db_lookup,
+    "dashboard": bench_dashboard,
+    "backends": bench_backends,
+    "repricing": bench_repricing,
+}
+
+class BenchmarkContext:
+    """Shared state for one run: table sizes and cached fixture data"""
+
+    def __init__(self, sizes, workdir):
+        self.sizes = sizes
+        self.workdir = workdir
+        self._frames = {}
+        self._databases = {}
+
+    def quotes_frame(self, num_rows):
+        """Return (and cache) a synthetic quotes table with num_rows rows"""
+        from fixtures import make_quotes_frame
+
+        if num_rows not in self._frames:
+            self._frames[num_rows] = make_quotes_frame(num_rows)
+        return self._frames[num_rows]
+
+    def use_sqlite_database(self, num_rows):
+        """Point DATABASE_URL at a SQLite file holding num_rows quotes"""
+        from sqlalchemy import create_engine
+        from utils.database import Base
+
+        path = os.path.join(self.workdir, f"quotes_{num_rows}.db")
+        os.environ["ENV"] = "development"
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_DB_PATH"] = path
+        if num_rows not in self._databases:
+            engine = create_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(engine)
+            self.quotes_frame(num_rows).to_sql("quotes", engine, if_exists="append", index=False, chunksize=50000)
+            engine.dispose()
+            self._databases[num_rows] = path
+        return path
+
+    def use_postgres_database(self, num_rows):
+        """Reload BENCHMARK_POSTGRES_URL with num_rows quotes and point the app at it (None if unset)"""
+        from sqlalchemy import create_engine
+        from utils.database import Base, dispose_db_engines
+
+        url = os.getenv("BENCHMARK_POSTGRES_URL")
+        if not url:
+            return None
+        os.environ["ENV"] = "development"
+        os.environ["DATABASE_BACKEND"] = "postgres"
+        os.environ["DATABASE_URL"] = url
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.quotes_frame(num_rows).to_sql("quotes", engine, if_exists="append", index=False, chunksize=50000)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE quotes")
+        engine.dispose()
+        # Reconnect so the migrations (and the rollup backfill) run against the new data
+        dispose_db_engines()
+        return url
+
+def compare_to_baseline(results, baseline, threshold):
+    """Return a list of (metric, baseline_ms, current_ms) that regressed past threshold"""
+    regressions = []
+    for metric, timing in results.items():
+        previous = baseline.get(metric)
+        if previous is None:
+            continue
+        if timing["median_ms"] > previous["median_ms"] * (1 + threshold):
+            regressions.append((metric, previous["median_ms"], timing["median_ms"]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the quote calculator benchmark suite")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated table sizes for the CSV and database benchmarks")
+    parser.add_argument("--only", default="", help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH, help="where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a metric counts as a regression (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        help="exit 0 without a regression check when there is no baseline")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    selected = [name for name in args.only.split(",") if name] or list(BENCHMARKS)
+    output_path = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline)
+
+    workdir = tempfile.mkdtemp(prefix="kmi_bench_")
+    original_cwd = os.getcwd()
+    results = {}
+    try:
+        # Run against a private copy of the pricing config with its own data directory
+        # (the app config is left to utils.config's defaults)
+        os.makedirs(os.path.join(workdir, "config"))
+        os.makedirs(os.path.join(workdir, "data"))
+        shutil.copy(os.path.join(PROJECT_ROOT, "config", "pricing_config.json"), os.path.join(workdir, "config"))
+        os.chdir(workdir)
+
+        ctx = BenchmarkContext(sizes, workdir)
+        for name in selected:
+            print(f"Running {name}...")
+            for metric, timing in BENCHMARKS[name](ctx).items():
+                results[metric] = timing
+                memory = f", {timing['memory_mb']:.1f} MB" if "memory_mb" in timing else ""
+                memory += f", {timing['file_mb']:.1f} MB on disk" if "file_mb" in timing else ""
+                print(f"  {metric:<60} {timing['median_ms']:>12.4f} ms (min {timing['min_ms']:.4f}{memory})")
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes
+        },
+        "results": results
+    }
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"Results written to {output_path}")
+
+    if args.update_baseline:
+        with open(baseline_path, "w") as file:
+            json.dump(report, file, indent=4)
+        print(f"Baseline updated at {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        if args.allow_missing_baseline:
+            print("No baseline found; skipping regression check")
+            return 0
+        print(f"No baseline at {baseline_path}; record one with --update-baseline "
+              "(or pass --allow-missing-baseline to skip the regression check)")
+        return 1
+
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)["results"]
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}:")
+        for metric, previous, current in regressions:
+            print(f"  {metric}: {previous:.4f} ms -> {current:.4f} ms")
+        return 1
+    print("No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
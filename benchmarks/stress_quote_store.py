@@ -0,0 +1,164 @@
+"""
+Multi-process stress test for the quote store (utils/data_storage.py)
+
+Starts several writer processes that save quotes and edit them while
+reading back, plus a "cron" process compacting the event log as
+cron_backup.py does. The event log limit is kept small so background
+compactions run too. At the end every quote must be present exactly once
+with its last status and note; the run exits with status 1 otherwise.
+Works in a throwaway directory.
+
+Usage (from the project root):
+    python benchmarks/stress_quote_store.py
+    python benchmarks/stress_quote_store.py --processes 8 --quotes 500 --backend parquet
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.join(PROJECT_ROOT, "benchmarks")
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, BENCHMARK_DIR)
+
+STATUSES = ["Quoted", "Schedule Requested", "Scheduled", "Completed"]
+
+def writer(workdir, worker, num_quotes, num_edits, seed):
+    """Save num_quotes quotes, then edit them at random; return ({quote_id: (status, note)}, failed updates)"""
+    os.chdir(workdir)
+    from fixtures import make_quote_data
+    from utils.data_storage import save_quote_to_csv, update_csv_status, update_csv_field
+
+    rng = random.Random(seed)
+    expected = {}
+    errors = 0
+    for index in range(num_quotes):
+        quote_data = make_quote_data(index)
+        quote_data["quote_id"] = f"QSTRESS{worker:02d}{index:06d}"
+        save_quote_to_csv(quote_data)
+        expected[quote_data["quote_id"]] = (quote_data["status"], "")
+
+    quote_ids = list(expected)
+    for edit in range(num_edits):
+        quote_id = rng.choice(quote_ids)
+        status, note = expected[quote_id]
+        if rng.random() < 0.5:
+            status = rng.choice(STATUSES)
+            ok = update_csv_status(quote_id, status)
+        else:
+            note = f"worker {worker} edit {edit}"
+            ok = update_csv_field(quote_id, "admin_notes", note)
+        if not ok:
+            errors += 1
+            continue
+        expected[quote_id] = (status, note)
+    return expected, errors
+
+def compactor(workdir, stop, interval):
+    """Compact the event log every interval seconds until stop is set; return how many events were folded in"""
+    os.chdir(workdir)
+    from utils.data_storage import compact_quote_events
+
+    folded = 0
+    while not stop.is_set():
+        folded += compact_quote_events()
+        time.sleep(interval)
+    return folded
+
+def check(workdir, expected):
+    """Return a list of problems with the final store"""
+    os.chdir(workdir)
+    from utils.data_storage import compact_quote_events, get_quotes_dataframe
+
+    compact_quote_events()
+    quotes = get_quotes_dataframe()
+    problems = []
+    duplicated = quotes["quote_id"][quotes["quote_id"].duplicated()].tolist()
+    if duplicated:
+        problems.append(f"{len(duplicated)} duplicated quote(s), e.g. {duplicated[:3]}")
+    missing = set(expected) - set(quotes["quote_id"])
+    if missing:
+        problems.append(f"{len(missing)} lost quote(s), e.g. {sorted(missing)[:3]}")
+    unexpected = set(quotes["quote_id"]) - set(expected)
+    if unexpected:
+        problems.append(f"{len(unexpected)} unexpected quote(s), e.g. {sorted(unexpected)[:3]}")
+
+    stored = quotes.drop_duplicates("quote_id").set_index("quote_id")
+    lost_edits = []
+    for quote_id, (status, note) in expected.items():
+        if quote_id not in stored.index:
+            continue
+        stored_note = stored.at[quote_id, "admin_notes"]
+        stored_note = "" if stored_note is None or stored_note != stored_note else str(stored_note)
+        if (stored.at[quote_id, "status"], stored_note) != (status, note):
+            lost_edits.append(quote_id)
+    if lost_edits:
+        problems.append(f"{len(lost_edits)} quote(s) lost their last edit, e.g. {lost_edits[:3]}")
+    return problems, len(quotes)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress the quote store with concurrent writer processes")
+    parser.add_argument("--processes", type=int, default=4, help="writer processes")
+    parser.add_argument("--quotes", type=int, default=200, help="quotes saved by each writer")
+    parser.add_argument("--edits", type=int, default=400, help="status/note edits made by each writer")
+    parser.add_argument("--backend", choices=["csv", "parquet"], default="csv", help="QUOTE_STORE_BACKEND to test")
+    parser.add_argument("--log-max-bytes", type=int, default=64 * 1024,
+                        help="QUOTE_EVENT_LOG_MAX_BYTES (small, so writers trigger background compactions)")
+    parser.add_argument("--compact-interval", type=float, default=0.5, help="seconds between cron-style compactions")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="kmi_stress_")
+    os.makedirs(os.path.join(workdir, "config"))
+    os.makedirs(os.path.join(workdir, "data"))
+    shutil.copy(os.path.join(PROJECT_ROOT, "config", "pricing_config.json"), os.path.join(workdir, "config"))
+    os.environ["QUOTE_STORE_BACKEND"] = args.backend
+    os.environ["QUOTE_EVENT_LOG_MAX_BYTES"] = str(args.log_max_bytes)
+
+    # Fresh interpreters, as separate server processes would be
+    context = multiprocessing.get_context("spawn")
+    try:
+        start = time.perf_counter()
+        with context.Pool(args.processes + 1) as pool:
+            stop = context.Manager().Event()
+            cron = pool.apply_async(compactor, (workdir, stop, args.compact_interval))
+            writers = [
+                pool.apply_async(writer, (workdir, worker, args.quotes, args.edits, worker))
+                for worker in range(args.processes)
+            ]
+            expected = {}
+            errors = 0
+            for result in writers:
+                quotes, worker_errors = result.get()
+                expected.update(quotes)
+                errors += worker_errors
+            stop.set()
+            folded = cron.get()
+        elapsed = time.perf_counter() - start
+
+        problems, stored = check(workdir, expected)
+        if errors:
+            problems.append(f"{errors} failed update(s) in the writers")
+        operations = args.processes * (args.quotes + args.edits)
+        print(f"{args.processes} writers, {operations} writes in {elapsed:.1f}s "
+              f"({operations / elapsed:.0f}/s), cron compaction folded {folded} event(s), "
+              f"{stored} quotes stored ({args.backend})")
+    finally:
+        os.chdir(PROJECT_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if problems:
+        print("FAILED:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("No lost or duplicated quotes or edits")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
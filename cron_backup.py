@@ -8,11 +8,23 @@ Example cron setup to run daily at midnight:
 
 import time
 import datetime
-from utils.backup_to_drive import export_db_to_csv, backup_csv_to_drive
+from utils.backup_to_drive import export_db_to_csv, export_quote_store_to_csv, backup_csv_to_drive
+from utils.data_storage import compact_quote_events, get_quote_store_path
 
 def main():
     print(f"Starting scheduled backup at {datetime.datetime.now()}")
     
+    # Fold logged quote edits into the quote store (quotes.csv or the Parquet dataset)
+    try:
+        print(f"Compacted {compact_quote_events()} quote event(s) into {get_quote_store_path()}")
+    except Exception as e:
+        print(f"Failed to compact quote events: {str(e)}")
+    
+    # Export the quote store through utils.data_storage, so the backup is
+    # current whichever backend holds it
+    if not export_quote_store_to_csv():
+        print("Failed to export the quote store to CSV")
+    
     # Export database to CSV
     export_result = export_db_to_csv()
     
@@ -0,0 +1,36 @@
+"""
+Query Plan Check
+
+Prints the EXPLAIN plan for every query the app issues against the quotes
+table and exits with status 1 if any of them would scan the whole table
+unexpectedly. Uses the same DATABASE_URL / ENV settings as the app:
+python explain_queries.py
+"""
+
+import sys
+from utils.query_plans import check_query_plans
+
+def main():
+    unexpected = []
+    for name, plan_lines, full_scan, full_scan_expected in check_query_plans():
+        if full_scan and full_scan_expected:
+            label = "FULL SCAN (expected)"
+        elif full_scan:
+            label = "FULL SCAN"
+            unexpected.append(name)
+        else:
+            label = "index"
+        print(f"== {name} [{label}]")
+        for line in plan_lines:
+            print(f"   {line}")
+
+    if unexpected:
+        print(f"{len(unexpected)} quer{'y' if len(unexpected) == 1 else 'ies'} scan the whole quotes table:")
+        for name in unexpected:
+            print(f" - {name}")
+        return 1
+    print("No unexpected full table scans")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,16 @@ import base64
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.io import write_image
-from utils.database import get_quotes_from_db
+from utils.database import get_quotes_from_db, get_quote_filter_options
+from utils.analytics import (
+    dashboard_filters,
+    get_quote_date_range,
+    get_summary_metrics,
+    get_revenue_by_period,
+    get_breakdown,
+    get_addon_counts,
+    get_other_referrals
+)
 from utils.excel_export import create_excel_download_button, download_dataframe_as_excel
 
 # Function to create a downloadable chart image directly
@@ -64,44 +73,16 @@ if not st.session_state.admin_authenticated:
 else:
     # Get quotes data
     try:
-        quotes_df = get_quotes_from_db()
+        date_bounds = get_quote_date_range()
         
-        if len(quotes_df) == 0:
+        if date_bounds is None:
             st.info("No quotes data available for analysis.")
         else:
-            # Convert timestamp to datetime
-            quotes_df["timestamp"] = pd.to_datetime(quotes_df["timestamp"])
-            
-            # Handle cleaning_date conversion more safely
-            if "cleaning_date" in quotes_df.columns:
-                # First, fill NaN values with a placeholder
-                quotes_df["cleaning_date"] = quotes_df["cleaning_date"].fillna("01/01/2000")
-                
-                # Try to parse dates with various formats
-                try:
-                    # Try UK format first (DD/MM/YYYY)
-                    quotes_df["cleaning_date"] = pd.to_datetime(quotes_df["cleaning_date"], dayfirst=True)
-                except Exception as e:
-                    # If that fails, try with flexible parser
-                    try:
-                        quotes_df["cleaning_date"] = pd.to_datetime(quotes_df["cleaning_date"], errors='coerce', dayfirst=True)
-                        # Fill any NaT values with a default date
-                        quotes_df["cleaning_date"] = quotes_df["cleaning_date"].fillna(pd.Timestamp("2000-01-01"))
-                    except Exception as e2:
-                        # As a last resort, set all to a default date
-                        quotes_df["cleaning_date"] = pd.Timestamp("2000-01-01")
-            
-            # Add some calculated columns
-            quotes_df["month"] = quotes_df["timestamp"].dt.strftime("%Y-%m")
-            quotes_df["week"] = quotes_df["timestamp"].dt.strftime("%Y-%U")
-            quotes_df["day"] = quotes_df["timestamp"].dt.date
-            
             # Date range filter
             st.sidebar.header("Filter Data")
             
             # Get min and max dates
-            min_date = quotes_df["timestamp"].min().date()
-            max_date = quotes_df["timestamp"].max().date()
+            min_date, max_date = date_bounds
             
             # Date range selection with UK format
             date_range = st.sidebar.date_input(
@@ -117,33 +98,26 @@ else:
             
             if len(date_range) == 2:
                 start_date, end_date = date_range
-                filtered_df = quotes_df[
-                    (quotes_df["timestamp"].dt.date >= start_date) & 
-                    (quotes_df["timestamp"].dt.date <= end_date)
-                ]
             else:
-                filtered_df = quotes_df
+                start_date, end_date = None, None
+            
+            filter_options = get_quote_filter_options(("region", "service_type", "status"))
             
             # Add region filter
-            regions = ["All"] + sorted(quotes_df["region"].unique().tolist())
+            regions = ["All"] + filter_options.get("region", [])
             selected_region = st.sidebar.selectbox("Select Region", regions)
             
-            if selected_region != "All":
-                filtered_df = filtered_df[filtered_df["region"] == selected_region]
-            
             # Add service type filter
-            service_types = ["All"] + sorted(quotes_df["service_type"].unique().tolist())
+            service_types = ["All"] + filter_options.get("service_type", [])
             selected_service = st.sidebar.selectbox("Select Service Type", service_types)
             
-            if selected_service != "All":
-                filtered_df = filtered_df[filtered_df["service_type"] == selected_service]
-            
             # Add status filter
-            statuses = ["All"] + sorted(quotes_df["status"].unique().tolist())
+            statuses = ["All"] + filter_options.get("status", [])
             selected_status = st.sidebar.selectbox("Select Status", statuses)
             
-            if selected_status != "All":
-                filtered_df = filtered_df[filtered_df["status"] == selected_status]
+            # Every figure below is aggregated in the database with these filters
+            selected_filters = dashboard_filters(start_date, end_date, selected_region, selected_service, selected_status)
+            metrics = get_summary_metrics(selected_filters)
             
             # Dashboard metrics
             st.header("Key Performance Metrics")
@@ -151,22 +125,22 @@ else:
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                total_quotes = len(filtered_df)
+                total_quotes = metrics["total_quotes"]
                 st.metric("Total Quotes", total_quotes)
             
             with col2:
-                scheduled_quotes = len(filtered_df[filtered_df["status"] == "Scheduled"])
+                scheduled_quotes = metrics["scheduled_quotes"]
                 scheduled_percentage = (scheduled_quotes / total_quotes * 100) if total_quotes > 0 else 0
                 st.metric("Scheduled", f"{scheduled_quotes} ({scheduled_percentage:.1f}%)")
             
             with col3:
-                completed_quotes = len(filtered_df[filtered_df["status"] == "Completed"])
+                completed_quotes = metrics["completed_quotes"]
                 completed_percentage = (completed_quotes / total_quotes * 100) if total_quotes > 0 else 0
                 st.metric("Completed", f"{completed_quotes} ({completed_percentage:.1f}%)")
             
             with col4:
-                total_revenue = filtered_df["total_price"].sum()
-                average_quote = filtered_df["total_price"].mean()
+                total_revenue = metrics["total_revenue"]
+                average_quote = metrics["average_quote"]
                 st.metric("Total Revenue", f"£{total_revenue:.2f}", f"Avg: £{average_quote:.2f}")
             
             # Charts
@@ -185,8 +159,7 @@ else:
                 
                 if time_period == "Daily":
                     # Group by day
-                    daily_revenue = filtered_df.groupby("day")["total_price"].sum().reset_index()
-                    daily_revenue["day"] = pd.to_datetime(daily_revenue["day"])
+                    daily_revenue = get_revenue_by_period("Daily", selected_filters)
                     
                     fig = px.line(
                         daily_revenue,
@@ -211,7 +184,7 @@ else:
                     
                 elif time_period == "Weekly":
                     # Group by week
-                    weekly_revenue = filtered_df.groupby("week")["total_price"].sum().reset_index()
+                    weekly_revenue = get_revenue_by_period("Weekly", selected_filters)
                     
                     fig = px.bar(
                         weekly_revenue,
@@ -236,7 +209,7 @@ else:
                     
                 else:  # Monthly
                     # Group by month
-                    monthly_revenue = filtered_df.groupby("month")["total_price"].sum().reset_index()
+                    monthly_revenue = get_revenue_by_period("Monthly", selected_filters)
                     
                     fig = px.bar(
                         monthly_revenue,
@@ -263,9 +236,7 @@ else:
                 # Regional analysis
                 st.subheader("Revenue by Region")
                 
-                region_revenue = filtered_df.groupby("region")["total_price"].sum().reset_index()
-                region_count = filtered_df.groupby("region").size().reset_index(name="count")
-                region_data = pd.merge(region_revenue, region_count, on="region")
+                region_data = get_breakdown("region", selected_filters)
                 
                 col1, col2 = st.columns(2)
                 
@@ -291,15 +262,14 @@ else:
                 
                 # Show average price by region
                 st.subheader("Average Quote by Region")
-                region_avg = filtered_df.groupby("region")["total_price"].mean().reset_index()
-                region_avg = region_avg.sort_values("total_price", ascending=False)
+                region_avg = region_data.sort_values("average_price", ascending=False)
                 
                 fig = px.bar(
                     region_avg,
                     x="region",
-                    y="total_price",
+                    y="average_price",
                     color="region",
-                    labels={"region": "Region", "total_price": "Average Quote (£)"},
+                    labels={"region": "Region", "average_price": "Average Quote (£)"},
                     title="Average Quote Value by Region"
                 )
                 st.plotly_chart(fig, use_container_width=True)
@@ -308,9 +278,7 @@ else:
                 # Service type analysis
                 st.subheader("Revenue by Service Type")
                 
-                service_revenue = filtered_df.groupby("service_type")["total_price"].sum().reset_index()
-                service_count = filtered_df.groupby("service_type").size().reset_index(name="count")
-                service_data = pd.merge(service_revenue, service_count, on="service_type")
+                service_data = get_breakdown("service_type", selected_filters)
                 
                 col1, col2 = st.columns(2)
                 
@@ -337,25 +305,8 @@ else:
             # Additional Services Analysis
             st.header("Additional Services Analysis")
             
-            # Calculate additional services stats
-            total_oven_clean = filtered_df["oven_clean"].sum()
-            total_carpet_cleaning = filtered_df["carpet_cleaning"].sum()
-            total_internal_windows = filtered_df["internal_windows"].sum()
-            total_external_windows = filtered_df["external_windows"].sum()
-            total_balcony_patio = filtered_df["balcony_patio"].sum()
-            total_cleaning_materials = filtered_df["cleaning_materials"].sum()
-            
-            # Create a dataframe for the additional services
-            additional_services_data = pd.DataFrame({
-                "Service": [
-                    "Oven Clean", "Carpet Cleaning", "Internal Windows",
-                    "External Windows", "Balcony/Patio", "Cleaning Materials"
-                ],
-                "Count": [
-                    total_oven_clean, total_carpet_cleaning, total_internal_windows,
-                    total_external_windows, total_balcony_patio, total_cleaning_materials
-                ]
-            })
+            # Count how often each additional service was included
+            additional_services_data = get_addon_counts(selected_filters)
             
             fig = px.bar(
                 additional_services_data,
@@ -367,224 +318,320 @@ else:
             st.plotly_chart(fig, use_container_width=True)
             
             # Referral Source Analysis
-            if 'referral_source' in filtered_df.columns:
-                st.header("Referral Source Analysis")
+            st.header("Referral Source Analysis")
+            
+            # Quotes without a referral source (or with the placeholder) are left out
+            referral_data = get_breakdown("referral_source", selected_filters)
+            
+            if len(referral_data) > 0:
+                col1, col2 = st.columns(2)
                 
-                # Clean the data by removing None or empty values
-                referral_df = filtered_df[filtered_df["referral_source"].notna()]
-                referral_df = referral_df[referral_df["referral_source"] != "Please select..."]
+                with col1:
+                    fig = px.pie(
+                        referral_data,
+                        values="count",
+                        names="referral_source",
+                        title="Quote Distribution by Referral Source"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
                 
-                if len(referral_df) > 0:
-                    referral_counts = referral_df.groupby("referral_source").size().reset_index(name="count")
-                    referral_revenue = referral_df.groupby("referral_source")["total_price"].sum().reset_index()
-                    referral_data = pd.merge(referral_counts, referral_revenue, on="referral_source")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        fig = px.pie(
-                            referral_data,
-                            values="count",
-                            names="referral_source",
-                            title="Quote Distribution by Referral Source"
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
+                with col2:
+                    fig = px.bar(
+                        referral_data,
+                        x="referral_source",
+                        y="total_price",
+                        color="referral_source",
+                        labels={"referral_source": "Referral Source", "total_price": "Revenue (£)"},
+                        title="Revenue by Referral Source"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
                     
-                    with col2:
-                        fig = px.bar(
-                            referral_data,
-                            x="referral_source",
-                            y="total_price",
-                            color="referral_source",
-                            labels={"referral_source": "Referral Source", "total_price": "Revenue (£)"},
-                            title="Revenue by Referral Source"
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                    # Show "Other" referral sources if available
-                    other_referrals = referral_df[referral_df["referral_source"] == "Other"]
-                    if len(other_referrals) > 0 and "referral_other" in other_referrals.columns:
-                        other_referrals = other_referrals[other_referrals["referral_other"].notna()]
-                        if len(other_referrals) > 0:
-                            st.subheader("Details of 'Other' Referral Sources")
-                            st.dataframe(
-                                other_referrals[["customer_name", "referral_other", "total_price"]],
-                                hide_index=True
-                            )
-                else:
-                    st.info("No referral source data available for analysis.")
+                # Show "Other" referral sources if available
+                other_referrals = get_other_referrals(selected_filters)
+                if len(other_referrals) > 0:
+                    st.subheader("Details of 'Other' Referral Sources")
+                    st.dataframe(
+                        other_referrals,
+                        hide_index=True
+                    )
+            else:
+                st.info("No referral source data available for analysis.")
             
             # Raw Data
             st.header("Detailed Quote Data")
             with st.expander("View Raw Data"):
-                # Format the data for display
-                display_df = filtered_df.copy()
-                
-                # Convert boolean columns to more readable Yes/No
-                for col in ["oven_clean", "carpet_cleaning", "internal_windows", "external_windows", 
-                            "balcony_patio", "cleaning_materials", "sent_to_customer", "admin_created"]:
-                    if col in display_df.columns:
-                        display_df[col] = display_df[col].apply(lambda x: "Yes" if x else "No")
-                
-                # Format timestamp for better readability (UK format)
-                if "timestamp" in display_df.columns:
-                    display_df["timestamp"] = display_df["timestamp"].dt.strftime("%d/%m/%Y %H:%M")
-                
-                # Format dates in UK format
-                if "cleaning_date" in display_df.columns:
-                    display_df["cleaning_date"] = display_df["cleaning_date"].dt.strftime("%d/%m/%Y")
-                
-                # Format price columns
-                for col in ["base_price", "total_price", "markup", "hourly_rate", 
-                           "extra_bathrooms_cost", "extra_reception_cost", "additional_services_cost", "materials_cost"]:
-                    if col in display_df.columns:
-                        display_df[col] = display_df[col].apply(lambda x: f"£{x:.2f}" if pd.notnull(x) else "")
-                
-                # Format hours required
-                if "hours_required" in display_df.columns:
-                    display_df["hours_required"] = display_df["hours_required"].apply(lambda x: f"{x:.2f}" if pd.notnull(x) else "")
-                
-                # Show all available columns with frozen headers
-                st.dataframe(
-                    display_df, 
-                    hide_index=True, 
-                    use_container_width=True,
-                    height=400,  # Fixed height to enable vertical scrolling
-                    column_config={col: st.column_config.Column(col) for col in display_df.columns}  # Ensure column headers are visible
-                )
+                # Individual quotes are only loaded on request; everything above is aggregated in SQL
+                load_raw_data = st.checkbox(f"Load the {total_quotes} matching quotes", key="load_raw_dashboard_data")
+                if load_raw_data:
+                    filtered_df = get_quotes_from_db(
+                        filters=selected_filters["columns"],
+                        start_date=start_date,
+                        end_date=end_date + datetime.timedelta(days=1) if end_date else None
+                    )
+                    filtered_df["timestamp"] = pd.to_datetime(filtered_df["timestamp"])
+                    
+                    # Handle cleaning_date conversion more safely
+                    if "cleaning_date" in filtered_df.columns:
+                        # First, fill NaN values with a placeholder
+                        filtered_df["cleaning_date"] = filtered_df["cleaning_date"].fillna("01/01/2000")
+                        
+                        # Try to parse dates with various formats
+                        try:
+                            # Try UK format first (DD/MM/YYYY)
+                            filtered_df["cleaning_date"] = pd.to_datetime(filtered_df["cleaning_date"], dayfirst=True)
+                        except Exception as e:
+                            # If that fails, try with flexible parser
+                            try:
+                                filtered_df["cleaning_date"] = pd.to_datetime(filtered_df["cleaning_date"], errors='coerce', dayfirst=True)
+                                # Fill any NaT values with a default date
+                                filtered_df["cleaning_date"] = filtered_df["cleaning_date"].fillna(pd.Timestamp("2000-01-01"))
+                            except Exception as e2:
+                                # As a last resort, set all to a default date
+                                filtered_df["cleaning_date"] = pd.Timestamp("2000-01-01")
+                    
+                    # Format the data for display
+                    display_df = filtered_df.copy()
+                
+                    # Convert boolean columns to more readable Yes/No
+                    for col in ["oven_clean", "carpet_cleaning", "internal_windows", "external_windows", 
+                                "balcony_patio", "cleaning_materials", "sent_to_customer", "admin_created"]:
+                        if col in display_df.columns:
+                            display_df[col] = display_df[col].apply(lambda x: "Yes" if x else "No")
+                
+                    # Format timestamp for better readability (UK format)
+                    if "timestamp" in display_df.columns:
+                        display_df["timestamp"] = display_df["timestamp"].dt.strftime("%d/%m/%Y %H:%M")
+                
+                    # Format dates in UK format
+                    if "cleaning_date" in display_df.columns:
+                        display_df["cleaning_date"] = display_df["cleaning_date"].dt.strftime("%d/%m/%Y")
+                
+                    # Format price columns
+                    for col in ["base_price", "total_price", "markup", "hourly_rate", 
+                               "extra_bathrooms_cost", "extra_reception_cost", "additional_services_cost", "materials_cost"]:
+                        if col in display_df.columns:
+                            display_df[col] = display_df[col].apply(lambda x: f"£{x:.2f}" if pd.notnull(x) else "")
+                
+                    # Format hours required
+                    if "hours_required" in display_df.columns:
+                        display_df["hours_required"] = display_df["hours_required"].apply(lambda x: f"{x:.2f}" if pd.notnull(x) else "")
+                
+                    # Show all available columns with frozen headers
+                    st.dataframe(
+                        display_df, 
+                        hide_index=True, 
+                        use_container_width=True,
+                        height=400,  # Fixed height to enable vertical scrolling
+                        column_config={col: st.column_config.Column(col) for col in display_df.columns}  # Ensure column headers are visible
+                    )
                 
-                # Add Excel download button for the dashboard data
-                excel_file = io.BytesIO()
-                with pd.ExcelWriter(excel_file, engine="xlsxwriter") as writer:
-                    # Create full export with all columns
-                    filtered_df.to_excel(writer, sheet_name="Dashboard Data", index=False)
+                    # Add Excel download button for the dashboard data
+                    excel_file = io.BytesIO()
+                    with pd.ExcelWriter(excel_file, engine="xlsxwriter") as writer:
+                        # Create full export with all columns
+                        filtered_df.to_excel(writer, sheet_name="Dashboard Data", index=False)
                     
-                    # Add a summary sheet
-                    summary_data = {
-                        "Metric": [
-                            "Total Quotes", 
-                            "Scheduled Quotes", 
-                            "Completed Quotes", 
-                            "Total Revenue", 
-                            "Average Quote Value"
-                        ],
-                        "Value": [
-                            total_quotes,
-                            scheduled_quotes,
-                            completed_quotes,
-                            f"£{total_revenue:.2f}",
-                            f"£{average_quote:.2f}"
-                        ]
-                    }
-                    pd.DataFrame(summary_data).to_excel(writer, sheet_name="Summary", index=False)
+                        # Add a summary sheet
+                        summary_data = {
+                            "Metric": [
+                                "Total Quotes", 
+                                "Scheduled Quotes", 
+                                "Completed Quotes", 
+                                "Total Revenue", 
+                                "Average Quote Value",
+                                "Total Labor Hours"
+                            ],
+                            "Value": [
+                                total_quotes,
+                                scheduled_quotes,
+                                completed_quotes,
+                                f"£{total_revenue:.2f}",
+                                f"£{average_quote:.2f}",
+                                f"{metrics['labor_hours']:.1f}"
+                            ]
+                        }
+                        pd.DataFrame(summary_data).to_excel(writer, sheet_name="Summary", index=False)
                     
-                    # Add formatting
-                    workbook = writer.book
+                        # Add formatting
+                        workbook = writer.book
                     
-                    # Format the main data sheet
-                    worksheet = writer.sheets["Dashboard Data"]
-                    header_format = workbook.add_format({'bold': True, 'bg_color': '#22C7D6', 'color': 'white'})
-                    for col_num, value in enumerate(filtered_df.columns.values):
-                        worksheet.write(0, col_num, value, header_format)
+                        # Format the main data sheet
+                        worksheet = writer.sheets["Dashboard Data"]
+                        header_format = workbook.add_format({'bold': True, 'bg_color': '#22C7D6', 'color': 'white'})
+                        for col_num, value in enumerate(filtered_df.columns.values):
+                            worksheet.write(0, col_num, value, header_format)
                     
-                    # Format the summary sheet
-                    summary_sheet = writer.sheets["Summary"]
-                    summary_sheet.set_column('A:A', 25)
-                    summary_sheet.set_column('B:B', 20)
-                    for col_num, value in enumerate(summary_data["Metric"]):
-                        summary_sheet.write(col_num+1, 0, value)
-                        summary_sheet.write(col_num+1, 1, summary_data["Value"][col_num])
+                        # Format the summary sheet
+                        summary_sheet = writer.sheets["Summary"]
+                        summary_sheet.set_column('A:A', 25)
+                        summary_sheet.set_column('B:B', 20)
+                        for col_num, value in enumerate(summary_data["Metric"]):
+                            summary_sheet.write(col_num+1, 0, value)
+                            summary_sheet.write(col_num+1, 1, summary_data["Value"][col_num])
                     
-                    # Write headers with format
-                    for col_num, value in enumerate(summary_data.keys()):
-                        summary_sheet.write(0, col_num, value, header_format)
-                
-                excel_file.seek(0)
-                
-                # Improved Excel export approach
-                st.markdown("### Export Dashboard Data")
-                
-                # Display the full table with a fixed height so it doesn't overwhelm the page
-                st.dataframe(filtered_df, height=400, use_container_width=True)
-                
-                # Create Excel file in memory
-                from io import BytesIO
-                output = BytesIO()
-                
-                # Generate timestamp for unique filename
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                
-                # Create an Excel workbook with worksheets for data and summary
-                import xlsxwriter
-                workbook = xlsxwriter.Workbook(output)
+                        # Write headers with format
+                        for col_num, value in enumerate(summary_data.keys()):
+                            summary_sheet.write(0, col_num, value, header_format)
+                
+                    excel_file.seek(0)
+                
+                    # Improved Excel export approach
+                    st.markdown("### Export Dashboard Data")
+                
+                    # Display the full table with a fixed height so it doesn't overwhelm the page
+                    st.dataframe(filtered_df, height=400, use_container_width=True)
+                
+                    # Create Excel file in memory
+                    from io import BytesIO
+                    output = BytesIO()
+                
+                    # Generate timestamp for unique filename
+                    from datetime import datetime
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                
+                    # Create an Excel workbook with worksheets for data and summary
+                    import xlsxwriter
+                    workbook = xlsxwriter.Workbook(output)
+                
+                    # Add data worksheet
+                    data_sheet = workbook.add_worksheet("Dashboard Data")
+                
+                    # Add headers
+                    for col_num, column_title in enumerate(filtered_df.columns):
+                        data_sheet.write(0, col_num, column_title)
+                
+                    # Add data rows with NaN/INF handling
+                    for row_num, row in enumerate(filtered_df.values):
+                        for col_num, cell_value in enumerate(row):
+                            # Handle NaN, INF and other problematic values
+                            if cell_value is None or (isinstance(cell_value, float) and (pd.isna(cell_value) or cell_value == float('inf') or cell_value == float('-inf'))):
+                                data_sheet.write(row_num + 1, col_num, "")  # Write empty string instead
+                            else:
+                                try:
+                                    data_sheet.write(row_num + 1, col_num, cell_value)
+                                except:
+                                    # If any other error, convert to string
+                                    data_sheet.write(row_num + 1, col_num, str(cell_value))
+                
+                    # Add summary worksheet
+                    summary_sheet = workbook.add_worksheet("Summary")
+                
+                    # Write summary data
+                    summary_data = [
+                        ["Total Quotes", total_quotes],
+                        ["Scheduled Quotes", scheduled_quotes],
+                        ["Completed Quotes", completed_quotes],
+                        ["Total Revenue", total_revenue],
+                        ["Average Quote Value", average_quote],
+                        ["Total Labor Hours", metrics["labor_hours"]]
+                    ]
+                
+                    for row_num, row_data in enumerate(summary_data):
+                        for col_num, cell_value in enumerate(row_data):
+                            # Handle NaN, INF and other problematic values
+                            if cell_value is None or (isinstance(cell_value, float) and (pd.isna(cell_value) or cell_value == float('inf') or cell_value == float('-inf'))):
+                                summary_sheet.write(row_num, col_num, "")  # Write empty string instead
+                            else:
+                                try:
+                                    summary_sheet.write(row_num, col_num, cell_value)
+                                except:
+                                    # If any other error, convert to string
+                                    summary_sheet.write(row_num, col_num, str(cell_value))
+                
+                    # Add charts worksheet
+                    charts_sheet = workbook.add_worksheet("Charts Information")
+                
+                    # Write chart info (since we can't embed interactive charts)
+                    charts_sheet.write(0, 0, "Important Note About Charts")
+                    charts_sheet.write(1, 0, "The interactive charts cannot be embedded directly in Excel.")
+                    charts_sheet.write(2, 0, "Instead, the chart data is included in separate worksheets below.")
+                
+                    # Create worksheets with the chart data
+                
+                    # Region data
+                    region_chart_sheet = workbook.add_worksheet("Region Chart Data")
+                    region_chart_sheet.write(0, 0, "Region")
+                    region_chart_sheet.write(0, 1, "Count")
+                    region_chart_sheet.write(0, 2, "Revenue")
+                
+                    if 'region' in filtered_df.columns:
+                        region_data = filtered_df.groupby("region").agg({
+                            "quote_id": "count", 
+                            "total_price": "sum"
+                        }).reset_index()
+                    
+                        for row_num, (region, count, revenue) in enumerate(
+                            zip(region_data["region"], region_data["quote_id"], region_data["total_price"])
+                        ):
+                            # Handle region safely
+                            if pd.isna(region) or region is None:
+                                region_value = "Unknown"
+                            else:
+                                region_value = str(region)
+                            
+                            # Handle count and revenue safely
+                            if count is None or (isinstance(count, float) and (pd.isna(count) or count == float('inf') or count == float('-inf'))):
+                                count_value = 0
+                            else:
+                                count_value = count
+                            
+                            if revenue is None or (isinstance(revenue, float) and (pd.isna(revenue) or revenue == float('inf') or revenue == float('-inf'))):
+                                revenue_value = 0
+                            else:
+                                revenue_value = revenue
+                            
+                            # Write values safely
+                            region_chart_sheet.write(row_num + 1, 0, region_value)
+                            region_chart_sheet.write(row_num + 1, 1, count_value)
+                            region_chart_sheet.write(row_num + 1, 2, revenue_value)
+                
+                    # Service type data
+                    service_chart_sheet = workbook.add_worksheet("Service Type Chart Data")
+                    service_chart_sheet.write(0, 0, "Service Type")
+                    service_chart_sheet.write(0, 1, "Count")
+                    service_chart_sheet.write(0, 2, "Revenue")
+                
+                    if 'service_type' in filtered_df.columns:
+                        service_data = filtered_df.groupby("service_type").agg({
+                            "quote_id": "count", 
+                            "total_price": "sum"
+                        }).reset_index()
+                    
+                        for row_num, (service, count, revenue) in enumerate(
+                            zip(service_data["service_type"], service_data["quote_id"], service_data["total_price"])
+                        ):
+                            # Handle service safely
+                            if pd.isna(service) or service is None:
+                                service_value = "Unknown"
+                            else:
+                                service_value = str(service)
+                            
+                            # Handle count and revenue safely
+                            if count is None or (isinstance(count, float) and (pd.isna(count) or count == float('inf') or count == float('-inf'))):
+                                count_value = 0
+                            else:
+                                count_value = count
+                            
+                            if revenue is None or (isinstance(revenue, float) and (pd.isna(revenue) or revenue == float('inf') or revenue == float('-inf'))):
+                                revenue_value = 0
+                            else:
+                                revenue_value = revenue
+                            
+                            # Write values safely
+                            service_chart_sheet.write(row_num + 1, 0, service_value)
+                            service_chart_sheet.write(row_num + 1, 1, count_value)
+                            service_chart_sheet.write(row_num + 1, 2, revenue_value)
                 
-                # Add data worksheet
-                data_sheet = workbook.add_worksheet("Dashboard Data")
+                    # Add regional data
+                    region_sheet = workbook.add_worksheet("Region Analysis")
+                    region_sheet.write(0, 0, "Region")
+                    region_sheet.write(0, 1, "Count")
+                    region_sheet.write(0, 2, "Revenue")
                 
-                # Add headers
-                for col_num, column_title in enumerate(filtered_df.columns):
-                    data_sheet.write(0, col_num, column_title)
+                    region_data = filtered_df.groupby("region").agg(
+                        {"quote_id": "count", "total_price": "sum"}
+                    ).reset_index()
                 
-                # Add data rows with NaN/INF handling
-                for row_num, row in enumerate(filtered_df.values):
-                    for col_num, cell_value in enumerate(row):
-                        # Handle NaN, INF and other problematic values
-                        if cell_value is None or (isinstance(cell_value, float) and (pd.isna(cell_value) or cell_value == float('inf') or cell_value == float('-inf'))):
-                            data_sheet.write(row_num + 1, col_num, "")  # Write empty string instead
-                        else:
-                            try:
-                                data_sheet.write(row_num + 1, col_num, cell_value)
-                            except:
-                                # If any other error, convert to string
-                                data_sheet.write(row_num + 1, col_num, str(cell_value))
-                
-                # Add summary worksheet
-                summary_sheet = workbook.add_worksheet("Summary")
-                
-                # Write summary data
-                summary_data = [
-                    ["Total Quotes", total_quotes],
-                    ["Scheduled Quotes", scheduled_quotes],
-                    ["Completed Quotes", completed_quotes],
-                    ["Total Revenue", total_revenue],
-                    ["Average Quote Value", average_quote]
-                ]
-                
-                for row_num, row_data in enumerate(summary_data):
-                    for col_num, cell_value in enumerate(row_data):
-                        # Handle NaN, INF and other problematic values
-                        if cell_value is None or (isinstance(cell_value, float) and (pd.isna(cell_value) or cell_value == float('inf') or cell_value == float('-inf'))):
-                            summary_sheet.write(row_num, col_num, "")  # Write empty string instead
-                        else:
-                            try:
-                                summary_sheet.write(row_num, col_num, cell_value)
-                            except:
-                                # If any other error, convert to string
-                                summary_sheet.write(row_num, col_num, str(cell_value))
-                
-                # Add charts worksheet
-                charts_sheet = workbook.add_worksheet("Charts Information")
-                
-                # Write chart info (since we can't embed interactive charts)
-                charts_sheet.write(0, 0, "Important Note About Charts")
-                charts_sheet.write(1, 0, "The interactive charts cannot be embedded directly in Excel.")
-                charts_sheet.write(2, 0, "Instead, the chart data is included in separate worksheets below.")
-                
-                # Create worksheets with the chart data
-                
-                # Region data
-                region_chart_sheet = workbook.add_worksheet("Region Chart Data")
-                region_chart_sheet.write(0, 0, "Region")
-                region_chart_sheet.write(0, 1, "Count")
-                region_chart_sheet.write(0, 2, "Revenue")
-                
-                if 'region' in filtered_df.columns:
-                    region_data = filtered_df.groupby("region").agg({
-                        "quote_id": "count", 
-                        "total_price": "sum"
-                    }).reset_index()
-                    
                     for row_num, (region, count, revenue) in enumerate(
                         zip(region_data["region"], region_data["quote_id"], region_data["total_price"])
                     ):
@@ -593,35 +640,33 @@ else:
                             region_value = "Unknown"
                         else:
                             region_value = str(region)
-                            
+                        
                         # Handle count and revenue safely
                         if count is None or (isinstance(count, float) and (pd.isna(count) or count == float('inf') or count == float('-inf'))):
                             count_value = 0
                         else:
                             count_value = count
-                            
+                        
                         if revenue is None or (isinstance(revenue, float) and (pd.isna(revenue) or revenue == float('inf') or revenue == float('-inf'))):
                             revenue_value = 0
                         else:
                             revenue_value = revenue
-                            
+                        
                         # Write values safely
-                        region_chart_sheet.write(row_num + 1, 0, region_value)
-                        region_chart_sheet.write(row_num + 1, 1, count_value)
-                        region_chart_sheet.write(row_num + 1, 2, revenue_value)
-                
-                # Service type data
-                service_chart_sheet = workbook.add_worksheet("Service Type Chart Data")
-                service_chart_sheet.write(0, 0, "Service Type")
-                service_chart_sheet.write(0, 1, "Count")
-                service_chart_sheet.write(0, 2, "Revenue")
-                
-                if 'service_type' in filtered_df.columns:
-                    service_data = filtered_df.groupby("service_type").agg({
-                        "quote_id": "count", 
-                        "total_price": "sum"
-                    }).reset_index()
-                    
+                        region_sheet.write(row_num + 1, 0, region_value)
+                        region_sheet.write(row_num + 1, 1, count_value)
+                        region_sheet.write(row_num + 1, 2, revenue_value)
+                
+                    # Add service type data
+                    service_sheet = workbook.add_worksheet("Service Analysis")
+                    service_sheet.write(0, 0, "Service Type")
+                    service_sheet.write(0, 1, "Count")
+                    service_sheet.write(0, 2, "Revenue")
+                
+                    service_data = filtered_df.groupby("service_type").agg(
+                        {"quote_id": "count", "total_price": "sum"}
+                    ).reset_index()
+                
                     for row_num, (service, count, revenue) in enumerate(
                         zip(service_data["service_type"], service_data["quote_id"], service_data["total_price"])
                     ):
@@ -630,127 +675,57 @@ else:
                             service_value = "Unknown"
                         else:
                             service_value = str(service)
-                            
+                        
                         # Handle count and revenue safely
                         if count is None or (isinstance(count, float) and (pd.isna(count) or count == float('inf') or count == float('-inf'))):
                             count_value = 0
                         else:
                             count_value = count
-                            
+                        
                         if revenue is None or (isinstance(revenue, float) and (pd.isna(revenue) or revenue == float('inf') or revenue == float('-inf'))):
                             revenue_value = 0
                         else:
                             revenue_value = revenue
-                            
-                        # Write values safely
-                        service_chart_sheet.write(row_num + 1, 0, service_value)
-                        service_chart_sheet.write(row_num + 1, 1, count_value)
-                        service_chart_sheet.write(row_num + 1, 2, revenue_value)
-                
-                # Add regional data
-                region_sheet = workbook.add_worksheet("Region Analysis")
-                region_sheet.write(0, 0, "Region")
-                region_sheet.write(0, 1, "Count")
-                region_sheet.write(0, 2, "Revenue")
-                
-                region_data = filtered_df.groupby("region").agg(
-                    {"quote_id": "count", "total_price": "sum"}
-                ).reset_index()
-                
-                for row_num, (region, count, revenue) in enumerate(
-                    zip(region_data["region"], region_data["quote_id"], region_data["total_price"])
-                ):
-                    # Handle region safely
-                    if pd.isna(region) or region is None:
-                        region_value = "Unknown"
-                    else:
-                        region_value = str(region)
-                        
-                    # Handle count and revenue safely
-                    if count is None or (isinstance(count, float) and (pd.isna(count) or count == float('inf') or count == float('-inf'))):
-                        count_value = 0
-                    else:
-                        count_value = count
                         
-                    if revenue is None or (isinstance(revenue, float) and (pd.isna(revenue) or revenue == float('inf') or revenue == float('-inf'))):
-                        revenue_value = 0
-                    else:
-                        revenue_value = revenue
-                        
-                    # Write values safely
-                    region_sheet.write(row_num + 1, 0, region_value)
-                    region_sheet.write(row_num + 1, 1, count_value)
-                    region_sheet.write(row_num + 1, 2, revenue_value)
-                
-                # Add service type data
-                service_sheet = workbook.add_worksheet("Service Analysis")
-                service_sheet.write(0, 0, "Service Type")
-                service_sheet.write(0, 1, "Count")
-                service_sheet.write(0, 2, "Revenue")
-                
-                service_data = filtered_df.groupby("service_type").agg(
-                    {"quote_id": "count", "total_price": "sum"}
-                ).reset_index()
-                
-                for row_num, (service, count, revenue) in enumerate(
-                    zip(service_data["service_type"], service_data["quote_id"], service_data["total_price"])
-                ):
-                    # Handle service safely
-                    if pd.isna(service) or service is None:
-                        service_value = "Unknown"
-                    else:
-                        service_value = str(service)
-                        
-                    # Handle count and revenue safely
-                    if count is None or (isinstance(count, float) and (pd.isna(count) or count == float('inf') or count == float('-inf'))):
-                        count_value = 0
-                    else:
-                        count_value = count
-                        
-                    if revenue is None or (isinstance(revenue, float) and (pd.isna(revenue) or revenue == float('inf') or revenue == float('-inf'))):
-                        revenue_value = 0
-                    else:
-                        revenue_value = revenue
-                        
-                    # Write values safely
-                    service_sheet.write(row_num + 1, 0, service_value)
-                    service_sheet.write(row_num + 1, 1, count_value)
-                    service_sheet.write(row_num + 1, 2, revenue_value)
-                
-                # Close the workbook to write the content to the BytesIO object
-                workbook.close()
-                
-                # Create a simpler CSV approach that's more reliable
-                csv_data = filtered_df.to_csv(index=False).encode('utf-8')
-                
-                # Use Streamlit's download button with CSV data
-                st.download_button(
-                    label="📥 Download CSV Report",
-                    data=csv_data,
-                    file_name="KMI_Dashboard_Data.csv",
-                    mime="text/csv"
-                )
+                        # Write values safely
+                        service_sheet.write(row_num + 1, 0, service_value)
+                        service_sheet.write(row_num + 1, 1, count_value)
+                        service_sheet.write(row_num + 1, 2, revenue_value)
+                
+                    # Close the workbook to write the content to the BytesIO object
+                    workbook.close()
+                
+                    # Create a simpler CSV approach that's more reliable
+                    csv_data = filtered_df.to_csv(index=False).encode('utf-8')
+                
+                    # Use Streamlit's download button with CSV data
+                    st.download_button(
+                        label="📥 Download CSV Report",
+                        data=csv_data,
+                        file_name="KMI_Dashboard_Data.csv",
+                        mime="text/csv"
+                    )
                 
-                st.info("""
-                **CSV Download Instructions:**
-                1. Click the 'Download CSV Report' button above to download the dashboard data
-                2. The CSV file can be opened in Excel, Google Sheets, or any spreadsheet program
-                3. For the charts, use the camera icons on each chart to download them individually
-                4. For more detailed analysis, you can use the text export below to copy and paste into Excel
-                """)
-                
-                # Alternative CSV approach
-                st.markdown("#### Alternative: Copy-Paste CSV Data")
-                
-                # Create CSV data
-                csv_string = filtered_df.to_csv(index=False)
-                
-                # Display CSV in a text area with minimum styling for easy selection
-                st.text_area(
-                    "Or select this text (Ctrl+A), then copy (Ctrl+C) to paste into Excel:",
-                    csv_string,
-                    height=200
-                )
+                    st.info("""
+                    **CSV Download Instructions:**
+                    1. Click the 'Download CSV Report' button above to download the dashboard data
+                    2. The CSV file can be opened in Excel, Google Sheets, or any spreadsheet program
+                    3. For the charts, use the camera icons on each chart to download them individually
+                    4. For more detailed analysis, you can use the text export below to copy and paste into Excel
+                    """)
+                
+                    # Alternative CSV approach
+                    st.markdown("#### Alternative: Copy-Paste CSV Data")
+                
+                    # Create CSV data
+                    csv_string = filtered_df.to_csv(index=False)
+                
+                    # Display CSV in a text area with minimum styling for easy selection
+                    st.text_area(
+                        "Or select this text (Ctrl+A), then copy (Ctrl+C) to paste into Excel:",
+                        csv_string,
+                        height=200
+                    )
     
     except Exception as e:
         st.error(f"Error retrieving data: {str(e)}")
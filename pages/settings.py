@@ -2,7 +2,7 @@ import streamlit as st
 import json
 import os
 import pandas as pd
-from utils.pricing import load_pricing_config
+from utils.pricing import load_pricing_config, invalidate_pricing_config_cache
 from utils.config import load_config, save_config
 
 # Set page title and configure page
@@ -161,47 +161,85 @@ else:
             num_rows="fixed"
         )
         
-        # Save changes button
-        if st.button("Save Pricing Configuration"):
-            # Update pricing configuration from edited data
-            
-            # Update basic pricing
-            updated_config = pricing_config.copy()
-            updated_config["hourly_rate"] = hourly_rate
-            updated_config["markup_percentage"] = markup_percentage
-            
-            # Update hours required
-            updated_hours = {}
-            for service_type in pricing_config["property_hours"].keys():
-                updated_hours[service_type] = {}
-                for property_size in pricing_config["property_hours"][service_type].keys():
-                    updated_hours[service_type][property_size] = edited_hours.loc[property_size, service_type]
-            
-            updated_config["property_hours"] = updated_hours
-            
-            # Update cleaners required
-            updated_cleaners = {}
-            for service_type in pricing_config["cleaners_required"].keys():
-                updated_cleaners[service_type] = {}
-                for property_size in pricing_config["cleaners_required"][service_type].keys():
-                    updated_cleaners[service_type][property_size] = int(edited_cleaners.loc[property_size, service_type])
-            
-            updated_config["cleaners_required"] = updated_cleaners
-            
-            # Update region multipliers
-            updated_regions = {}
-            for _, row in edited_regions.iterrows():
-                updated_regions[row["Region"]] = row["Multiplier"]
-            
-            updated_config["region_multiplier"] = updated_regions
-            
-            # Update extra costs
-            updated_extra_costs = {}
-            for _, row in edited_extra_costs.iterrows():
-                updated_extra_costs[row["Service"]] = row["Cost (£)"]
+        # Build the updated pricing configuration from the edited data
+        
+        # Update basic pricing
+        updated_config = pricing_config.copy()
+        updated_config["hourly_rate"] = hourly_rate
+        updated_config["markup_percentage"] = markup_percentage
+        
+        # Update hours required
+        updated_hours = {}
+        for service_type in pricing_config["property_hours"].keys():
+            updated_hours[service_type] = {}
+            for property_size in pricing_config["property_hours"][service_type].keys():
+                updated_hours[service_type][property_size] = edited_hours.loc[property_size, service_type]
+        
+        updated_config["property_hours"] = updated_hours
+        
+        # Update cleaners required
+        updated_cleaners = {}
+        for service_type in pricing_config["cleaners_required"].keys():
+            updated_cleaners[service_type] = {}
+            for property_size in pricing_config["cleaners_required"][service_type].keys():
+                updated_cleaners[service_type][property_size] = int(edited_cleaners.loc[property_size, service_type])
+        
+        updated_config["cleaners_required"] = updated_cleaners
+        
+        # Update region multipliers
+        updated_regions = {}
+        for _, row in edited_regions.iterrows():
+            updated_regions[row["Region"]] = row["Multiplier"]
+        
+        updated_config["region_multiplier"] = updated_regions
+        
+        # Update extra costs
+        updated_extra_costs = {}
+        for _, row in edited_extra_costs.iterrows():
+            updated_extra_costs[row["Service"]] = row["Cost (£)"]
+        
+        updated_config["extra_costs"] = updated_extra_costs
+        
+        # Preview the effect on stored quotes before saving
+        if st.button("Preview Impact on Existing Quotes"):
+            from utils.repricing import simulate_repricing
             
-            updated_config["extra_costs"] = updated_extra_costs
+            try:
+                with st.spinner("Repricing stored quotes..."):
+                    impact = simulate_repricing(updated_config)
+            except Exception as e:
+                st.error(f"Could not simulate repricing: {str(e)}")
+                impact = None
             
+            if impact is not None:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Quotes Repriced", f"{impact['quotes']:,}")
+                with col2:
+                    st.metric(
+                        "Revenue",
+                        f"£{impact['candidate_revenue']:,.2f}",
+                        f"£{impact['revenue_delta']:,.2f} ({impact['revenue_delta_pct']:+.1f}%)"
+                    )
+                with col3:
+                    st.metric(
+                        "Crew Size Changes",
+                        f"{impact['crew_changes']:,}",
+                        f"{impact['crew_increases']:,} up / {impact['crew_decreases']:,} down",
+                        delta_color="off"
+                    )
+                
+                if impact["unpriced_quotes"]:
+                    st.warning(f"{impact['unpriced_quotes']:,} quotes use options missing from one of the configurations and were skipped.")
+                
+                st.markdown("**Price changes by region and service type**")
+                st.dataframe(impact["by_segment"], use_container_width=True, hide_index=True)
+                
+                st.markdown("**Distribution of price changes**")
+                st.dataframe(impact["price_change_distribution"], use_container_width=True, hide_index=True)
+        
+        # Save changes button
+        if st.button("Save Pricing Configuration"):
             # Save updated configuration
             config_dir = os.path.join("config")
             os.makedirs(config_dir, exist_ok=True)
@@ -209,6 +247,9 @@ else:
             config_path = os.path.join(config_dir, "pricing_config.json")
             with open(config_path, "w") as file:
                 json.dump(updated_config, file, indent=4)
+            
+            # Make sure the next quote picks up the new prices straight away
+            invalidate_pricing_config_cache()
                 
             st.success("Pricing configuration saved successfully!")
     
@@ -5,9 +5,10 @@ import os
 import uuid
 import base64
 from datetime import datetime
-from utils.database import get_quotes_from_db, update_quote_status, get_quote_by_id, get_db_connection, Quote, update, update_sent_to_customer
+from utils.database import get_quotes_from_db, get_next_cursor, count_quotes, get_quote_filter_options, update_quote_status, get_quote_by_id, invalidate_quote_cache, get_db_connection, Quote, update, update_sent_to_customer
 from utils.email_service import send_customer_email, send_business_email
 from utils.excel_export import create_excel_download_button, download_dataframe_as_excel
+from utils.pricing import minimum_cleaners
 
 # Set page title and configure page
 st.set_page_config(
@@ -24,11 +25,52 @@ with col2:
     st.title("Quotes Database")
     st.markdown("View and manage all quotes in the database")
 
+# Number of quotes loaded per page
+PAGE_SIZE_OPTIONS = [25, 50, 100, 250]
+
+# Columns the quotes table needs; the selected quote's details load its full row
+QUOTE_LIST_COLUMNS = [
+    "quote_id", "timestamp", "status", "admin_created", "sent_to_customer",
+    "customer_name", "customer_email", "customer_phone", "customer_address", "customer_postcode",
+    "referral_source", "referral_other",
+    "property_size", "region", "num_bathrooms", "num_reception_rooms",
+    "service_type", "cleaning_date", "cleanliness_level", "pet_status", "cleaner_preference",
+    "oven_clean", "carpet_cleaning", "carpet_rooms", "internal_windows",
+    "external_windows", "balcony_patio", "cleaning_materials",
+    "hours_required", "cleaners_required", "total_price"
+]
+
+def format_quotes_for_display(quotes_df):
+    """Return a copy of quotes with readable source, Yes/No, price, hours, date and time columns"""
+    display_df = quotes_df.copy()
+    
+    # Convert boolean admin_created to a more readable indicator
+    display_df["source"] = display_df["admin_created"].apply(
+        lambda x: "Admin" if x else "Customer"
+    )
+    
+    # Convert boolean columns to more readable Yes/No
+    for col in ["oven_clean", "carpet_cleaning", "internal_windows", "external_windows", 
+                "balcony_patio", "cleaning_materials", "sent_to_customer"]:
+        display_df[col] = display_df[col].apply(lambda x: "Yes" if x else "No")
+    
+    # Format price and hour columns
+    display_df["total_price"] = display_df["total_price"].apply(lambda x: f"£{x:.2f}")
+    display_df["hours_required"] = display_df["hours_required"].apply(lambda x: f"{x:.2f}")
+    
+    # Split timestamp into date and time columns
+    # First convert to datetime if it's not already
+    display_df["timestamp"] = pd.to_datetime(display_df["timestamp"])
+    # Create separate date and time columns
+    display_df["date"] = display_df["timestamp"].dt.strftime("%d/%m/%Y")
+    display_df["time"] = display_df["timestamp"].dt.strftime("%H:%M")
+    return display_df
+
 # Get quotes from database
 try:
-    quotes_df = get_quotes_from_db()
+    filter_options = get_quote_filter_options()
     
-    if len(quotes_df) == 0:
+    if not filter_options.get("status"):
         st.info("No quotes found in the database.")
     else:
         # Add filters
@@ -38,64 +80,92 @@ try:
         with col1:
             status_filter = st.multiselect(
                 "Status", 
-                options=["All"] + sorted(quotes_df["status"].unique().tolist()),
+                options=["All"] + filter_options["status"],
                 default="All"
             )
             
         with col2:
             service_filter = st.multiselect(
                 "Service Type", 
-                options=["All"] + sorted(quotes_df["service_type"].unique().tolist()),
+                options=["All"] + filter_options["service_type"],
                 default="All"
             )
             
         with col3:
             region_filter = st.multiselect(
                 "Region", 
-                options=["All"] + sorted(quotes_df["region"].unique().tolist()),
+                options=["All"] + filter_options["region"],
                 default="All"
             )
         
-        # Apply filters
-        filtered_df = quotes_df.copy()
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            date_range = st.date_input("Created between", value=(), format="DD/MM/YYYY")
+        
+        with col2:
+            # Search by quote ID (matched in the database, not just on this page)
+            search_query = st.text_input("Search quote ID:", placeholder="Type to filter quotes")
+        
+        with col3:
+            page_size = st.selectbox("Quotes per page", options=PAGE_SIZE_OPTIONS, index=1)
         
+        # Build the database filters
+        filters = {}
         if status_filter and "All" not in status_filter:
-            filtered_df = filtered_df[filtered_df["status"].isin(status_filter)]
+            filters["status"] = status_filter
             
         if service_filter and "All" not in service_filter:
-            filtered_df = filtered_df[filtered_df["service_type"].isin(service_filter)]
+            filters["service_type"] = service_filter
             
         if region_filter and "All" not in region_filter:
-            filtered_df = filtered_df[filtered_df["region"].isin(region_filter)]
+            filters["region"] = region_filter
         
-        # Display quotes table
-        st.subheader("Quotes")
+        start_date = date_range[0] if len(date_range) > 0 else None
+        # The end date is inclusive in the picker, so query up to the following midnight
+        end_date = pd.Timestamp(date_range[1]) + pd.Timedelta(days=1) if len(date_range) > 1 else None
         
-        # Make a copy to modify for display purposes
-        display_df = filtered_df.copy()
+        # Keyset pagination: remember the cursor of every page we've visited,
+        # and start again from the first page whenever the filters change
+        filter_key = (repr(filters), start_date, end_date, search_query, page_size)
+        if st.session_state.get("quotes_filter_key") != filter_key:
+            st.session_state.quotes_filter_key = filter_key
+            st.session_state.quotes_page_cursors = [None]
+        page_cursors = st.session_state.quotes_page_cursors
         
-        # Convert boolean admin_created to a more readable indicator
-        display_df["source"] = display_df["admin_created"].apply(
-            lambda x: "Admin" if x else "Customer"
+        filtered_df = get_quotes_from_db(
+            filters=filters, columns=QUOTE_LIST_COLUMNS, start_date=start_date, end_date=end_date,
+            search=search_query, cursor=page_cursors[-1], limit=page_size, categorical=True
         )
+        next_cursor = get_next_cursor(filtered_df, page_size)
+        total_matching = count_quotes(filters=filters, start_date=start_date, end_date=end_date, search=search_query)
         
-        # Convert boolean columns to more readable Yes/No
-        for col in ["oven_clean", "carpet_cleaning", "internal_windows", "external_windows", 
-                    "balcony_patio", "cleaning_materials", "sent_to_customer"]:
-            display_df[col] = display_df[col].apply(lambda x: "Yes" if x else "No")
+        # Page navigation
+        page_number = len(page_cursors)
+        nav_col1, nav_col2, nav_col3 = st.columns([1, 3, 1])
+        with nav_col1:
+            if st.button("← Newer", disabled=page_number == 1):
+                page_cursors.pop()
+                st.rerun()
+        with nav_col2:
+            first_row = (page_number - 1) * page_size + 1
+            st.write(f"Showing {first_row if len(filtered_df) else 0}-{first_row + len(filtered_df) - 1} of {total_matching} matching quotes")
+        with nav_col3:
+            if st.button("Older →", disabled=next_cursor is None):
+                page_cursors.append(next_cursor)
+                st.rerun()
         
-        # Format price and hour columns
-        display_df["total_price"] = display_df["total_price"].apply(lambda x: f"£{x:.2f}")
-        display_df["hours_required"] = display_df["hours_required"].apply(lambda x: f"{x:.2f}")
+        if len(filtered_df) == 0:
+            st.info("No quotes match these filters.")
+            st.stop()
         
-        # Split timestamp into date and time columns
-        # First convert to datetime if it's not already
-        display_df["timestamp"] = pd.to_datetime(display_df["timestamp"])
-        # Create separate date and time columns
-        display_df["date"] = display_df["timestamp"].dt.strftime("%d/%m/%Y")
-        display_df["time"] = display_df["timestamp"].dt.strftime("%H:%M")
+        # Display quotes table
+        st.subheader("Quotes")
+        
+        # Make a copy to modify for display purposes
+        display_df = format_quotes_for_display(filtered_df)
         
-        # Select all columns to display in the main table, removing "time_preference"
+        # Columns to display in the main table (notes are shown with the quote details)
         display_columns = [
             # Quote info
             "quote_id", "date", "time", "status", "source", "sent_to_customer",
@@ -109,17 +179,13 @@ try:
             
             # Service info
             "service_type", "cleaning_date", "cleanliness_level", "pet_status", "cleaner_preference", 
-            "customer_notes",
             
             # Additional services
             "oven_clean", "carpet_cleaning", "carpet_rooms", "internal_windows", 
             "external_windows", "balcony_patio", "cleaning_materials",
             
             # Price details
-            "hours_required", "cleaners_required", "total_price",
-            
-            # Admin details
-            "admin_notes"
+            "hours_required", "cleaners_required", "total_price"
         ]
         
         # Show the display dataframe with our formatted columns and frozen headers
@@ -130,62 +196,69 @@ try:
             column_config={col: st.column_config.Column(col) for col in display_columns}  # Ensure column headers are visible
         )
         
-        # Add Excel download button
-        excel_file = io.BytesIO()
-        with pd.ExcelWriter(excel_file, engine="xlsxwriter") as writer:
-            # Create full export with all columns
-            display_df.to_excel(writer, sheet_name="All Quotes", index=False)
-            # Add formatting
-            workbook = writer.book
-            worksheet = writer.sheets["All Quotes"]
-            # Add header format
-            header_format = workbook.add_format({'bold': True, 'bg_color': '#22C7D6', 'color': 'white'})
-            for col_num, value in enumerate(display_df.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            # Auto-adjust columns' width
-            for i, col in enumerate(display_df.columns):
-                # Find the maximum length of any entry in this column
-                max_len = max(display_df[col].astype(str).apply(len).max(), len(str(col)) + 2)
-                worksheet.set_column(i, i, max_len)
-        
-        excel_file.seek(0)
-        
         # Excel export section
         st.markdown("### Export Quote Data")
         
-        # Generate timestamp for unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Create a simpler CSV approach that's more reliable
-        csv_data = display_df.to_csv(index=False).encode('utf-8')
-        
-        # Use Streamlit's download button with CSV data
-        st.download_button(
-            label="📥 Download CSV Report",
-            data=csv_data,
-            file_name="KMI_Quote_Dashboard.csv",
-            mime="text/csv"
-        )
-        
-        st.info("""
-        **CSV Download Instructions:**
-        1. Click the 'Download CSV Report' button above to download the quote data
-        2. The CSV file can be opened in Excel, Google Sheets, or any spreadsheet program
-        3. For more detailed analysis, you can use the text export below to copy and paste into Excel
-        """)
-        
-        # Alternative CSV approach
-        st.markdown("#### Alternative: Copy-Paste CSV Data")
-        
-        # Create CSV data
-        csv_string = display_df.to_csv(index=False)
-        
-        # Display CSV in a text area
-        st.text_area(
-            "Or select this text (Ctrl+A), then copy (Ctrl+C) to paste into Excel:",
-            csv_string,
-            height=200
-        )
+        # Exports cover every matching quote and column (notes included), not just
+        # this page, so they're only loaded when asked for
+        if st.checkbox(f"Prepare an export of all {total_matching} matching quotes", key="prepare_export"):
+            export_df = format_quotes_for_display(get_quotes_from_db(
+                filters=filters, start_date=start_date, end_date=end_date, search=search_query
+            ))
+            
+            # Add Excel download button
+            excel_file = io.BytesIO()
+            with pd.ExcelWriter(excel_file, engine="xlsxwriter") as writer:
+                # Create full export with all columns
+                export_df.to_excel(writer, sheet_name="All Quotes", index=False)
+                # Add formatting
+                workbook = writer.book
+                worksheet = writer.sheets["All Quotes"]
+                # Add header format
+                header_format = workbook.add_format({'bold': True, 'bg_color': '#22C7D6', 'color': 'white'})
+                for col_num, value in enumerate(export_df.columns.values):
+                    worksheet.write(0, col_num, value, header_format)
+                # Auto-adjust columns' width
+                for i, col in enumerate(export_df.columns):
+                    # Find the maximum length of any entry in this column
+                    max_len = max(export_df[col].map(lambda value: len(str(value))).max(), len(str(col)) + 2)
+                    worksheet.set_column(i, i, max_len)
+            
+            excel_file.seek(0)
+            
+            # Generate timestamp for unique filename
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            
+            # Create a simpler CSV approach that's more reliable
+            csv_data = export_df.to_csv(index=False).encode('utf-8')
+            
+            # Use Streamlit's download button with CSV data
+            st.download_button(
+                label="📥 Download CSV Report",
+                data=csv_data,
+                file_name="KMI_Quote_Dashboard.csv",
+                mime="text/csv"
+            )
+            
+            st.info("""
+            **CSV Download Instructions:**
+            1. Click the 'Download CSV Report' button above to download the quote data
+            2. The CSV file can be opened in Excel, Google Sheets, or any spreadsheet program
+            3. For more detailed analysis, you can use the text export below to copy and paste into Excel
+            """)
+            
+            # Alternative CSV approach
+            st.markdown("#### Alternative: Copy-Paste CSV Data")
+            
+            # Create CSV data
+            csv_string = export_df.to_csv(index=False)
+            
+            # Display CSV in a text area
+            st.text_area(
+                "Or select this text (Ctrl+A), then copy (Ctrl+C) to paste into Excel:",
+                csv_string,
+                height=200
+            )
         
         # Add a clear separator
         st.markdown("---")
@@ -193,17 +266,9 @@ try:
         # Quote details section
         st.subheader("Quote Details")
         
-        # Improved quote selection with search and newest first ordering
-        quote_options = filtered_df.sort_values("timestamp", ascending=False)["quote_id"].tolist()
-        
-        # Add a text input for searching quotes by ID
-        search_query = st.text_input("Search quote ID:", placeholder="Type to filter quotes")
-        
-        # Filter the options based on search query
-        if search_query:
-            filtered_options = [qid for qid in quote_options if search_query.lower() in qid.lower()]
-        else:
-            filtered_options = quote_options
+        # Quotes on this page, newest first (the search filter is already applied in the query)
+        quote_options = filtered_df["quote_id"].tolist()
+        filtered_options = quote_options
             
         # Display top 5 most recent quotes as radio buttons for easy access
         st.write("Quick select recent quotes:")
@@ -226,10 +291,16 @@ try:
         if quick_select and quick_select != selected_quote_id:
             selected_quote_id = quick_select
         
+        selected_quote = None
         if selected_quote_id:
-            # Get the selected quote
-            selected_quote = filtered_df[filtered_df["quote_id"] == selected_quote_id].iloc[0]
-            
+            # Get the selected quote's full row (the table only loads QUOTE_LIST_COLUMNS)
+            quote_row = get_quote_by_id(selected_quote_id)
+            if quote_row is None:
+                st.warning(f"Quote {selected_quote_id} could not be found. It may have been deleted.")
+            else:
+                selected_quote = pd.Series(quote_row)
+        
+        if selected_quote is not None:
             # Display quote details
             col1, col2, col3 = st.columns(3)
             
@@ -296,6 +367,12 @@ try:
             if selected_quote["cleaning_materials"]:
                 st.write("- Cleaning Materials Included")
             
+            # Free-text notes
+            if selected_quote.get("customer_notes"):
+                st.write(f"**Customer Notes:** {selected_quote['customer_notes']}")
+            if selected_quote.get("admin_notes"):
+                st.write(f"**Admin Notes:** {selected_quote['admin_notes']}")
+            
             # Price details section
             st.markdown("### Price Details")
             
@@ -383,8 +460,13 @@ try:
                         
                         cleaner_options = []
                         if hours_required <= 6:  # Only show options for reasonable durations
+                            # Skip crews too small to finish within the 7.5 hour working day
+                            smallest_crew = minimum_cleaners(hours_required * current_cleaners)
+                            
                             # Calculate variations
                             for num_cleaners in range(1, 4):  # 1 to 3 cleaners
+                                if num_cleaners < smallest_crew and num_cleaners != current_cleaners:
+                                    continue
                                 if num_cleaners == current_cleaners:
                                     # This is the default option
                                     time_needed = hours_required
@@ -451,12 +533,14 @@ try:
                         # Confirm scheduling button
                         if availability_confirmed:
                             if st.button("Confirm Scheduling", key="schedule_btn", type="primary"):
-                                # Update quote status to scheduled
-                                update_quote_status(selected_quote_id, "Scheduled")
-                                
                                 # Get quote data
                                 quote_data = get_quote_by_id(selected_quote_id)
-                                if quote_data:
+                                if quote_data is None:
+                                    st.warning(f"Quote {selected_quote_id} could not be found. It may have been deleted.")
+                                else:
+                                    # Update quote status to scheduled
+                                    update_quote_status(selected_quote_id, "Scheduled")
+                                    
                                     # Update cleaning date and time in the database
                                     engine = get_db_connection()
                                     with engine.connect() as connection:
@@ -467,6 +551,7 @@ try:
                                         )
                                         connection.execute(stmt)
                                         connection.commit()
+                                    invalidate_quote_cache(selected_quote_id)
                                     
                                     # Update CSV file
                                     from utils.data_storage import update_csv_field
@@ -486,6 +571,7 @@ try:
                                                 )
                                                 connection.execute(stmt)
                                                 connection.commit()
+                                            invalidate_quote_cache(selected_quote_id)
                                         except Exception as e:
                                             # If the column doesn't exist yet, just log the error
                                             print(f"Could not update assigned_cleaner in database: {str(e)}")
@@ -712,7 +798,7 @@ try:
                     # Display success message(s)
                     st.success(f"Quote {selected_quote_id}: {' and '.join(success_messages)}.")
                 else:
-                    st.error(f"Could not retrieve quote data for {selected_quote_id}.")
+                    st.warning(f"Quote {selected_quote_id} could not be found. It may have been deleted.")
                         
 except Exception as e:
     st.error(f"Error retrieving quotes: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Headless Quote Pricing Service
+
+A small JSON-over-HTTP/1.1 server that prices quotes with the same engine
+as the Streamlit app, for the website and phone-booking tools. It runs on
+asyncio from the standard library, keeps connections alive (and accepts
+pipelined requests), and prices inline from the warm in-process config
+and quote caches.
+
+Endpoints:
+    GET  /health   -> {"status": "ok", "config_version": ...}
+    POST /quote    body: quote_data (property_info + service_info, as built by app.py)
+                   -> {"price_details": {...}}
+    POST /quotes   body: {"quotes": [quote_data, ...]}
+                   -> {"results": [{"price_details": {...}} or {"error": "..."}, ...]}
+
+Run it next to the app (from the project root so config/ is found):
+    python pricing_service.py --host 0.0.0.0 --port 8502
+
+Set PRICING_SERVICE_API_KEY to require a matching X-API-Key header.
+"""
+
+import os
+import hmac
+import json
+import asyncio
+import argparse
+import datetime
+from utils.pricing import (
+    calculate_price_cached,
+    get_compiled_pricing,
+    get_pricing_config_version,
+    get_price_cache_stats
+)
+from utils.price_cube import get_price_from_cube
+
+DEFAULT_HOST = os.getenv("PRICING_SERVICE_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("PRICING_SERVICE_PORT", "8502"))
+API_KEY = os.getenv("PRICING_SERVICE_API_KEY")
+
+# Request limits
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = int(os.getenv("PRICING_SERVICE_MAX_BODY_BYTES", str(4 * 1024 * 1024)))
+MAX_BATCH_SIZE = int(os.getenv("PRICING_SERVICE_MAX_BATCH_SIZE", "5000"))
+
+# Close idle keep-alive connections after this many seconds
+KEEP_ALIVE_TIMEOUT = 30
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error"
+}
+
+class RequestError(Exception):
+    """Raised for a request that should get an HTTP error response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# Room counts the pricing engine reads with int(), which would silently truncate 2.5 to 2
+ROOM_COUNT_FIELDS = [
+    ("property_info", "num_bathrooms"),
+    ("property_info", "num_reception_rooms"),
+    ("service_info", "additional_services", "carpet_rooms")
+]
+
+def check_room_counts(quote_data):
+    """Raise RequestError unless every room count is a JSON integer"""
+    for field_path in ROOM_COUNT_FIELDS:
+        value = quote_data
+        for key in field_path:
+            value = value[key]
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise RequestError(400, f"{field_path[-1]} must be a whole number, got {json.dumps(value)}")
+
+def price_quote(quote_data):
+    """Return price_details for one quote_data dict"""
+    if not isinstance(quote_data, dict):
+        raise RequestError(400, "Each quote must be a JSON object")
+    try:
+        check_room_counts(quote_data)
+        return get_price_from_cube(quote_data) or calculate_price_cached(quote_data)
+    except KeyError as e:
+        raise RequestError(400, f"Missing or unknown value: {str(e)}")
+    except (TypeError, ValueError) as e:
+        raise RequestError(400, f"Invalid quote: {str(e)}")
+
+def price_quotes(quotes):
+    """Price a batch, reporting errors per quote instead of failing the whole batch"""
+    if not isinstance(quotes, list):
+        raise RequestError(400, "'quotes' must be a list")
+    if len(quotes) > MAX_BATCH_SIZE:
+        raise RequestError(413, f"At most {MAX_BATCH_SIZE} quotes per batch")
+
+    results = []
+    for quote_data in quotes:
+        try:
+            results.append({"price_details": price_quote(quote_data)})
+        except RequestError as e:
+            results.append({"error": str(e)})
+    return results
+
+def handle_request(method, path, body):
+    """Route a request and return (status, response dict)"""
+    path = path.split("?", 1)[0]
+
+    if path == "/health":
+        if method != "GET":
+            raise RequestError(405, "Use GET")
+        return 200, {
+            "status": "ok",
+            "config_version": get_pricing_config_version(),
+            "price_cache": get_price_cache_stats()
+        }
+
+    if path not in ("/quote", "/quotes"):
+        raise RequestError(404, f"No such endpoint: {path}")
+    if method != "POST":
+        raise RequestError(405, "Use POST")
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise RequestError(400, "Request body must be JSON")
+
+    if path == "/quote":
+        return 200, {"price_details": price_quote(payload)}
+
+    if not isinstance(payload, dict):
+        raise RequestError(400, "Expected {\"quotes\": [...]}")
+    return 200, {"results": price_quotes(payload.get("quotes"))}
+
+def encode_response(status, payload, keep_alive):
+    """Serialise a JSON response with its HTTP/1.1 headers"""
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Error')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"\r\n"
+    )
+    return head.encode("latin-1") + body
+
+def is_authorised(headers):
+    """Check the X-API-Key header against API_KEY in constant time"""
+    # Headers are decoded as latin-1, so re-encoding recovers the bytes the client sent
+    supplied = headers.get("x-api-key", "").encode("latin-1")
+    return hmac.compare_digest(supplied, API_KEY.encode("utf-8"))
+
+class PricingProtocol(asyncio.Protocol):
+    """One client connection: parses pipelined HTTP/1.1 requests and answers them in order"""
+
+    def __init__(self):
+        self.transport = None
+        self.buffer = bytearray()
+        self.idle_timer = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.reset_idle_timer()
+
+    def connection_lost(self, exc):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+
+    def reset_idle_timer(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        loop = asyncio.get_running_loop()
+        self.idle_timer = loop.call_later(KEEP_ALIVE_TIMEOUT, self.transport.close)
+
+    def data_received(self, data):
+        self.buffer += data
+        self.reset_idle_timer()
+
+        responses = []
+        keep_alive = True
+        while keep_alive:
+            header_end = self.buffer.find(b"\r\n\r\n")
+            if header_end < 0:
+                if len(self.buffer) > MAX_HEADER_BYTES:
+                    responses.append(encode_response(413, {"error": "Headers too large"}, False))
+                    keep_alive = False
+                break
+
+            try:
+                method, path, version, headers = self.parse_head(bytes(self.buffer[:header_end]))
+                content_length = int(headers.get("content-length", "0"))
+                if content_length < 0 or "transfer-encoding" in headers:
+                    raise ValueError("Only Content-Length bodies are supported")
+            except ValueError:
+                responses.append(encode_response(400, {"error": "Malformed request"}, False))
+                keep_alive = False
+                break
+
+            if content_length > MAX_BODY_BYTES:
+                responses.append(encode_response(413, {"error": "Request body too large"}, False))
+                keep_alive = False
+                break
+
+            body_start = header_end + 4
+            if len(self.buffer) < body_start + content_length:
+                break  # Wait for the rest of the body
+            body = bytes(self.buffer[body_start:body_start + content_length])
+            del self.buffer[:body_start + content_length]
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+            responses.append(encode_response(*self.respond(method, path, headers, body), keep_alive))
+
+        if responses:
+            self.transport.write(b"".join(responses))
+        if not keep_alive:
+            self.transport.close()
+
+    @staticmethod
+    def parse_head(head):
+        """Split the request line and headers (raises ValueError if malformed)"""
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, version = lines[0].split(" ")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return method, path, version, headers
+
+    @staticmethod
+    def respond(method, path, headers, body):
+        """Return (status, payload) for one parsed request"""
+        if API_KEY and not is_authorised(headers):
+            return 401, {"error": "Invalid or missing API key"}
+        try:
+            return handle_request(method, path, body)
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            print(f"Error handling {method} {path}: {str(e)}")
+            return 500, {"error": "Internal error"}
+
+def warm_up():
+    """Load the pricing config and compiled tables before taking traffic"""
+    get_compiled_pricing()
+    print(f"Pricing config version {get_pricing_config_version()} loaded")
+
+async def serve(host, port):
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(PricingProtocol, host, port, reuse_address=True)
+    print(f"Pricing service listening on http://{host}:{port} (started {datetime.datetime.now()})")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the quote pricing HTTP service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    warm_up()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Pricing service stopped")
+
+if __name__ == "__main__":
+    main()
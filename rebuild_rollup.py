@@ -0,0 +1,40 @@
+"""
+Dashboard Rollup Rebuild
+
+Recomputes the quote_daily_rollup table from the quotes table, for
+backfilling after a bulk import or a change made outside the app. With
+--check it only compares the rollup against a fresh aggregation and exits
+with status 1 if any row differs. Uses the same DATABASE_URL / ENV
+settings as the app:
+python rebuild_rollup.py [--check]
+"""
+
+import sys
+import argparse
+from utils.database import get_db_connection, rebuild_quote_rollup, check_quote_rollup
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or check the dashboard's daily quote rollup")
+    parser.add_argument("--check", action="store_true", help="compare only; don't rewrite the rollup")
+    args = parser.parse_args()
+
+    engine = get_db_connection()
+    if args.check:
+        with engine.connect() as connection:
+            mismatched = check_quote_rollup(connection)
+        if mismatched:
+            print(f"{len(mismatched)} rollup row(s) differ from the quotes table:")
+            for day, region, service_type, status in mismatched:
+                print(f" - {day} {region} / {service_type} / {status or '(no status)'}")
+            print("Run python rebuild_rollup.py to rebuild it")
+            return 1
+        print("Rollup matches the quotes table")
+        return 0
+
+    with engine.begin() as connection:
+        rows = rebuild_quote_rollup(connection)
+    print(f"Rebuilt quote_daily_rollup: {rows} rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Shared pytest setup
+
+The app's modules are imported from the project root and read their
+config from paths relative to it (config/pricing_config.json), so the
+tests run from there whatever directory pytest was started in.
+"""
+
+import os
+import sys
+import shutil
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "benchmarks"))
+
+@pytest.fixture(autouse=True)
+def project_root(monkeypatch):
+    """Run each test from the project root"""
+    monkeypatch.chdir(PROJECT_ROOT)
+    return PROJECT_ROOT
+
+@pytest.fixture
+def quote_store(tmp_path, monkeypatch):
+    """An empty CSV quote store (data/ under tmp_path), with utils.data_storage's in-memory index reset"""
+    from utils import data_storage
+
+    (tmp_path / "config").mkdir()
+    shutil.copy(os.path.join(PROJECT_ROOT, "config", "pricing_config.json"), tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("QUOTE_STORE_BACKEND", "csv")
+    monkeypatch.setattr(data_storage, "_quote_index", {"csv_signature": None, "csv_header": None, "rows": {}, "logs": {}})
+    data_storage.initialize_csv_if_needed()
+    return data_storage
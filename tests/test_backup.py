@@ -0,0 +1,50 @@
+"""
+Backups export the active quote store through utils.data_storage and
+don't upload a quotes.csv the Parquet store has left behind
+"""
+
+import pandas as pd
+import pytest
+
+from fixtures import make_quote_data
+from utils import backup_to_drive
+
+class FakeDrive:
+    """Records the names of the files uploaded through files().create()"""
+
+    def __init__(self):
+        self.uploaded = []
+
+    def files(self):
+        return self
+
+    def create(self, body, media_body, fields):
+        self.uploaded.append(body["name"])
+        return self
+
+    def execute(self):
+        return {"id": str(len(self.uploaded))}
+
+@pytest.mark.parametrize("backend", ["csv", "parquet"])
+def test_backup_exports_the_active_store(quote_store, monkeypatch, backend):
+    if backend == "parquet":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setenv("QUOTE_STORE_BACKEND", backend)
+    for number in range(3):
+        quote_data = make_quote_data(number)
+        quote_data["quote_id"] = f"QBACKUP{number}"
+        quote_store.save_quote_to_csv(quote_data)
+    quote_store.compact_quote_events()
+    # Still in the event log when the backup runs
+    quote_store.update_csv_status("QBACKUP1", "Scheduled")
+
+    export_path = backup_to_drive.export_quote_store_to_csv()
+    exported = pd.read_csv(export_path).set_index("quote_id")
+    assert sorted(exported.index) == ["QBACKUP0", "QBACKUP1", "QBACKUP2"]
+    assert exported.loc["QBACKUP1", "status"] == "Scheduled"
+
+    drive = FakeDrive()
+    monkeypatch.setattr(backup_to_drive, "authenticate_drive", lambda: drive)
+    assert backup_to_drive.backup_csv_to_drive()
+    assert any(name.startswith("quote_store_export_") for name in drive.uploaded)
+    assert any(name.startswith("quotes_2") for name in drive.uploaded) == (backend == "csv")
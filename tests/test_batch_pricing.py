@@ -0,0 +1,133 @@
+"""
+calculate_prices_batch must price every row exactly as calculate_price does
+"""
+
+import random
+
+import pandas as pd
+import pytest
+
+import utils.money
+from utils.money import to_pennies
+from utils.pricing import calculate_price, get_compiled_pricing
+from utils.batch_pricing import calculate_prices_batch, PRICE_DETAIL_COLUMNS, MONEY_COLUMNS
+
+ADD_ONS = ["oven_clean", "carpet_cleaning", "internal_windows", "external_windows", "balcony_patio"]
+
+def random_quote(rng):
+    """Return a quote_data dict with every pricing input drawn at random"""
+    compiled = get_compiled_pricing()
+    additional_services = {add_on: rng.random() < 0.4 for add_on in ADD_ONS}
+    additional_services["carpet_rooms"] = rng.randint(1, 6) if additional_services["carpet_cleaning"] else 0
+    return {
+        "property_info": {
+            "region": rng.choice(compiled.regions),
+            "property_size": rng.choice(compiled.property_sizes),
+            "num_bathrooms": rng.randint(1, 4),
+            "num_reception_rooms": rng.randint(1, 3)
+        },
+        "service_info": {
+            "service_type": rng.choice(compiled.service_types),
+            # Levels the config doesn't know price at 1.0, in both paths
+            "cleanliness_level": rng.choice(list(compiled.cleanliness_levels) + ["Spotless"]),
+            "pet_status": rng.choice(list(compiled.pet_statuses) + ["Reptile"]),
+            "additional_services": additional_services,
+            "cleaning_materials": rng.random() < 0.5
+        }
+    }
+
+def flat_row(quote_data):
+    """Flatten a quote_data dict into a quotes-table row"""
+    property_info = quote_data["property_info"]
+    service_info = quote_data["service_info"]
+    return {
+        **property_info,
+        **service_info["additional_services"],
+        "service_type": service_info["service_type"],
+        "cleanliness_level": service_info["cleanliness_level"],
+        "pet_status": service_info["pet_status"],
+        "cleaning_materials": service_info["cleaning_materials"]
+    }
+
+def random_quotes(seed, count=500):
+    rng = random.Random(seed)
+    quotes = [random_quote(rng) for _ in range(count)]
+    return quotes, pd.DataFrame([flat_row(quote_data) for quote_data in quotes])
+
+@pytest.fixture
+def pennies_mode(monkeypatch):
+    monkeypatch.setattr(utils.money, "PRICING_MONEY_MODE", "pennies")
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_matches_scalar_in_float_mode(seed):
+    quotes, frame = random_quotes(seed)
+    prices = calculate_prices_batch(frame)
+    for row, quote_data in enumerate(quotes):
+        expected = calculate_price(quote_data)
+        for column in PRICE_DETAIL_COLUMNS:
+            assert prices[column].iloc[row] == pytest.approx(expected[column], rel=1e-12), (row, column)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_matches_scalar_in_pennies_mode(seed, pennies_mode):
+    quotes, frame = random_quotes(seed)
+    prices = calculate_prices_batch(frame)
+    for row, quote_data in enumerate(quotes):
+        expected = calculate_price(quote_data)
+        for column in MONEY_COLUMNS:
+            # Whole pennies on both sides, so these must agree exactly
+            assert prices[column].iloc[row] == expected[column], (row, column)
+        assert prices["cleaners_required"].iloc[row] == expected["cleaners_required"], row
+        assert prices["hours_required"].iloc[row] == pytest.approx(expected["hours_required"], rel=1e-12), row
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_pennies_flag_returns_integer_pennies(seed, pennies_mode):
+    quotes, frame = random_quotes(seed)
+    prices = calculate_prices_batch(frame, pennies=True)
+    for column in MONEY_COLUMNS:
+        assert prices[column].dtype == "int64"
+    for row, quote_data in enumerate(quotes):
+        expected = calculate_price(quote_data)
+        for column in MONEY_COLUMNS:
+            assert prices[column].iloc[row] == to_pennies(expected[column]), (row, column)
+
+def test_batch_keeps_the_frame_index():
+    _, frame = random_quotes(0, count=20)
+    frame.index = [f"Q{number}" for number in range(100, 120)]
+    assert list(calculate_prices_batch(frame).index) == list(frame.index)
+
+def test_empty_frame():
+    _, frame = random_quotes(0, count=1)
+    prices = calculate_prices_batch(frame.iloc[:0])
+    assert prices.empty
+    assert list(prices.columns) == PRICE_DETAIL_COLUMNS
+
+@pytest.mark.parametrize("column, value", [
+    ("region", "Atlantis"),
+    ("service_type", "Spring Clean"),
+    ("property_size", "Castle")
+])
+@pytest.mark.parametrize("pennies", [False, True])
+def test_unknown_value_raises(column, value, pennies):
+    quotes, frame = random_quotes(0, count=10)
+    frame.loc[3, column] = value
+    with pytest.raises(KeyError, match=value):
+        calculate_prices_batch(frame, pennies=pennies)
+    # calculate_price rejects the same quote
+    quotes[3]["property_info" if column in quotes[3]["property_info"] else "service_info"][column] = value
+    with pytest.raises(KeyError):
+        calculate_price(quotes[3])
+
+def test_size_missing_for_a_service_raises():
+    compiled = get_compiled_pricing()
+    service_type = compiled.service_types[0]
+    property_size = compiled.property_sizes[-1]
+    property_hours = dict(compiled.config["property_hours"])
+    # The size is still known (other services price it), just not for this service
+    property_hours[service_type] = {
+        size: hours for size, hours in property_hours[service_type].items() if size != property_size
+    }
+    pricing_config = {**compiled.config, "property_hours": property_hours}
+    frame = pd.DataFrame([{"region": compiled.regions[0], "service_type": service_type, "property_size": property_size}])
+    for pennies in (False, True):
+        with pytest.raises(KeyError, match="No pricing configured"):
+            calculate_prices_batch(frame, pricing_config=pricing_config, pennies=pennies)
@@ -0,0 +1,128 @@
+"""
+minimum_cleaners/allocate_cleaners (and their batch twins) must pick the
+same crew as the add-a-cleaner loop they replaced, for every input
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+import utils.pricing
+import utils.batch_pricing
+from utils.pricing import (
+    minimum_cleaners,
+    allocate_cleaners,
+    get_compiled_pricing,
+    PROPERTY_SIZE_CATEGORIES,
+    SIZE_CATEGORY_MEDIUM,
+    SIZE_CATEGORY_LARGE
+)
+from utils.batch_pricing import minimum_cleaners_batch, allocate_cleaners_batch
+
+# In allocate_cleaners_batch argument order
+ADD_ONS = ["oven_clean", "carpet_cleaning", "internal_windows", "external_windows"]
+
+# Hours per cleaner from a quarter hour to well past two working days, on a 1/20 hour grid
+HOURS = [step / 20 for step in range(5, 401)]
+CLEANERS = range(1, 9)
+MAX_HOURS = [4.0, 6.0, 7.0, 7.5, 8.0, 10.0]
+
+def loop_minimum_cleaners(total_labor_hours, at_least, max_hours):
+    """The original loop: add cleaners until each one's share fits in the day"""
+    cleaners_required = at_least
+    hours_required = total_labor_hours / cleaners_required
+    while hours_required > max_hours:
+        cleaners_required += 1
+        hours_required = total_labor_hours / cleaners_required
+    return cleaners_required, hours_required
+
+def loop_allocate_cleaners(total_labor_hours, property_size, service_type, additional_services, max_hours):
+    """The rule chain and loop calculate_price used before allocate_cleaners"""
+    recommended_cleaners = int(np.ceil(total_labor_hours / max_hours))
+    has_oven_clean = additional_services.get("oven_clean", False)
+    has_carpet_clean = additional_services.get("carpet_cleaning", False)
+    has_external_windows = additional_services.get("external_windows", False)
+    has_internal_windows = additional_services.get("internal_windows", False)
+    is_large_property = PROPERTY_SIZE_CATEGORIES.get(property_size, SIZE_CATEGORY_MEDIUM) == SIZE_CATEGORY_LARGE
+
+    if has_external_windows:
+        recommended_cleaners += 1
+    if has_oven_clean and (has_carpet_clean or has_external_windows):
+        recommended_cleaners = max(recommended_cleaners, 2)
+    if is_large_property and service_type == "Deep Clean":
+        recommended_cleaners = max(recommended_cleaners, 2)
+    if is_large_property and (bool(has_oven_clean) + bool(has_carpet_clean) + bool(has_external_windows) + bool(has_internal_windows)) >= 2:
+        recommended_cleaners = max(recommended_cleaners, 2)
+    if total_labor_hours > 15:
+        recommended_cleaners = max(recommended_cleaners, 3)
+    elif total_labor_hours > 7.5:
+        recommended_cleaners = max(recommended_cleaners, 2)
+    return loop_minimum_cleaners(total_labor_hours, recommended_cleaners, max_hours)
+
+@pytest.fixture(params=MAX_HOURS)
+def max_hours(request, monkeypatch):
+    """Run the test under each working-day length"""
+    monkeypatch.setattr(utils.pricing, "MAX_WORK_DAY_HOURS", request.param)
+    monkeypatch.setattr(utils.batch_pricing, "MAX_WORK_DAY_HOURS", request.param)
+    return request.param
+
+def reachable_labor_hours():
+    """Every total labor hours calculate_price can produce from the saved config"""
+    compiled = get_compiled_pricing()
+    totals = set()
+    for service_code, size_code in itertools.product(range(len(compiled.service_types)), range(len(compiled.property_sizes))):
+        hours = compiled.hours[service_code][size_code]
+        cleaners = compiled.cleaners[service_code][size_code]
+        if hours is None or cleaners is None:
+            continue
+        for cleanliness in (1.0, *compiled.cleanliness_multipliers):
+            for pet in (1.0, *compiled.pet_multipliers):
+                totals.add(hours * cleanliness * pet * cleaners)
+    return sorted(totals)
+
+def test_minimum_cleaners_matches_loop(max_hours):
+    totals = []
+    floors = []
+    expected = []
+    for hours, cleaners in itertools.product(HOURS, CLEANERS):
+        # The admin pages ask for the smallest crew for hours x current crew
+        total_labor_hours = hours * cleaners
+        for at_least in CLEANERS:
+            crew, _ = loop_minimum_cleaners(total_labor_hours, at_least, max_hours)
+            assert minimum_cleaners(total_labor_hours, at_least) == crew, (hours, cleaners, at_least)
+            totals.append(total_labor_hours)
+            floors.append(at_least)
+            expected.append(crew)
+        assert minimum_cleaners(total_labor_hours) == loop_minimum_cleaners(total_labor_hours, 1, max_hours)[0]
+    batch = minimum_cleaners_batch(np.array(totals), np.array(floors))
+    assert batch.tolist() == expected
+
+def test_minimum_cleaners_at_the_day_boundary(max_hours):
+    # Exact multiples of the day, and the floats either side of them
+    for crew in range(1, 50):
+        exact = crew * max_hours
+        for total_labor_hours in (np.nextafter(exact, 0), exact, np.nextafter(exact, np.inf)):
+            for at_least in (1, crew, crew + 1):
+                expected, _ = loop_minimum_cleaners(float(total_labor_hours), at_least, max_hours)
+                assert minimum_cleaners(float(total_labor_hours), at_least) == expected, (total_labor_hours, at_least)
+
+def test_allocate_cleaners_matches_loop(max_hours):
+    compiled = get_compiled_pricing()
+    totals = sorted(set(reachable_labor_hours()) | set(HOURS))
+    for property_size, service_type in itertools.product(compiled.property_sizes, compiled.service_types):
+        for flags in itertools.product([False, True], repeat=len(ADD_ONS)):
+            additional_services = dict(zip(ADD_ONS, flags))
+            allocated = [allocate_cleaners(total, property_size, service_type, additional_services) for total in totals]
+            expected = [loop_allocate_cleaners(total, property_size, service_type, additional_services, max_hours)
+                        for total in totals]
+            assert allocated == expected, (property_size, service_type, additional_services)
+
+            count = len(totals)
+            cleaners, hours = allocate_cleaners_batch(
+                np.array(totals),
+                np.full(count, PROPERTY_SIZE_CATEGORIES.get(property_size, SIZE_CATEGORY_MEDIUM) == SIZE_CATEGORY_LARGE),
+                np.full(count, service_type == "Deep Clean"),
+                *(np.full(count, additional_services[add_on]) for add_on in ADD_ONS)
+            )
+            assert list(zip(cleaners.tolist(), hours.tolist())) == expected, (property_size, service_type, additional_services)
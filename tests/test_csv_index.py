@@ -0,0 +1,98 @@
+"""
+The sidecar indexes must agree with a full scan of quotes.csv and the event log
+"""
+
+import os
+import csv
+
+import pandas as pd
+import pytest
+
+from fixtures import make_quote_data, make_quotes_frame
+from utils.csv_index import (
+    index_path_for,
+    load_csv_index,
+    read_csv_index,
+    read_csv_record,
+    scan_csv_offsets
+)
+
+def pandas_rows(csv_path):
+    """{quote_id: row of strings} by reading the whole CSV, as the store did before the index"""
+    quotes = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    return {row[0]: list(row) for row in quotes.itertuples(index=False)}
+
+def write_quotes(quote_store, frame):
+    frame.to_csv(quote_store.get_csv_path(), index=False, encoding="utf-8")
+    return quote_store.get_csv_path()
+
+def test_index_matches_full_scan(quote_store):
+    frame = make_quotes_frame(2000)
+    # Newlines, quotes and commas inside fields, and text that isn't ASCII
+    frame.loc[5, "customer_notes"] = 'Key under the mat,\nthen "ring twice"'
+    frame.loc[6, "customer_address"] = "Flat 2\r\nThe Old Mill"
+    frame.loc[7, "customer_name"] = "Zoë Müller-Øster"
+    csv_path = write_quotes(quote_store, frame)
+
+    index = load_csv_index(csv_path)
+    expected = pandas_rows(csv_path)
+    assert {quote_id: offset for quote_id, (offset, _) in index.items()} == scan_csv_offsets(csv_path)
+    assert set(index) == set(expected)
+    for quote_id, (offset, version) in index.items():
+        assert read_csv_record(csv_path, offset) == expected[quote_id]
+        assert version == 0
+    # The rebuilt sidecar is reused until the CSV changes
+    assert read_csv_index(csv_path) == index
+
+def test_stale_index_is_rebuilt(quote_store):
+    csv_path = write_quotes(quote_store, make_quotes_frame(50))
+    load_csv_index(csv_path)
+    write_quotes(quote_store, make_quotes_frame(80, seed=1))
+    assert read_csv_index(csv_path) is None
+    assert {quote_id: offset for quote_id, (offset, _) in load_csv_index(csv_path).items()} == scan_csv_offsets(csv_path)
+
+def test_older_column_order(quote_store):
+    frame = make_quotes_frame(100)
+    csv_path = write_quotes(quote_store, frame[list(reversed(frame.columns))])
+    offsets = scan_csv_offsets(csv_path)
+    assert set(offsets) == set(frame["quote_id"])
+    for quote_id, offset in offsets.items():
+        assert read_csv_record(csv_path, offset)[-1] == quote_id
+    assert quote_store._csv_quote_exists(frame["quote_id"].iloc[42])
+
+def test_compaction_keeps_index_in_step(quote_store):
+    csv_path = write_quotes(quote_store, make_quotes_frame(300))
+    quote_ids = pd.read_csv(csv_path, dtype=str)["quote_id"].tolist()
+    edits = {quote_ids[0]: 3, quote_ids[150]: 1}
+    for quote_id, count in edits.items():
+        for edit in range(count):
+            assert quote_store.update_csv_field(quote_id, "admin_notes", f"Zoë edit {edit}")
+    new_quote = make_quote_data(1)
+    new_quote["quote_id"] = "QNEW"
+    quote_store.save_quote_to_csv(new_quote)
+    assert quote_store._csv_quote_exists("QNEW")
+    assert not quote_store._csv_quote_exists("QMISSING")
+
+    assert quote_store.compact_quote_events() == 5
+    index = read_csv_index(csv_path)
+    assert index is not None
+    expected = pandas_rows(csv_path)
+    assert {quote_id: offset for quote_id, (offset, _) in index.items()} == scan_csv_offsets(csv_path)
+    for quote_id, (offset, version) in index.items():
+        assert read_csv_record(csv_path, offset) == expected[quote_id]
+        assert version == edits.get(quote_id, 0)
+    assert expected[quote_ids[0]][quote_store.CSV_HEADERS.index("admin_notes")] == "Zoë edit 2"
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_reads_non_ascii_quotes(quote_store, compact):
+    quote_data = make_quote_data(3)
+    quote_data["quote_id"] = "QUTF8"
+    quote_data["customer_info"]["name"] = "Siân Ó Ceallaigh"
+    quote_store.save_quote_to_csv(quote_data)
+    if compact:
+        quote_store.compact_quote_events()
+    with open(quote_store.get_csv_path(), newline="", encoding="utf-8") as file:
+        assert any("Siân Ó Ceallaigh" in row for row in csv.reader(file)) == compact
+    quotes = quote_store.get_quotes_dataframe()
+    assert quotes.loc[quotes["quote_id"] == "QUTF8", "customer_name"].tolist() == ["Siân Ó Ceallaigh"]
+    assert os.path.exists(index_path_for(quote_store.get_event_log_path())) != compact
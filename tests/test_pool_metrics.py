@@ -0,0 +1,37 @@
+"""
+MeteredQueuePool counters must add up when many threads share the pool
+"""
+
+import threading
+
+from sqlalchemy import text
+
+from utils import database
+from utils.database import get_db_connection, get_pool_metrics
+
+def test_counters_add_up_across_threads(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "quotes.db"))
+    database.dispose_db_engines()
+    try:
+        engine = get_db_connection()
+        before = get_pool_metrics()
+
+        def worker():
+            for _ in range(200):
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        after = get_pool_metrics()
+        assert after["checkouts"] - before["checkouts"] == 8 * 200
+        assert after["checkins"] - before["checkins"] == 8 * 200
+        assert after["checked_out"] == 0
+        assert after["max_wait_seconds"] <= after["total_wait_seconds"]
+    finally:
+        database.dispose_db_engines()
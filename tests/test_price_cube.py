@@ -0,0 +1,23 @@
+"""
+Building a price cube for a new config version removes the older versions' directories
+"""
+
+import os
+
+from utils import price_cube
+from utils.pricing import get_compiled_pricing, get_pricing_config_version
+
+def test_new_cube_prunes_old_versions(tmp_path, monkeypatch):
+    cube_dir = str(tmp_path / "price_cube")
+    monkeypatch.setattr(price_cube, "CUBE_DIR", cube_dir)
+    compiled = get_compiled_pricing()
+    version = get_pricing_config_version()
+    cube = price_cube.build_price_cube(compiled)
+    price_cube.save_price_cube(cube, "0123456789ab")
+    os.makedirs(os.path.join(cube_dir, "0123456789ab.tmp999.1"))
+    # A write of the current version another process hasn't finished yet
+    os.makedirs(os.path.join(cube_dir, f"{version}.tmp999.2"))
+
+    price_cube._build_in_background(compiled, version)
+    assert sorted(os.listdir(cube_dir)) == sorted([version, f"{version}.tmp999.2"])
+    assert price_cube.load_price_cube(compiled, version) is not None
@@ -0,0 +1,46 @@
+"""
+pricing_service request handling: API key checks and room count validation
+"""
+
+import json
+
+import pytest
+
+import pricing_service
+from fixtures import make_quote_data
+from pricing_service import PricingProtocol
+
+def post_quote(quote_data, headers=None):
+    return PricingProtocol.respond("POST", "/quote", headers or {}, json.dumps(quote_data).encode("utf-8"))
+
+def test_api_key_is_required_when_set(monkeypatch):
+    monkeypatch.setattr(pricing_service, "API_KEY", "s3cret-kéy")
+    quote_data = make_quote_data(1)
+    assert post_quote(quote_data)[0] == 401
+    assert post_quote(quote_data, {"x-api-key": "s3cret"})[0] == 401
+    # parse_head decodes header bytes as latin-1
+    supplied = "s3cret-kéy".encode("utf-8").decode("latin-1")
+    assert post_quote(quote_data, {"x-api-key": supplied})[0] == 200
+
+@pytest.mark.parametrize("value", [2.5, 2.0, "2", True, None])
+@pytest.mark.parametrize("field", ["num_bathrooms", "num_reception_rooms", "carpet_rooms"])
+def test_non_integer_room_counts_are_rejected(field, value):
+    quote_data = make_quote_data(0)
+    if field == "carpet_rooms":
+        quote_data["service_info"]["additional_services"][field] = value
+    else:
+        quote_data["property_info"][field] = value
+    status, payload = post_quote(quote_data)
+    assert status == 400
+    assert field in payload["error"]
+
+def test_batch_reports_bad_room_counts_per_quote():
+    good = make_quote_data(0)
+    bad = make_quote_data(1)
+    bad["property_info"]["num_bathrooms"] = 1.5
+    status, payload = PricingProtocol.respond(
+        "POST", "/quotes", {}, json.dumps({"quotes": [good, bad]}).encode("utf-8")
+    )
+    assert status == 200
+    assert "price_details" in payload["results"][0]
+    assert "num_bathrooms" in payload["results"][1]["error"]
@@ -0,0 +1,31 @@
+"""
+The query plan check explains the app's own statements, and none of them
+scans the whole quotes table unless it is expected to
+"""
+
+from utils import database
+from utils.database import get_db_connection
+from utils.query_plans import check_query_plans, is_full_scan
+
+def test_no_unexpected_full_scans(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "quotes.db"))
+    database.dispose_db_engines()
+    try:
+        results = check_query_plans(get_db_connection())
+    finally:
+        database.dispose_db_engines()
+
+    names = [name for name, _, _, _ in results]
+    assert "save_quote_to_db: upsert" in names
+    assert "quote write: rollup deltas" in names
+    unexpected = [name for name, _, full_scan, expected in results if full_scan and not expected]
+    assert unexpected == []
+
+def test_is_full_scan():
+    assert is_full_scan(["SCAN quotes"])
+    assert is_full_scan(["SCAN quotes USING COVERING INDEX sqlite_autoindex_quotes_1"])
+    assert is_full_scan(["Seq Scan on quotes  (cost=0.00..35.50 rows=2550 width=4)"])
+    assert not is_full_scan(["SCAN quotes USING INDEX ix_quotes_timestamp"])
+    assert not is_full_scan(["SEARCH quotes USING INDEX ix_quotes_status_timestamp (status=?)"])
+    assert not is_full_scan(["SCAN quote_daily_rollup"])
@@ -0,0 +1,103 @@
+"""
+Quote IDs must be unique across threads and processes, and sort in creation order
+"""
+
+import os
+import threading
+import multiprocessing
+
+import pytest
+
+from utils import quote_ids
+from utils.quote_ids import generate_quote_id, generate_quote_ids
+
+@pytest.fixture
+def node_dir(tmp_path, monkeypatch):
+    """A fresh node directory, with this process's generator state reset to match"""
+    path = str(tmp_path / "quote_id_nodes")
+    monkeypatch.setenv("QUOTE_ID_NODE_DIR", path)
+    monkeypatch.setattr(quote_ids, "QUOTE_ID_NODE_DIR", path)
+    monkeypatch.setattr(quote_ids, "_id_state", {"node": None, "node_lock": None, "millisecond": 0, "sequence": 0})
+    yield path
+    if quote_ids._id_state["node_lock"] is not None:
+        os.close(quote_ids._id_state["node_lock"])
+
+def mint(barrier, results):
+    """Wait for every process to start, then mint single and bulk IDs and report them with this process's node"""
+    barrier.wait()
+    minted = [generate_quote_id() for _ in range(2000)]
+    minted += generate_quote_ids(30000)
+    minted += [generate_quote_id() for _ in range(2000)]
+    results.put((quote_ids._id_state["node"], minted))
+
+def run_processes(context, count):
+    barrier = context.Barrier(count)
+    results = context.Queue()
+    processes = [context.Process(target=mint, args=(barrier, results)) for _ in range(count)]
+    for process in processes:
+        process.start()
+    reported = [results.get(timeout=120) for _ in processes]
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    return reported
+
+def check_unique(reported):
+    nodes = [node for node, _ in reported]
+    assert len(set(nodes)) == len(nodes)
+    minted = [quote_id for _, ids in reported for quote_id in ids]
+    assert len(set(minted)) == len(minted)
+    for _, ids in reported:
+        assert ids == sorted(ids)
+        assert all(len(quote_id) == 22 and quote_id[1:].isdigit() for quote_id in ids)
+
+def test_ids_are_ordered_and_unique_across_threads(node_dir):
+    minted = {}
+
+    def worker(number):
+        minted[number] = [generate_quote_id() for _ in range(5000)] + generate_quote_ids(20000)
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    everything = [quote_id for ids in minted.values() for quote_id in ids]
+    assert len(set(everything)) == len(everything)
+    for ids in minted.values():
+        assert ids == sorted(ids)
+
+def test_running_processes_never_share_a_node(node_dir):
+    # Claiming nodes in one process uses the same locks as separate processes would
+    claimed = [quote_ids._claim_node() for _ in range(200)]
+    try:
+        assert len({node for node, _ in claimed}) == 200
+        assert all(descriptor is not None for _, descriptor in claimed)
+    finally:
+        for _, descriptor in claimed:
+            os.close(descriptor)
+
+def test_spawned_processes_mint_unique_ids(node_dir):
+    check_unique(run_processes(multiprocessing.get_context("spawn"), 6))
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_processes_claim_every_free_node(node_dir, monkeypatch):
+    # With as many nodes as processes, drawing nodes at random would all but certainly collide
+    monkeypatch.setattr(quote_ids, "NODE_LIMIT", 8)
+    generate_quote_id()
+    reported = run_processes(multiprocessing.get_context("fork"), 7)
+    check_unique(reported)
+    assert {node for node, _ in reported} | {quote_ids._id_state["node"]} == set(range(8))
+
+def test_next_holder_starts_after_ids_minted_ahead_of_the_clock(node_dir, monkeypatch):
+    # A bulk import runs the millisecond field ahead of the clock
+    ahead = generate_quote_ids(200000)
+    node = quote_ids._id_state["node"]
+    os.close(quote_ids._id_state["node_lock"])
+
+    # The next process to claim the node picks up where the last one got to
+    monkeypatch.setattr(quote_ids, "_id_state", {"node": None, "node_lock": None, "millisecond": 0, "sequence": 0})
+    monkeypatch.setattr(quote_ids, "_random_node", lambda: node)
+    following = generate_quote_id()
+    assert quote_ids._id_state["node"] == node
+    assert following > ahead[-1]
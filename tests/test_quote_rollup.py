@@ -0,0 +1,188 @@
+"""
+quote_daily_rollup, maintained by deltas from every quote write, must
+always equal a fresh aggregation of the quotes table
+"""
+
+import random
+import threading
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, select
+
+from fixtures import make_quote_data
+from utils import database
+from utils.database import (
+    Quote,
+    QuoteDailyRollup,
+    check_quote_rollup,
+    count_quotes,
+    get_db_connection,
+    get_quote_filter_options,
+    save_quote_to_db,
+    update_quote_status,
+    update_sent_to_customer
+)
+from utils.pricing import calculate_price, get_compiled_pricing
+
+STATUSES = ["Enquiry", "Quoted", "Schedule Requested", "Scheduled", "Completed", "Cancelled"]
+
+@pytest.fixture
+def sqlite_db(quote_store, tmp_path, monkeypatch):
+    """An empty SQLite database under tmp_path (the CSV mirror goes to quote_store)"""
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "quotes.db"))
+    database.dispose_db_engines()
+    yield get_db_connection()
+    database.dispose_db_engines()
+
+def random_quote(rng, number):
+    compiled = get_compiled_pricing()
+    quote_data = make_quote_data(number)
+    quote_data["quote_id"] = f"QROLLUP{number:06d}"
+    quote_data["status"] = rng.choice(STATUSES)
+    quote_data["sent_to_customer"] = rng.random() < 0.5
+    quote_data["property_info"]["region"] = rng.choice(compiled.regions)
+    quote_data["service_info"]["service_type"] = rng.choice(compiled.service_types)
+    for add_on in ("oven_clean", "carpet_cleaning", "internal_windows", "balcony_patio"):
+        quote_data["service_info"]["additional_services"][add_on] = rng.random() < 0.4
+    quote_data["price_details"] = calculate_price(quote_data)
+    return quote_data
+
+def assert_rollup_in_step(engine):
+    with engine.connect() as connection:
+        assert check_quote_rollup(connection) == []
+        rollup = QuoteDailyRollup.__table__
+        assert connection.execute(select(rollup).where(rollup.c.quote_count <= 0)).all() == []
+
+def test_rollup_follows_every_write(sqlite_db):
+    rng = random.Random(0)
+    quotes = [random_quote(rng, number) for number in range(60)]
+    for quote_data in quotes:
+        save_quote_to_db(quote_data)
+    assert_rollup_in_step(sqlite_db)
+
+    for _ in range(200):
+        quote_data = rng.choice(quotes)
+        action = rng.random()
+        if action < 0.4:
+            update_quote_status(quote_data["quote_id"], rng.choice(STATUSES))
+        elif action < 0.7:
+            update_sent_to_customer(quote_data["quote_id"], rng.random() < 0.5)
+        else:
+            # Re-saved with a new region, service, add-ons and price
+            resaved = random_quote(rng, int(quote_data["quote_id"][-6:]))
+            save_quote_to_db(resaved)
+    assert_rollup_in_step(sqlite_db)
+
+def test_moving_the_last_quote_empties_its_row(sqlite_db):
+    quote_data = random_quote(random.Random(1), 1)
+    quote_data["status"] = "Quoted"
+    save_quote_to_db(quote_data)
+    update_quote_status(quote_data["quote_id"], "Scheduled")
+    with sqlite_db.connect() as connection:
+        rows = connection.execute(select(QuoteDailyRollup.__table__)).all()
+    assert [(row.status, row.quote_count) for row in rows] == [("Scheduled", 1)]
+    assert_rollup_in_step(sqlite_db)
+
+def test_updating_an_unknown_quote_leaves_the_rollup_alone(sqlite_db):
+    save_quote_to_db(random_quote(random.Random(2), 2))
+    update_quote_status("QMISSING", "Completed")
+    update_sent_to_customer("QMISSING")
+    assert_rollup_in_step(sqlite_db)
+
+def test_writes_take_few_statements(sqlite_db):
+    rng = random.Random(3)
+    quote_data = random_quote(rng, 3)
+    save_quote_to_db(quote_data)
+    # A second quote keeps the first one's rollup row from emptying (which costs a DELETE)
+    save_quote_to_db(dict(quote_data, quote_id="QROLLUPTWIN"))
+    statements = []
+    event.listen(sqlite_db, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    # Lock, read the old contribution, write returning the new one, apply the deltas
+    quote_data["status"] = "Completed"
+    save_quote_to_db(quote_data)
+    assert len(statements) <= 4, statements
+    statements.clear()
+    update_sent_to_customer(quote_data["quote_id"], not quote_data["sent_to_customer"])
+    assert len(statements) <= 4, statements
+
+def test_concurrent_writers(sqlite_db):
+    quotes = [random_quote(random.Random(number), number) for number in range(40)]
+    for quote_data in quotes:
+        save_quote_to_db(quote_data)
+    errors = []
+
+    def writer(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(40):
+                quote_data = rng.choice(quotes)
+                if rng.random() < 0.5:
+                    update_quote_status(quote_data["quote_id"], rng.choice(STATUSES))
+                else:
+                    update_sent_to_customer(quote_data["quote_id"], rng.random() < 0.5)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert_rollup_in_step(sqlite_db)
+
+def test_filter_options_come_from_the_rollup(sqlite_db):
+    rng = random.Random(4)
+    for number in range(30):
+        save_quote_to_db(random_quote(rng, number))
+    statements = []
+    event.listen(sqlite_db, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    options = get_quote_filter_options()
+    assert len(statements) == 1, statements
+    assert "FROM quote_daily_rollup" in statements[0] and "FROM quotes" not in statements[0]
+
+    with sqlite_db.connect() as connection:
+        quotes = pd.read_sql(select(Quote.__table__), connection)
+    for column in ("status", "service_type", "region"):
+        assert options[column] == sorted(quotes[column].dropna().unique())
+
+def test_counts_match_the_quotes_table(sqlite_db):
+    rng = random.Random(5)
+    for number in range(40):
+        save_quote_to_db(random_quote(rng, number))
+    compiled = get_compiled_pricing()
+    with sqlite_db.connect() as connection:
+        quotes = pd.read_sql(select(Quote.__table__), connection)
+    today = pd.Timestamp.now().normalize()
+    cases = [
+        ({}, None, None, None, True),
+        ({"status": ["Quoted", "Scheduled"]}, None, None, None, True),
+        ({"region": compiled.regions[0], "service_type": compiled.service_types[0]}, today, None, None, True),
+        ({}, today - pd.Timedelta(days=1), today + pd.Timedelta(days=1), None, True),
+        # Not answerable from the rollup
+        ({}, today + pd.Timedelta(hours=1), None, None, False),
+        ({"property_size": quotes["property_size"].iloc[0]}, None, None, None, False),
+        ({}, None, None, "ROLLUP00001", False)
+    ]
+    for filters, start_date, end_date, search, from_rollup in cases:
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(sqlite_db, "before_cursor_execute", listener)
+        counted = count_quotes(filters=filters, start_date=start_date, end_date=end_date, search=search)
+        event.remove(sqlite_db, "before_cursor_execute", listener)
+        assert ("FROM quote_daily_rollup" in statements[0]) == from_rollup, statements
+
+        expected = pd.Series(True, index=quotes.index)
+        for column, value in filters.items():
+            expected &= quotes[column].isin(value if isinstance(value, list) else [value])
+        timestamps = pd.to_datetime(quotes["timestamp"])
+        if start_date is not None:
+            expected &= timestamps >= start_date
+        if end_date is not None:
+            expected &= timestamps < end_date
+        if search:
+            expected &= quotes["quote_id"].str.contains(search)
+        assert counted == expected.sum(), (filters, start_date, end_date, search)
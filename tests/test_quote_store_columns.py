@@ -0,0 +1,74 @@
+"""
+Columns outside the event log's usual fields (assigned_cleaner, columns
+added to quotes.csv by hand) must survive replays, re-saves and compaction
+"""
+
+import pandas as pd
+import pytest
+
+from fixtures import make_quote_data
+
+def save_quotes(quote_store, count):
+    quote_ids = []
+    for number in range(count):
+        quote_data = make_quote_data(number)
+        quote_data["quote_id"] = f"QCOLUMNS{number:04d}"
+        quote_store.save_quote_to_csv(quote_data)
+        quote_ids.append(quote_data["quote_id"])
+    return quote_ids
+
+def rewrite_as_older_layout(quote_store):
+    """Drop assigned_cleaner from quotes.csv and add a column the app doesn't know about"""
+    frame = pd.read_csv(quote_store.get_csv_path(), dtype=str, keep_default_na=False)
+    frame = frame.drop(columns=["assigned_cleaner"])
+    frame["parking_permit"] = [f"P{number}" for number in range(len(frame))]
+    frame.to_csv(quote_store.get_csv_path(), index=False)
+
+def read_back(quote_store):
+    return quote_store.get_quotes_dataframe().fillna("").set_index("quote_id")
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_extra_columns_survive_compaction(quote_store, compact):
+    quote_ids = save_quotes(quote_store, 3)
+    quote_store.compact_quote_events()
+    rewrite_as_older_layout(quote_store)
+
+    assert quote_store.update_csv_field(quote_ids[0], "assigned_cleaner", "Ana")
+    assert quote_store.update_csv_field(quote_ids[1], "key_safe_code", "K4821")
+    assert quote_store.update_csv_field(quote_ids[2], "admin_notes", "Side gate")
+    if compact:
+        assert quote_store.compact_quote_events() == 3
+        # And again, with the new columns now in the file
+        assert quote_store.update_csv_field(quote_ids[2], "key_safe_code", "K1234")
+        assert quote_store.compact_quote_events() == 1
+
+    quotes = read_back(quote_store)
+    assert quotes.loc[quote_ids[0], "assigned_cleaner"] == "Ana"
+    assert quotes.loc[quote_ids[1], "key_safe_code"] == "K4821"
+    assert quotes.loc[quote_ids[2], "admin_notes"] == "Side gate"
+    assert quotes["parking_permit"].tolist() == ["P0", "P1", "P2"]
+    if compact:
+        assert quotes.loc[quote_ids[2], "key_safe_code"] == "K1234"
+
+def test_resaving_a_quote_keeps_its_assigned_cleaner(quote_store):
+    quote_ids = save_quotes(quote_store, 2)
+    quote_store.update_csv_field(quote_ids[0], "assigned_cleaner", "Ana")
+    quote_store.compact_quote_events()
+
+    resaved = make_quote_data(0)
+    resaved["quote_id"] = quote_ids[0]
+    resaved["status"] = "Scheduled"
+    quote_store.save_quote_to_csv(resaved)
+    quote_store.compact_quote_events()
+    quotes = read_back(quote_store)
+    assert quotes.loc[quote_ids[0], "status"] == "Scheduled"
+    assert quotes.loc[quote_ids[0], "assigned_cleaner"] == "Ana"
+
+def test_parquet_store_keeps_assigned_cleaner(quote_store, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("QUOTE_STORE_BACKEND", "parquet")
+    quote_ids = save_quotes(quote_store, 2)
+    assert quote_store.update_csv_field(quote_ids[1], "assigned_cleaner", "Ben")
+    assert quote_store.get_quotes_dataframe().set_index("quote_id").loc[quote_ids[1], "assigned_cleaner"] == "Ben"
+    quote_store.compact_quote_events()
+    assert quote_store.get_quotes_dataframe().set_index("quote_id").loc[quote_ids[1], "assigned_cleaner"] == "Ben"
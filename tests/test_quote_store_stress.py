@@ -0,0 +1,22 @@
+"""
+benchmarks/stress_quote_store.py at a small scale: concurrent writer
+processes and cron-style compactions must lose or tear no quotes or edits
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+@pytest.mark.parametrize("backend", ["csv", "parquet"])
+def test_no_lost_or_torn_writes(project_root, backend):
+    result = subprocess.run(
+        [sys.executable, os.path.join(project_root, "benchmarks", "stress_quote_store.py"),
+         "--processes", "3", "--quotes", "40", "--edits", "80", "--backend", backend,
+         # A tiny log limit and a busy cron so compactions overlap the writes
+         "--log-max-bytes", "8192", "--compact-interval", "0.05"],
+        capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "No lost or duplicated quotes or edits" in result.stdout
@@ -0,0 +1,38 @@
+"""
+summarize_repricing counts quotes a config can't price instead of failing on them
+"""
+
+import pandas as pd
+
+from utils.pricing import get_compiled_pricing
+from utils.repricing import PRICING_INPUT_COLUMNS, summarize_repricing
+
+def make_chunk(compiled):
+    rows = []
+    for service_type in compiled.service_types:
+        for property_size in compiled.property_sizes:
+            rows.append({
+                "region": compiled.regions[0], "property_size": property_size, "service_type": service_type,
+                "cleanliness_level": "Normal", "pet_status": "No Pets",
+                "num_bathrooms": 1, "num_reception_rooms": 1,
+                "oven_clean": False, "carpet_cleaning": False, "carpet_rooms": 0, "internal_windows": False,
+                "external_windows": False, "balcony_patio": False, "cleaning_materials": False
+            })
+    return pd.DataFrame(rows, columns=PRICING_INPUT_COLUMNS)
+
+def test_missing_crew_size_counts_as_unpriced():
+    compiled = get_compiled_pricing()
+    service_type = compiled.service_types[0]
+    property_size = compiled.property_sizes[-1]
+    cleaners_required = dict(compiled.config["cleaners_required"])
+    # The hours are still configured, only the crew size is missing
+    cleaners_required[service_type] = {
+        size: cleaners for size, cleaners in cleaners_required[service_type].items() if size != property_size
+    }
+    candidate_config = {**compiled.config, "cleaners_required": cleaners_required}
+
+    chunk = make_chunk(compiled)
+    summary = summarize_repricing([chunk], candidate_config)
+    assert summary["unpriced_quotes"] == 1
+    assert summary["quotes"] == len(chunk) - 1
+    assert summary["revenue_delta"] == 0
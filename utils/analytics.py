@@ -0,0 +1,183 @@
+"""
+Dashboard analytics
+
+Aggregates quotes for the business dashboard without loading them. Counts,
+revenue, labor and add-on figures come from the quote_daily_rollup table
+(kept in step with quotes by utils.database), so a page load reads a few
+rows per day of history whatever the number of quotes. Referral figures
+are not in the rollup and are grouped from the quotes table.
+
+Each function takes the filters returned by dashboard_filters() and
+returns plain numbers or small DataFrames. Revenue is summed in whole
+pennies, so rollup and quotes-table figures agree exactly.
+"""
+
+import datetime
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import select, func
+from utils.database import (
+    Quote,
+    QuoteDailyRollup,
+    ROLLUP_ADDON_COLUMNS,
+    get_db_connection,
+    quote_revenue_pennies,
+    _quote_conditions
+)
+
+# Display names for the add-on flags counted by get_addon_counts
+ADDON_COLUMNS = {
+    "oven_clean": "Oven Clean",
+    "carpet_cleaning": "Carpet Cleaning",
+    "internal_windows": "Internal Windows",
+    "external_windows": "External Windows",
+    "balcony_patio": "Balcony/Patio",
+    "cleaning_materials": "Cleaning Materials"
+}
+
+# Referral answers that don't name a source
+REFERRAL_PLACEHOLDERS = ["Please select..."]
+
+# Columns get_breakdown can group by from the rollup
+ROLLUP_BREAKDOWN_COLUMNS = ["region", "service_type", "status"]
+
+def dashboard_filters(start_date=None, end_date=None, region=None, service_type=None, status=None):
+    """Collect the dashboard filters ("All" or None means no filter; both dates are inclusive)"""
+    filters = {"start_date": start_date, "end_date": end_date, "columns": {}}
+    for column, value in (("region", region), ("service_type", service_type), ("status", status)):
+        if value is not None and value != "All":
+            filters["columns"][column] = value
+    return filters
+
+def _rollup_conditions(filters):
+    rollup = QuoteDailyRollup.__table__
+    filters = filters or {}
+    conditions = [rollup.c[column] == value for column, value in filters.get("columns", {}).items()]
+    if filters.get("start_date") is not None:
+        conditions.append(rollup.c.day >= pd.Timestamp(filters["start_date"]).date())
+    if filters.get("end_date") is not None:
+        conditions.append(rollup.c.day <= pd.Timestamp(filters["end_date"]).date())
+    return conditions
+
+def _quote_table_conditions(filters):
+    filters = filters or {}
+    end_date = filters.get("end_date")
+    if end_date is not None:
+        end_date = pd.Timestamp(end_date).normalize() + datetime.timedelta(days=1)
+    return _quote_conditions(filters.get("columns"), filters.get("start_date"), end_date)
+
+def _execute(query):
+    with get_db_connection().connect() as connection:
+        return connection.execute(query).all()
+
+def _pounds(pennies):
+    return (pennies or 0) / 100
+
+def quote_date_range_query():
+    """The SELECT get_quote_date_range runs"""
+    rollup = QuoteDailyRollup.__table__
+    return select(func.min(rollup.c.day), func.max(rollup.c.day))
+
+def get_quote_date_range():
+    """Return the (first, last) quote dates, or None if there are no quotes"""
+    first, last = _execute(quote_date_range_query())[0]
+    if first is None:
+        return None
+    return pd.Timestamp(first).date(), pd.Timestamp(last).date()
+
+def summary_metrics_query(filters=None):
+    """The SELECT get_summary_metrics runs"""
+    rollup = QuoteDailyRollup.__table__
+
+    def count_for(status):
+        return func.sum(sqlalchemy.case((rollup.c.status == status, rollup.c.quote_count), else_=0))
+
+    return select(
+        func.sum(rollup.c.quote_count),
+        count_for("Scheduled"),
+        count_for("Completed"),
+        func.sum(rollup.c.sent_count),
+        func.sum(rollup.c.revenue_pennies),
+        func.sum(rollup.c.labor_minutes)
+    ).where(*_rollup_conditions(filters))
+
+def get_summary_metrics(filters=None):
+    """Return quote counts (total/scheduled/completed/sent), total and average revenue, and labor hours"""
+    total, scheduled, completed, sent, revenue_pennies, labor_minutes = _execute(summary_metrics_query(filters))[0]
+    total = total or 0
+    return {
+        "total_quotes": total,
+        "scheduled_quotes": scheduled or 0,
+        "completed_quotes": completed or 0,
+        "sent_quotes": sent or 0,
+        "total_revenue": _pounds(revenue_pennies),
+        "average_quote": _pounds(revenue_pennies) / total if total else 0.0,
+        "labor_hours": (labor_minutes or 0) / 60
+    }
+
+def daily_revenue_query(filters=None):
+    """The SELECT get_revenue_by_period runs"""
+    rollup = QuoteDailyRollup.__table__
+    return select(rollup.c.day, func.sum(rollup.c.revenue_pennies)).where(
+        *_rollup_conditions(filters)).group_by(rollup.c.day).order_by(rollup.c.day)
+
+def get_revenue_by_period(period="Daily", filters=None):
+    """Return revenue per day, week ("%Y-%U") or month ("%Y-%m") with columns [period, total_price]"""
+    daily = pd.DataFrame(_execute(daily_revenue_query(filters)), columns=["day", "revenue_pennies"])
+    daily["day"] = pd.to_datetime(daily["day"])
+    if period != "Daily":
+        column, label_format = ("week", "%Y-%U") if period == "Weekly" else ("month", "%Y-%m")
+        daily[column] = daily["day"].dt.strftime(label_format)
+        daily = daily.groupby(column, as_index=False)["revenue_pennies"].sum()
+    daily["total_price"] = daily.pop("revenue_pennies").astype("int64") / 100
+    return daily
+
+def breakdown_query(column, filters=None):
+    """The SELECT get_breakdown runs"""
+    if column in ROLLUP_BREAKDOWN_COLUMNS:
+        rollup = QuoteDailyRollup.__table__
+        key = rollup.c[column]
+        query = select(key, func.sum(rollup.c.quote_count), func.sum(rollup.c.revenue_pennies)).where(
+            *_rollup_conditions(filters))
+    else:
+        table = Quote.__table__
+        key = table.c[column]
+        query = select(key, func.count(), func.sum(quote_revenue_pennies(table))).where(
+            *_quote_table_conditions(filters), key.is_not(None))
+        if column == "referral_source":
+            query = query.where(key.not_in(REFERRAL_PLACEHOLDERS))
+    return query.group_by(key).order_by(key)
+
+def get_breakdown(column, filters=None):
+    """Return [column, count, total_price, average_price] grouped by a quote column"""
+    breakdown = pd.DataFrame(_execute(breakdown_query(column, filters)), columns=[column, "count", "revenue_pennies"])
+    revenue_pennies = breakdown.pop("revenue_pennies").astype("int64")
+    breakdown["count"] = breakdown["count"].astype("int64")
+    breakdown["total_price"] = revenue_pennies / 100
+    breakdown["average_price"] = revenue_pennies / breakdown["count"] / 100
+    return breakdown
+
+def addon_counts_query(filters=None):
+    """The SELECT get_addon_counts runs"""
+    rollup = QuoteDailyRollup.__table__
+    return select(*[
+        func.sum(rollup.c[f"{column}_count"]) for column in ROLLUP_ADDON_COLUMNS
+    ]).where(*_rollup_conditions(filters))
+
+def get_addon_counts(filters=None):
+    """Return how many quotes included each add-on, as [Service, Count]"""
+    counts = dict(zip(ROLLUP_ADDON_COLUMNS, _execute(addon_counts_query(filters))[0]))
+    return pd.DataFrame({
+        "Service": list(ADDON_COLUMNS.values()),
+        "Count": [counts[column] or 0 for column in ADDON_COLUMNS]
+    })
+
+def other_referrals_query(filters=None):
+    """The SELECT get_other_referrals runs"""
+    table = Quote.__table__
+    return select(table.c.customer_name, table.c.referral_other, table.c.total_price).where(
+        *_quote_table_conditions(filters), table.c.referral_source == "Other", table.c.referral_other.is_not(None))
+
+def get_other_referrals(filters=None):
+    """Return the customers who gave an "Other" referral source and what they wrote"""
+    return pd.DataFrame(_execute(other_referrals_query(filters)), columns=["customer_name", "referral_other", "total_price"])
@@ -52,8 +52,12 @@ def backup_csv_to_drive():
         print(f"Error: Data directory not found at {DATA_DIR}")
         return False
         
-    # Get list of CSV files in data directory
-    csv_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.csv')]
+    # Get list of CSV files in data directory. With the Parquet quote store,
+    # quotes.csv stopped changing when the store was created; the export
+    # from export_quote_store_to_csv is the current copy.
+    from utils.data_storage import get_csv_path, get_quote_store_path
+    stale_paths = [] if get_quote_store_path() == get_csv_path() else [os.path.basename(get_csv_path())]
+    csv_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.csv') and f not in stale_paths]
     if not csv_files:
         print("No CSV files found to backup")
         return False
@@ -92,6 +96,24 @@ def backup_csv_to_drive():
     
     return successful_backups > 0
 
+def export_quote_store_to_csv():
+    """Export the quote store (CSV or Parquet, with logged edits applied) to a CSV file"""
+    try:
+        from utils.data_storage import get_quotes_dataframe
+        
+        df = get_quotes_dataframe()
+        
+        # Save to CSV with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_path = os.path.join(DATA_DIR, f"quote_store_export_{timestamp}.csv")
+        df.to_csv(csv_path, index=False)
+        
+        print(f"Successfully exported the quote store to {csv_path}")
+        return csv_path
+    except Exception as e:
+        print(f"Error exporting the quote store to CSV: {str(e)}")
+        return None
+
 def export_db_to_csv():
     """Export database data to CSV files"""
     try:
@@ -116,8 +138,9 @@ def export_db_to_csv():
         return None
 
 if __name__ == "__main__":
-    # Export database to CSV
+    # Export database and quote store to CSV
     export_db_to_csv()
+    export_quote_store_to_csv()
     
     # Backup CSV to Google Drive
     result = backup_csv_to_drive()
@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+from utils.pricing import (
+    CompiledPricing,
+    get_compiled_pricing,
+    MAX_WORK_DAY_HOURS,
+    SIZE_CATEGORY_LARGE
+)
+from utils.money import is_pennies_mode, FIXED_POINT_SCALE, PENNIES_PER_POUND
+
+# Columns returned by calculate_prices_batch, matching the price_details keys
+PRICE_DETAIL_COLUMNS = [
+    "hourly_rate", "hours_required", "cleaners_required", "region_multiplier",
+    "base_price", "extra_bathrooms_cost", "extra_reception_cost",
+    "additional_services_cost", "materials_cost", "subtotal",
+    "markup_percentage", "markup", "total_price"
+]
+
+# Money columns, returned as int64 pennies by calculate_prices_batch(..., pennies=True)
+MONEY_COLUMNS = [
+    "base_price", "extra_bathrooms_cost", "extra_reception_cost",
+    "additional_services_cost", "materials_cost", "subtotal", "markup", "total_price"
+]
+
+# Values treated as "selected" when add-on flags come from CSV text
+TRUE_VALUES = [True, 1, "True", "true", "TRUE", "1", "Yes", "yes"]
+
+def _encode(quotes_df, column, categories, default=None, required=True):
+    """Map a categorical column to the compiled integer codes (-1 when unknown)"""
+    if column in quotes_df.columns:
+        values = quotes_df[column]
+        if default is not None:
+            values = values.fillna(default)
+    else:
+        values = pd.Series(default, index=quotes_df.index)
+
+    codes = pd.Index(list(categories)).get_indexer(values).astype(np.int64)
+
+    if required and (codes < 0).any():
+        unknown = sorted(set(values[codes < 0].astype(str)))
+        raise KeyError(f"Unknown {column} value(s): {', '.join(unknown)}")
+    return codes
+
+def _flag(quotes_df, column):
+    """Return a boolean array for an add-on flag column (False when missing)"""
+    if column not in quotes_df.columns:
+        return np.zeros(len(quotes_df), dtype=bool)
+    return quotes_df[column].isin(TRUE_VALUES).to_numpy()
+
+def _count(quotes_df, column):
+    """Return an integer array for a count column (0 when missing)"""
+    if column not in quotes_df.columns:
+        return np.zeros(len(quotes_df), dtype=np.int64)
+    return pd.to_numeric(quotes_df[column], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+
+def _table(rows):
+    """Convert a [service][size] tuple table to a float array (NaN where missing)"""
+    return np.array([[np.nan if value is None else value for value in row] for row in rows], dtype=np.float64)
+
+def _multipliers(codes, values):
+    """Look up multipliers by code, using 1.0 for unknown levels like calculate_price"""
+    table = np.asarray(values, dtype=np.float64)
+    return np.where(codes >= 0, table[np.maximum(codes, 0)], 1.0)
+
+def _fixed_table(rows):
+    """Convert a [service][size] fixed-point tuple table to an int64 array (0 where missing)"""
+    return np.array([[0 if value is None else value for value in row] for row in rows], dtype=np.int64)
+
+def _fixed_multipliers(codes, values):
+    """Fixed-point version of _multipliers (FIXED_POINT_SCALE for unknown levels)"""
+    table = np.asarray(values, dtype=np.int64)
+    return np.where(codes >= 0, table[np.maximum(codes, 0)], FIXED_POINT_SCALE)
+
+def _divide_half_up(numerator, denominator):
+    """Vectorized utils.money.divide_half_up for int64 arrays"""
+    return np.where(numerator >= 0,
+                    (2 * numerator + denominator) // (2 * denominator),
+                    -((-2 * numerator + denominator) // (2 * denominator)))
+
+def minimum_cleaners_batch(total_labor_hours, at_least):
+    """Vectorized minimum_cleaners: smallest crew >= at_least within MAX_WORK_DAY_HOURS each"""
+    cleaners = np.maximum(at_least, np.ceil(total_labor_hours / MAX_WORK_DAY_HOURS).astype(np.int64))
+    # Float rounding in the ceiling can be off by one crew member either way
+    too_few = total_labor_hours / cleaners > MAX_WORK_DAY_HOURS
+    too_many = ((cleaners > at_least)
+                & (total_labor_hours / np.maximum(cleaners - 1, 1) <= MAX_WORK_DAY_HOURS))
+    return cleaners + too_few - (too_many & ~too_few)
+
+def allocate_cleaners_batch(total_labor_hours, is_large_property, is_deep_clean,
+                            has_oven_clean, has_carpet_clean, has_internal_windows, has_external_windows):
+    """Vectorized allocate_cleaners; returns (cleaners_required, hours_per_cleaner) arrays"""
+    num_extras = (has_oven_clean.astype(np.int64) + has_carpet_clean + has_external_windows + has_internal_windows)
+
+    # Same rules, in the same order, as utils.pricing.allocate_cleaners
+    crew_floor = np.ceil(total_labor_hours / MAX_WORK_DAY_HOURS).astype(np.int64)
+    crew_floor += has_external_windows
+    crew_floor = np.where(has_oven_clean & (has_carpet_clean | has_external_windows), np.maximum(crew_floor, 2), crew_floor)
+    crew_floor = np.where(is_large_property & is_deep_clean, np.maximum(crew_floor, 2), crew_floor)
+    crew_floor = np.where(is_large_property & (num_extras >= 2), np.maximum(crew_floor, 2), crew_floor)
+    crew_floor = np.where(total_labor_hours > 15, np.maximum(crew_floor, 3),
+                          np.where(total_labor_hours > 7.5, np.maximum(crew_floor, 2), crew_floor))
+
+    cleaners = minimum_cleaners_batch(total_labor_hours, crew_floor)
+    return cleaners, total_labor_hours / cleaners
+
+def calculate_prices_batch(quotes_df, pricing_config=None, pennies=False):
+    """Price every row of a flat quotes DataFrame in one vectorized pass.
+
+    quotes_df uses the same columns as the quotes table (property_size,
+    service_type, region, cleanliness_level, pet_status, the add-on flags,
+    carpet_rooms, num_bathrooms, num_reception_rooms, cleaning_materials).
+    Returns a DataFrame with the same index holding every numeric
+    price_details field, matching calculate_price row for row.
+    Pass pricing_config to price against a config other than the saved one.
+    With pennies=True the money columns are worked out in fixed point (as
+    in PRICING_MONEY_MODE=pennies) and returned as int64 pennies, so they
+    can be summed exactly.
+    """
+    fixed_point = pennies or is_pennies_mode()
+    compiled = get_compiled_pricing() if pricing_config is None else CompiledPricing(pricing_config)
+
+    service_codes = _encode(quotes_df, "service_type", compiled.service_types)
+    size_codes = _encode(quotes_df, "property_size", compiled.property_sizes)
+    region_codes = _encode(quotes_df, "region", compiled.regions)
+    cleanliness_codes = _encode(quotes_df, "cleanliness_level", compiled.cleanliness_levels,
+                                default="Normal", required=False)
+    pet_codes = _encode(quotes_df, "pet_status", compiled.pet_statuses,
+                        default="No Pets", required=False)
+
+    # Base hours and default crew for each row
+    hours_required = _table(compiled.hours)[service_codes, size_codes]
+    default_cleaners = _table(compiled.cleaners)[service_codes, size_codes]
+    missing = np.isnan(hours_required) | np.isnan(default_cleaners)
+    if missing.any():
+        combos = sorted(set(zip(quotes_df["service_type"][missing], quotes_df["property_size"][missing])))
+        raise KeyError(f"No pricing configured for: {combos}")
+
+    # Adjust hours based on cleanliness and pets
+    hours_required = (hours_required
+                      * _multipliers(cleanliness_codes, compiled.cleanliness_multipliers)
+                      * _multipliers(pet_codes, compiled.pet_multipliers))
+    total_labor_hours = hours_required * default_cleaners
+
+    has_oven_clean = _flag(quotes_df, "oven_clean")
+    has_carpet_clean = _flag(quotes_df, "carpet_cleaning")
+    has_internal_windows = _flag(quotes_df, "internal_windows")
+    has_external_windows = _flag(quotes_df, "external_windows")
+    has_balcony_patio = _flag(quotes_df, "balcony_patio")
+    has_cleaning_materials = _flag(quotes_df, "cleaning_materials")
+
+    is_large_property = np.asarray(compiled.size_categories)[size_codes] == SIZE_CATEGORY_LARGE
+    is_deep_clean = service_codes == compiled.service_codes.get("Deep Clean", -1)
+    cleaners, hours_required = allocate_cleaners_batch(
+        total_labor_hours, is_large_property, is_deep_clean,
+        has_oven_clean, has_carpet_clean, has_internal_windows, has_external_windows
+    )
+
+    region_multiplier = np.asarray(compiled.region_multipliers, dtype=np.float64)[region_codes]
+    hourly_rate = compiled.hourly_rate
+    markup_percentage = compiled.markup_percentage
+    carpet_rooms = _count(quotes_df, "carpet_rooms")
+    extra_bathrooms = _count(quotes_df, "num_bathrooms") - 1
+    extra_reception_rooms = _count(quotes_df, "num_reception_rooms") - 1
+
+    if fixed_point:
+        # Same steps as utils.pricing._calculate_price_pennies
+        labor_fixed = _divide_half_up(
+            _fixed_table(compiled.hours_fixed)[service_codes, size_codes]
+            * default_cleaners.astype(np.int64)
+            * _fixed_multipliers(cleanliness_codes, compiled.cleanliness_multipliers_fixed)
+            * _fixed_multipliers(pet_codes, compiled.pet_multipliers_fixed),
+            FIXED_POINT_SCALE * FIXED_POINT_SCALE
+        )
+        base_price = _divide_half_up(
+            compiled.hourly_rate_pennies * labor_fixed
+            * np.asarray(compiled.region_multipliers_fixed, dtype=np.int64)[region_codes],
+            FIXED_POINT_SCALE * FIXED_POINT_SCALE
+        )
+        extra_bathrooms_cost = np.where(extra_bathrooms > 0, extra_bathrooms * compiled.extra_bathroom_pennies, 0)
+        extra_reception_cost = np.where(extra_reception_rooms > 0, extra_reception_rooms * compiled.extra_reception_pennies, 0)
+        additional_services_cost = (np.where(has_oven_clean, compiled.oven_clean_pennies, 0)
+                                    + np.where(has_carpet_clean, compiled.carpet_per_room_pennies * carpet_rooms, 0)
+                                    + np.where(has_internal_windows, compiled.internal_windows_pennies, 0)
+                                    + np.where(has_external_windows, compiled.external_windows_pennies, 0)
+                                    + np.where(has_balcony_patio, compiled.balcony_patio_pennies, 0))
+        materials_cost = np.where(has_cleaning_materials, compiled.cleaning_materials_pennies, 0)
+        subtotal = base_price + extra_bathrooms_cost + extra_reception_cost + additional_services_cost + materials_cost
+        markup = _divide_half_up(subtotal * compiled.markup_fixed, 100 * FIXED_POINT_SCALE)
+        total_price = subtotal + markup
+    else:
+        base_price = hourly_rate * hours_required * cleaners * region_multiplier
+
+        # Extra rooms beyond the first
+        extra_bathrooms_cost = np.where(extra_bathrooms > 0, extra_bathrooms * compiled.extra_bathroom_cost, 0.0)
+        extra_reception_cost = np.where(extra_reception_rooms > 0, extra_reception_rooms * compiled.extra_reception_cost, 0.0)
+
+        # Additional services, summed in the same order as calculate_price
+        additional_services_cost = np.zeros(len(quotes_df), dtype=np.float64)
+        additional_services_cost += np.where(has_oven_clean, compiled.oven_clean_cost, 0.0)
+        additional_services_cost += np.where(has_carpet_clean, compiled.carpet_cost_per_room * carpet_rooms, 0.0)
+        additional_services_cost += np.where(has_internal_windows, compiled.internal_windows_cost, 0.0)
+        additional_services_cost += np.where(has_external_windows, compiled.external_windows_cost, 0.0)
+        additional_services_cost += np.where(has_balcony_patio, compiled.balcony_patio_cost, 0.0)
+
+        materials_cost = np.where(has_cleaning_materials, compiled.cleaning_materials_cost, 0.0)
+
+        subtotal = base_price + extra_bathrooms_cost + extra_reception_cost + additional_services_cost + materials_cost
+
+        markup = subtotal * (markup_percentage / 100)
+        total_price = subtotal + markup
+
+    prices = pd.DataFrame({
+        "hourly_rate": np.full(len(quotes_df), hourly_rate, dtype=np.float64),
+        "hours_required": hours_required,
+        "cleaners_required": cleaners,
+        "region_multiplier": region_multiplier,
+        "base_price": base_price,
+        "extra_bathrooms_cost": extra_bathrooms_cost,
+        "extra_reception_cost": extra_reception_cost,
+        "additional_services_cost": additional_services_cost,
+        "materials_cost": materials_cost,
+        "subtotal": subtotal,
+        "markup_percentage": np.full(len(quotes_df), markup_percentage),
+        "markup": markup,
+        "total_price": total_price
+    }, index=quotes_df.index)
+
+    if fixed_point and not pennies:
+        # Pennies mode still reports pounds, like calculate_price
+        for column in MONEY_COLUMNS:
+            prices[column] = prices[column].to_numpy(dtype=np.int64) / PENNIES_PER_POUND
+    return prices
@@ -0,0 +1,172 @@
+"""
+Sidecar indexes for the CSV quote store
+
+quotes.csv.idx maps each quote_id to the byte offset of its row in
+data/quotes.csv and the row's version (how many edits it has had). It is
+written alongside the CSV by every compaction and rebuilt from a scan if
+the CSV changes underneath it. quote_events.jsonl.idx locates each event
+in the event log and is appended to with every event; a quote's current
+version is its CSV version plus the number of its events not yet compacted.
+Together they let an update find its quote with a few seeks instead of
+parsing the whole file.
+
+Index lines are tab separated:
+    quotes.csv.idx           #csv <csv size> <csv mtime_ns>, then quote_id offset version
+    quote_events.jsonl.idx   quote_id offset length
+"""
+
+import io
+import os
+import csv
+import json
+from utils.file_lock import atomic_write
+
+def csv_signature(path):
+    """Return (size, mtime_ns) identifying the current contents of a file"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def iter_csv_records(file):
+    """Yield (offset, raw bytes) for each record of a CSV opened in binary mode, header included"""
+    offset = 0
+    record = b""
+    quotes = 0
+    for line in file:
+        record += line
+        # A quoted field can hold newlines; the record ends once the quotes balance
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            yield offset, record
+            offset += len(record)
+            record = b""
+            quotes = 0
+    if record:
+        yield offset, record
+
+def parse_csv_record(raw):
+    """Parse the raw bytes of one CSV record into a list of strings"""
+    return next(csv.reader(io.StringIO(raw.decode("utf-8"), newline="")), [])
+
+def read_csv_record(path, offset):
+    """Read and parse the single CSV record starting at a byte offset"""
+    with open(path, "rb") as file:
+        file.seek(offset)
+        for _, raw in iter_csv_records(file):
+            return parse_csv_record(raw)
+    return None
+
+def scan_csv_offsets(path):
+    """Return {quote_id: offset} by reading the whole CSV (the last row wins for repeated ids)"""
+    offsets = {}
+    with open(path, "rb") as file:
+        records = iter_csv_records(file)
+        header = parse_csv_record(next(records, (0, b""))[1])
+        column = header.index("quote_id") if "quote_id" in header else 0
+        for offset, raw in records:
+            if column == 0:
+                # Quote IDs are never quoted, so the first column needs no parsing
+                quote_id = raw.split(b",", 1)[0].strip(b"\r\n").decode("utf-8")
+            else:
+                row = parse_csv_record(raw)
+                quote_id = row[column] if column < len(row) else ""
+            if quote_id:
+                offsets[quote_id] = offset
+    return offsets
+
+def index_path_for(path):
+    return path + ".idx"
+
+def write_csv_index(csv_path, entries):
+    """Write the index for csv_path from (quote_id, offset, version) entries"""
+    size, mtime_ns = csv_signature(csv_path)
+    # Readers in several processes may rebuild the same index at once
+    with atomic_write(index_path_for(csv_path)) as file:
+        file.write(f"#csv\t{size}\t{mtime_ns}\n")
+        for quote_id, offset, version in entries:
+            file.write(f"{quote_id}\t{offset}\t{version}\n")
+
+def read_csv_index(csv_path):
+    """Return {quote_id: (offset, version)} from the sidecar index, or None if it is missing or stale"""
+    index_path = index_path_for(csv_path)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as file:
+        header = file.readline().rstrip("\n").split("\t")
+        if header != ["#csv", *map(str, csv_signature(csv_path))]:
+            return None
+        index = {}
+        for line in file:
+            quote_id, offset, version = line.rstrip("\n").split("\t")
+            index[quote_id] = (int(offset), int(version))
+    return index
+
+def load_csv_index(csv_path):
+    """Return {quote_id: (offset, version)} for csv_path, rebuilding the sidecar from a scan if needed"""
+    index = read_csv_index(csv_path)
+    if index is None:
+        # Versions aren't recoverable from the CSV alone, so a rebuilt index starts them at 0
+        index = {quote_id: (offset, 0) for quote_id, offset in scan_csv_offsets(csv_path).items()}
+        write_csv_index(csv_path, ((quote_id, offset, version) for quote_id, (offset, version) in index.items()))
+    return index
+
+def new_event_index(log_path):
+    """Return an empty in-memory index of an event log"""
+    inode = os.stat(log_path).st_ino if os.path.exists(log_path) else None
+    return {"inode": inode, "index_bytes": 0, "log_bytes": 0, "events": {}}
+
+def append_event_entry(log_path, quote_id, offset, length):
+    """Record one event appended to log_path in its sidecar index"""
+    with open(index_path_for(log_path), "a") as file:
+        file.write(f"{quote_id}\t{offset}\t{length}\n")
+
+def _index_log_lines(log_path, state, end=None):
+    """Index the events in log_path from state["log_bytes"] up to end (or the last complete line)"""
+    with open(log_path, "rb") as file:
+        file.seek(state["log_bytes"])
+        for line in file:
+            if not line.endswith(b"\n") or (end is not None and state["log_bytes"] >= end):
+                break
+            offset = state["log_bytes"]
+            state["log_bytes"] += len(line)
+            try:
+                quote_id = json.loads(line)["quote_id"]
+            except (ValueError, KeyError):
+                continue
+            state["events"].setdefault(quote_id, []).append((offset, len(line)))
+
+def refresh_event_index(log_path, state):
+    """Bring an in-memory event index up to date with its sidecar and log; return the (possibly new) state"""
+    if not os.path.exists(log_path):
+        return new_event_index(log_path)
+    if os.stat(log_path).st_ino != state["inode"] or os.path.getsize(log_path) < state["log_bytes"]:
+        # Rotated by a compaction since we last looked
+        state = new_event_index(log_path)
+
+    index_path = index_path_for(log_path)
+    if os.path.exists(index_path):
+        with open(index_path, "rb") as file:
+            file.seek(state["index_bytes"])
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break  # Being written; picked up next time
+                state["index_bytes"] += len(line)
+                quote_id, offset, length = line.decode("utf-8").rstrip("\n").split("\t")
+                offset, length = int(offset), int(length)
+                if offset < state["log_bytes"]:
+                    continue
+                if offset > state["log_bytes"]:
+                    # Events logged without an entry (a crash between the two
+                    # writes, or a log from before the index) are read from the log
+                    _index_log_lines(log_path, state, end=offset)
+                state["events"].setdefault(quote_id, []).append((offset, length))
+                state["log_bytes"] = offset + length
+    if os.path.getsize(log_path) > state["log_bytes"]:
+        _index_log_lines(log_path, state)
+    return state
+
+def read_events_at(log_path, locations):
+    """Yield the raw bytes of the logged events at [(offset, length)]"""
+    with open(log_path, "rb") as file:
+        for offset, length in locations:
+            file.seek(offset)
+            yield file.read(length)
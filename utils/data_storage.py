@@ -1,41 +1,380 @@
+"""
+CSV quote store
+
+Quotes are kept in data/quotes.csv (or, with QUOTE_STORE_BACKEND=parquet,
+a month-partitioned Parquet dataset) plus an append-only event log of
+creates and edits that compact_quote_events() folds into the store.
+
+Reads of the CSV store are only fast while the log is empty. While events
+are pending, get_quotes_dataframe() replays the whole of quotes.csv
+through the Python csv module, applies the log and then parses the result
+with pandas, so a read can cost several times a plain pd.read_csv until
+the next compaction. Reads don't compact; the background compaction at
+QUOTE_EVENT_LOG_MAX_BYTES and the scheduled backups bound how much log
+there is to replay. The Parquet backend only rebuilds the quotes that have
+pending events.
+"""
+
 import os
+import io
 import csv
-import time
+import json
+import threading
 import datetime
+import contextlib
+from collections import Counter
 import pandas as pd
+from utils.csv_index import (
+    csv_signature,
+    index_path_for,
+    load_csv_index,
+    read_csv_index,
+    write_csv_index,
+    read_csv_record,
+    new_event_index,
+    append_event_entry,
+    refresh_event_index,
+    read_events_at
+)
+from utils.file_lock import file_lock, atomic_write
+from utils.quote_ids import generate_quote_id
+
+# Column order of data/quotes.csv
+CSV_HEADERS = [
+    "quote_id", "timestamp", "status", "admin_created", "sent_to_customer",
+    "customer_name", "customer_email", "customer_phone", "customer_address", "customer_postcode",
+    "referral_source", "referral_other",
+    "region", "property_size", "num_bathrooms", "num_reception_rooms",
+    "service_type", "cleaning_date", "time_preference", "cleanliness_level", "pet_status", "cleaner_preference", "customer_notes",
+    "oven_clean", "carpet_cleaning", "carpet_rooms", "internal_windows", "external_windows", "balcony_patio", "cleaning_materials",
+    "base_price", "extra_bathrooms_cost", "extra_reception_cost", "additional_services_cost", "materials_cost",
+    "subtotal", "markup_percentage", "markup", "total_price",
+    "hourly_rate", "hours_required", "cleaners_required", "region_multiplier",
+    "admin_notes", "regular_client_discount_percentage", "regular_client_discount_amount", 
+    "original_price", "original_cleaners", "original_hours", "original_markup_percentage", "original_markup",
+    "assigned_cleaner"
+]
+
+# Edits are appended to an event log instead of rewriting quotes.csv.
+# compact_quote_events() folds the log into the CSV. It runs in the
+# background once the log grows past QUOTE_EVENT_LOG_MAX_BYTES, and on
+# every scheduled backup.
+QUOTE_EVENT_LOG_MAX_BYTES = int(os.getenv("QUOTE_EVENT_LOG_MAX_BYTES", str(4 * 1024 * 1024)))
+
+# QUOTE_STORE_BACKEND=parquet compacts into a month-partitioned Parquet
+# dataset (utils/parquet_store.py, needs pyarrow) instead of quotes.csv.
+# The event log is the same for both; the first use copies quotes.csv over.
+QUOTE_STORE_BACKEND = os.getenv("QUOTE_STORE_BACKEND", "csv").lower()
+
+# _event_log_lock covers appends, reads and the short swap steps of a
+# compaction; _compaction_lock keeps to one compaction at a time. Both are
+# backed by file locks (utils/file_lock.py) so other processes, such as
+# cron_backup.py, take part too: see _store_lock and _compaction_guard.
+_event_log_lock = threading.Lock()
+_compaction_lock = threading.Lock()
+
+# In-memory copies of the sidecar indexes (see utils/csv_index.py), guarded by _store_lock
+_quote_index = {"csv_signature": None, "csv_header": None, "rows": {}, "logs": {}}
+
+def get_csv_path():
+    return os.path.join("data", "quotes.csv")
+
+def get_event_log_path():
+    return os.path.join("data", "quote_events.jsonl")
+
+def get_parquet_path():
+    return os.path.join("data", "quotes_parquet")
+
+def get_quote_store_path():
+    """Return the path of the active quote store (quotes.csv, or the Parquet dataset)"""
+    return get_parquet_path() if _parquet_backend() else get_csv_path()
+
+def get_lock_path():
+    return os.path.join("data", "quotes.lock")
+
+@contextlib.contextmanager
+def _store_lock(shared=False):
+    """Hold _event_log_lock and the store's file lock (shared for readers, exclusive for writers)"""
+    with _event_log_lock, file_lock(get_lock_path(), shared=shared):
+        yield
+
+@contextlib.contextmanager
+def _compaction_guard():
+    """Hold _compaction_lock and the file lock that keeps compactions in different processes apart"""
+    with _compaction_lock, file_lock(os.path.join("data", "quotes.compaction.lock")):
+        yield
+
+def _parquet_backend():
+    return os.getenv("QUOTE_STORE_BACKEND", QUOTE_STORE_BACKEND).lower() == "parquet"
+
+def _parquet_store():
+    """Return utils.parquet_store, creating the dataset from quotes.csv the first time it is used"""
+    from utils import parquet_store
+    initialize_csv_if_needed()
+    if not os.path.exists(get_parquet_path()):
+        with _compaction_guard():
+            if not os.path.exists(get_parquet_path()):
+                header, rows = _replay_quotes([])
+                if len(header) > len(CSV_HEADERS):
+                    print(f"Columns not copied to the Parquet store: {', '.join(header[len(CSV_HEADERS):])}")
+                parquet_store.write_dataset(get_parquet_path(), (row[:len(CSV_HEADERS)] for row in rows.values()))
+    return parquet_store
 
 def initialize_csv_if_needed():
     """Create the quotes CSV file with headers if it doesn't exist"""
     data_dir = os.path.join("data")
     os.makedirs(data_dir, exist_ok=True)
     
-    csv_path = os.path.join(data_dir, "quotes.csv")
+    csv_path = get_csv_path()
     
     if not os.path.exists(csv_path):
-        # Define CSV headers
-        headers = [
-            "quote_id", "timestamp", "status", "admin_created", "sent_to_customer",
-            "customer_name", "customer_email", "customer_phone", "customer_address", "customer_postcode",
-            "referral_source", "referral_other",
-            "region", "property_size", "num_bathrooms", "num_reception_rooms",
-            "service_type", "cleaning_date", "time_preference", "cleanliness_level", "pet_status", "cleaner_preference", "customer_notes",
-            "oven_clean", "carpet_cleaning", "carpet_rooms", "internal_windows", "external_windows", "balcony_patio", "cleaning_materials",
-            "base_price", "extra_bathrooms_cost", "extra_reception_cost", "additional_services_cost", "materials_cost",
-            "subtotal", "markup_percentage", "markup", "total_price",
-            "hourly_rate", "hours_required", "cleaners_required", "region_multiplier",
-            "admin_notes", "regular_client_discount_percentage", "regular_client_discount_amount", 
-            "original_price", "original_cleaners", "original_hours", "original_markup_percentage", "original_markup"
-        ]
-        
-        # Create CSV file with headers
-        with open(csv_path, "w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(headers)
+        # Create CSV file with headers (whole, so a reader in another process never sees it empty)
+        with _store_lock():
+            if not os.path.exists(csv_path):
+                with atomic_write(csv_path, newline="", encoding="utf-8") as file:
+                    writer = csv.writer(file)
+                    writer.writerow(CSV_HEADERS)
+
+def append_quote_event(event):
+    """Append one event to the quote event log (compacting in the background when it gets large)"""
+    initialize_csv_if_needed()
+    event = dict(event, logged_at=datetime.datetime.now().isoformat(timespec="seconds"))
+    line = (json.dumps(event, default=str) + "\n").encode("utf-8")
+    log_path = get_event_log_path()
+    with _store_lock():
+        with open(log_path, "ab") as file:
+            offset = file.tell()
+            file.write(line)
+        append_event_entry(log_path, event["quote_id"], offset, len(line))
+        log_size = offset + len(line)
+    if log_size > QUOTE_EVENT_LOG_MAX_BYTES and not _compaction_lock.locked():
+        threading.Thread(target=compact_quote_events, daemon=True).start()
+
+def _read_events(path):
+    """Yield the events in a log file, skipping a torn last line"""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                print(f"Skipping unreadable quote event in {path}")
+
+def _csv_value(value):
+    """Format a value the way csv.writer wrote it when the row was first saved"""
+    return "" if value is None else str(value)
+
+_COLUMN_INDEX = {column: index for index, column in enumerate(CSV_HEADERS)}
+
+def _set_value(row, index, value):
+    if index >= len(row):
+        row.extend([""] * (index + 1 - len(row)))
+    row[index] = _csv_value(value)
+
+def _apply_event(rows, event, columns=None):
+    """Apply one event to {quote_id: row list}
+
+    columns maps column names to row positions, CSV_HEADERS first. Updates
+    to other fields add them to columns (and so to quotes.csv); without
+    columns the rows are fixed to CSV_HEADERS and such updates are skipped.
+    """
+    quote_id = event["quote_id"]
+    fixed = columns is None
+    if fixed:
+        columns = _COLUMN_INDEX
+    if event["event"] == "create":
+        # A re-saved quote replaces its row and moves to the end, as the full
+        # rewrite did; fields the new row doesn't have (assigned cleaner,
+        # extra columns) keep their old values
+        old_row = rows.pop(quote_id, [])
+        row = []
+        for column, index in columns.items():
+            if column in event["row"]:
+                row.append(_csv_value(event["row"][column]))
+            else:
+                row.append(old_row[index] if index < len(old_row) else "")
+        rows[quote_id] = row
+    elif quote_id in rows:
+        if event["event"] == "status":
+            _set_value(rows[quote_id], columns["status"], event["status"])
+        elif event["event"] == "update":
+            if event["field"] not in columns and not fixed:
+                columns[event["field"]] = len(columns)
+            if event["field"] in columns:
+                _set_value(rows[quote_id], columns[event["field"]], event["value"])
+
+def _file_columns(header):
+    """Return {column: row position} for a file with this header: CSV_HEADERS, then any extra columns it has"""
+    columns = dict(_COLUMN_INDEX)
+    for column in header:
+        if column and column not in columns:
+            columns[column] = len(columns)
+    return columns
+
+def _header_positions(header, columns=CSV_HEADERS):
+    """Return where each of columns sits in a file with this header, or None if it matches"""
+    if list(header) == list(columns):
+        return None
+    return [header.index(column) if column in header else None for column in columns]
+
+def _align_row(row, positions):
+    """Line a row up with the columns _header_positions was given (older file layouts)"""
+    if positions is None:
+        return row
+    return [row[position] if position is not None and position < len(row) else "" for position in positions]
+
+def _pending_event_logs():
+    """Return the event logs not yet folded into quotes.csv, oldest first"""
+    log_path = get_event_log_path()
+    return [path for path in (log_path + ".compacting", log_path) if os.path.exists(path)]
+
+def _replay_quotes(event_logs):
+    """Return (header, {quote_id: row list}) for quotes.csv with the given event logs applied
+
+    The header is CSV_HEADERS followed by any other columns quotes.csv or
+    the logged updates have, so compaction never drops a column.
+    """
+    rows = {}
+    with open(get_csv_path(), newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, CSV_HEADERS)
+        columns = _file_columns(header)
+        positions = _header_positions(header, columns)
+        if positions is None:
+            for row in reader:
+                rows[row[0]] = row
+        else:
+            for row in reader:
+                row = _align_row(row, positions)
+                rows[row[0]] = row
+    for path in event_logs:
+        for event in _read_events(path):
+            _apply_event(rows, event, columns)
+    return list(columns), rows
+
+def _padded(row, width):
+    """Fill out a row that predates a column added by an update"""
+    return row if len(row) >= width else row + [""] * (width - len(row))
+
+def _write_csv_rows(file, header, rows):
+    writer = csv.writer(file)
+    writer.writerow(header)
+    writer.writerows(_padded(row, len(header)) for row in rows)
+
+def _write_indexed_csv(path, header, rows, versions):
+    """Write {quote_id: row} to path and return its index as {quote_id: (offset, version)}"""
+    index = {}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    with open(path, "wb") as file:
+        for quote_id, row in rows.items():
+            # Rows are formatted one at a time so each one's byte offset is known
+            file.write(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+            index[quote_id] = (file.tell(), versions.get(quote_id, 0))
+            writer.writerow(_padded(row, len(header)))
+        file.write(buffer.getvalue().encode("utf-8"))
+        file.flush()
+        os.fsync(file.fileno())
+    return index
+
+def _refresh_quote_index():
+    """Bring _quote_index up to date with quotes.csv and the pending event logs (hold _store_lock)"""
+    csv_path = get_csv_path()
+    signature = None if _parquet_backend() else csv_signature(csv_path)
+    if signature is None:
+        # quotes.csv isn't the store; _stored_quote_rows reads the dataset
+        _quote_index.update(csv_signature=None, csv_header=None, rows={})
+    elif signature != _quote_index["csv_signature"]:
+        _quote_index["rows"] = load_csv_index(csv_path)
+        _quote_index["csv_header"] = read_csv_record(csv_path, 0)
+        _quote_index["csv_signature"] = signature
+    _quote_index["logs"] = {
+        path: refresh_event_index(path, _quote_index["logs"].get(path) or new_event_index(path))
+        for path in _pending_event_logs()
+    }
 
-def generate_quote_id():
-    """Generate a unique quote ID based on current timestamp"""
-    timestamp = int(time.time())
-    return f"Q{timestamp}"
+def _stored_quote_rows(quote_ids):
+    """Return {quote_id: row} for quotes as of the last compaction (hold _store_lock, after _refresh_quote_index)"""
+    if _parquet_backend():
+        from utils import parquet_store
+        return parquet_store.read_rows(get_parquet_path(), quote_ids)
+    rows = {}
+    positions = _header_positions(_quote_index["csv_header"])
+    for quote_id in quote_ids:
+        if quote_id in _quote_index["rows"]:
+            offset, _ = _quote_index["rows"][quote_id]
+            rows[quote_id] = _align_row(read_csv_record(get_csv_path(), offset), positions)
+    return rows
+
+def _compact_into_parquet(compacting_path):
+    """Apply a log's events to the Parquet dataset, rewriting only the months its quotes are in"""
+    from utils import parquet_store
+    events = list(_read_events(compacting_path))
+    quote_ids = {event["quote_id"] for event in events}
+    rows = parquet_store.read_rows(get_parquet_path(), quote_ids)
+    for event in events:
+        _apply_event(rows, event)
+    parquet_store.replace_quotes(get_parquet_path(), quote_ids, rows.values())
+
+def compact_quote_events():
+    """Fold the event log into quotes.csv and start a new log; return the number of events applied"""
+    initialize_csv_if_needed()
+    log_path = get_event_log_path()
+    compacting_path = log_path + ".compacting"
+    csv_path = get_csv_path()
+    if _parquet_backend():
+        _parquet_store()
+    
+    with _compaction_guard():
+        with _store_lock():
+            # New events go to a fresh log while this one is folded in. A
+            # .compacting file left by an interrupted run is folded in first.
+            if os.path.exists(log_path) and not os.path.exists(compacting_path):
+                os.replace(log_path, compacting_path)
+                if os.path.exists(index_path_for(log_path)):
+                    os.replace(index_path_for(log_path), index_path_for(compacting_path))
+                if log_path in _quote_index["logs"]:
+                    _quote_index["logs"][compacting_path] = _quote_index["logs"].pop(log_path)
+        edits = Counter(event["quote_id"] for event in _read_events(compacting_path))
+        events_applied = sum(edits.values())
+        if events_applied == 0:
+            for path in (compacting_path, index_path_for(compacting_path)):
+                if os.path.exists(path):
+                    os.remove(path)
+            return 0
+        
+        if _parquet_backend():
+            # Partitions are replaced one at a time; until the log is removed
+            # below, readers still apply its events over them
+            _compact_into_parquet(compacting_path)
+            index = None
+        else:
+            header, rows = _replay_quotes([compacting_path])
+            versions = {
+                quote_id: version + edits.pop(quote_id, 0)
+                for quote_id, (_, version) in (read_csv_index(csv_path) or {}).items()
+            }
+            # A quote's first event creates it at version 0
+            versions.update((quote_id, count - 1) for quote_id, count in edits.items())
+            temp_path = csv_path + ".tmp"
+            index = _write_indexed_csv(temp_path, header, rows, versions)
+            write_csv_index(temp_path, ((quote_id, offset, version) for quote_id, (offset, version) in index.items()))
+        with _store_lock():
+            # Replaying the same events again is harmless, so a crash between these steps is safe
+            # (an index left behind by a crash no longer matches the CSV and is rebuilt)
+            if index is not None:
+                os.replace(temp_path, csv_path)
+                os.replace(index_path_for(temp_path), index_path_for(csv_path))
+                _quote_index.update(csv_signature=csv_signature(csv_path), csv_header=header, rows=index)
+            os.remove(compacting_path)
+            if os.path.exists(index_path_for(compacting_path)):
+                os.remove(index_path_for(compacting_path))
+            _quote_index["logs"].pop(compacting_path, None)
+    return events_applied
 
 def save_quote_to_csv(quote_data):
     """Save quote data to CSV file and return the quote_id"""
@@ -53,9 +392,6 @@ def save_quote_to_csv(quote_data):
     if "status" not in quote_data:
         quote_data["status"] = "Quoted"
     
-    # Get CSV path
-    csv_path = os.path.join("data", "quotes.csv")
-    
     # Extract data from nested structure
     customer_info = quote_data["customer_info"]
     property_info = quote_data["property_info"]
@@ -131,70 +467,127 @@ def save_quote_to_csv(quote_data):
         price_details.get("original_markup_percentage", ""),
         price_details.get("original_markup", "")
     ]
+    event_row = dict(zip(CSV_HEADERS, row))
+    # row stops short of assigned_cleaner, which is only set when given so
+    # re-saving a quote keeps the cleaner assigned to it
+    if "assigned_cleaner" in quote_data:
+        event_row["assigned_cleaner"] = quote_data["assigned_cleaner"]
     
-    # Check if quote already exists in CSV
+    # Appending is constant time however many quotes exist; compaction
+    # replaces any earlier row for the same quote
     try:
-        df = pd.read_csv(csv_path)
-        existing_quote = df[df["quote_id"] == quote_data["quote_id"]]
-        
-        if len(existing_quote) > 0:
-            # Update existing quote
-            df = df[df["quote_id"] != quote_data["quote_id"]]  # Remove old row
-            df.loc[len(df)] = row  # Append new row
-            df.to_csv(csv_path, index=False)
-        else:
-            # Append new quote
-            with open(csv_path, "a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(row)
+        append_quote_event({"event": "create", "quote_id": quote_id, "row": event_row})
     except Exception as e:
         print(f"Error saving quote to CSV: {str(e)}")
-        # If error (likely CSV doesn't exist yet), create new file
-        initialize_csv_if_needed()
-        with open(csv_path, "a", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(row)
     
     return quote_data["quote_id"]
 
-def get_quotes_dataframe():
-    """Read quotes from CSV and return as a pandas DataFrame"""
+def _select_quotes(quotes, columns=None, start_date=None, end_date=None):
+    """Apply get_quotes_dataframe's date range and column selection to a frame of quotes"""
+    if start_date is not None or end_date is not None:
+        timestamps = pd.to_datetime(quotes["timestamp"], errors="coerce")
+        keep = pd.Series(True, index=quotes.index)
+        if start_date is not None:
+            keep &= timestamps >= pd.Timestamp(start_date)
+        if end_date is not None:
+            keep &= timestamps < pd.Timestamp(end_date)
+        quotes = quotes[keep].reset_index(drop=True)
+    if columns is not None:
+        quotes = quotes[list(columns)]
+    return quotes
+
+def _get_parquet_quotes_dataframe(columns=None, start_date=None, end_date=None):
+    parquet_store = _parquet_store()
+    with _store_lock(shared=True):
+        _refresh_quote_index()
+        # Quotes with pending events are rebuilt here; the rest are read
+        # straight from the months in range
+        quote_ids = set()
+        for state in _quote_index["logs"].values():
+            quote_ids.update(state["events"])
+        rows = _stored_quote_rows(quote_ids)
+        for path in _quote_index["logs"]:
+            for event in _read_events(path):
+                _apply_event(rows, event)
+        stored = parquet_store.read_quotes(get_parquet_path(), columns, start_date, end_date, exclude_ids=quote_ids)
+    if not rows:
+        return stored
+    pending = _select_quotes(parquet_store.rows_frame(rows.values()), columns, start_date, end_date)
+    return pd.concat([stored, pending], ignore_index=True)
+
+def get_quotes_dataframe(columns=None, start_date=None, end_date=None):
+    """Read quotes (with any logged edits applied) and return as a pandas DataFrame
+
+    columns limits the columns returned; start_date (inclusive) and
+    end_date (exclusive) limit quotes by timestamp. The Parquet backend
+    only reads what these select.
+    """
     # Initialize CSV file if it doesn't exist
     initialize_csv_if_needed()
     
-    # Get CSV path
-    csv_path = os.path.join("data", "quotes.csv")
-    
     try:
-        return pd.read_csv(csv_path)
+        if _parquet_backend():
+            return _get_parquet_quotes_dataframe(columns, start_date, end_date)
+        with _store_lock(shared=True):
+            event_logs = _pending_event_logs()
+            if not event_logs:
+                return _select_quotes(pd.read_csv(get_csv_path()), columns, start_date, end_date)
+            buffer = io.StringIO()
+            header, rows = _replay_quotes(event_logs)
+            _write_csv_rows(buffer, header, rows.values())
+        buffer.seek(0)
+        return _select_quotes(pd.read_csv(buffer), columns, start_date, end_date)
     except Exception as e:
-        print(f"Error reading quotes CSV: {str(e)}")
+        print(f"Error reading quotes: {str(e)}")
         return pd.DataFrame()
 
+def _csv_quote_exists(quote_id):
+    """Return True if a quote is in the store or has been created since the last compaction"""
+    if _parquet_backend():
+        _parquet_store()
+    with _store_lock(shared=True):
+        _refresh_quote_index()
+        if quote_id in _quote_index["rows"] or (_parquet_backend() and _stored_quote_rows([quote_id])):
+            return True
+        for path, state in _quote_index["logs"].items():
+            for raw in read_events_at(path, state["events"].get(quote_id, [])):
+                if json.loads(raw)["event"] == "create":
+                    return True
+    return False
+
 def update_csv_sent_to_customer(quote_id, sent=True):
     """Update the sent_to_customer field in the CSV file"""
     return update_csv_field(quote_id, "sent_to_customer", sent)
 
+def update_csv_status(quote_id, status):
+    """Record a status change for a quote in the CSV file"""
+    initialize_csv_if_needed()
+    try:
+        if not _csv_quote_exists(quote_id):
+            print(f"Quote {quote_id} not found in CSV file")
+            return False
+        append_quote_event({"event": "status", "quote_id": quote_id, "status": status})
+        return True
+    except Exception as e:
+        print(f"Error updating status in CSV: {str(e)}")
+        return False
+
 def update_csv_field(quote_id, field_name, value):
-    """Update any field in the CSV file for a specific quote"""
-    # Initialize CSV file if it doesn't exist
+    """Update any field in the CSV file for a specific quote
+
+    Fields outside CSV_HEADERS become extra columns of quotes.csv. The
+    Parquet store has a fixed schema, so it only takes CSV_HEADERS fields.
+    """
+    if field_name not in CSV_HEADERS and _parquet_backend():
+        print(f"{field_name} is not a column of the Parquet quote store")
+        return False
     initialize_csv_if_needed()
-    
-    # Get CSV path
-    csv_path = os.path.join("data", "quotes.csv")
-    
     try:
-        # Read the CSV file
-        df = pd.read_csv(csv_path)
-        
-        # Find the quote by ID
-        if quote_id in df["quote_id"].values:
-            df.loc[df["quote_id"] == quote_id, field_name] = value
-            df.to_csv(csv_path, index=False)
-            return True
-        else:
+        if not _csv_quote_exists(quote_id):
             print(f"Quote {quote_id} not found in CSV file")
             return False
+        append_quote_event({"event": "update", "quote_id": quote_id, "field": field_name, "value": value})
+        return True
     except Exception as e:
         print(f"Error updating {field_name} in CSV: {str(e)}")
-        return False
\ No newline at end of file
+        return False
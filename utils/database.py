@@ -1,18 +1,92 @@
 import os
 import json
-from datetime import datetime
+import time
+import threading
+from datetime import datetime, timedelta
 import pandas as pd
 import sqlalchemy
-from sqlalchemy import create_engine, text, MetaData, Table, Column, String, Float, Integer, Boolean, DateTime, ForeignKey, select, insert, update
+from sqlalchemy import create_engine, text, MetaData, Table, Column, String, Float, Integer, BigInteger, Boolean, Date, DateTime, ForeignKey, Index, select, insert, update, delete
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 
 # Create a base class for declarative class definitions
 Base = declarative_base()
 
-# Database connection
-def get_db_connection():
+# Connection pool settings, shared by every engine in the process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how often and how long callers wait for a connection"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Checkouts and checkins happen on many threads at once; += on a dict entry isn't atomic
+        self.metrics_lock = threading.Lock()
+        self.metrics = {
+            "checkouts": 0,
+            "checkins": 0,
+            "connections_created": 0,
+            "timeouts": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0
+        }
+    
+    def count(self, name):
+        """Add one to a counter in metrics"""
+        with self.metrics_lock:
+            self.metrics[name] += 1
+    
+    def get_metrics(self):
+        """Return a consistent copy of metrics"""
+        with self.metrics_lock:
+            return dict(self.metrics)
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self.metrics_lock:
+                if timed_out:
+                    self.metrics["timeouts"] += 1
+                self.metrics["total_wait_seconds"] += waited
+                self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], waited)
+
+# DATABASE_BACKEND=sqlite runs on an embedded SQLite file instead of a
+# database server (offline use, single-node branch installs, benchmarks)
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "postgres").lower()
+SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", os.path.join("data", "quotes.db"))
+
+# SQLite tuning, applied to every connection to a SQLite file
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+_engine_lock = threading.Lock()
+_engines = {}
+
+def get_database_url():
+    """Return the database URL for the current ENV (or the SQLite file when DATABASE_BACKEND=sqlite)"""
     env = os.getenv("ENV", "development")
 
+    if os.getenv("DATABASE_BACKEND", DATABASE_BACKEND).lower() == "sqlite":
+        path = os.path.abspath(os.getenv("SQLITE_DB_PATH", SQLITE_DB_PATH))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"sqlite:///{path}"
+
     if env == "production":
         url = os.getenv("DATABASE_URL_PROD")
     else:
@@ -20,15 +94,109 @@ def get_db_connection():
 
     if not url:
         raise ValueError("DATABASE_URL environment variable not set")
+    return url
 
-    # Create and return the SQLAlchemy engine
-    engine = create_engine(url)
+def _create_pooled_engine(url):
+    """Create an engine with the configured, metered connection pool"""
+    url_parts = make_url(url)
+    if url_parts.get_backend_name() == "sqlite" and url_parts.database in (None, "", ":memory:"):
+        # In-memory SQLite has a single connection; the default pool is already right
+        return create_engine(url)
+    
+    connect_args = {}
+    if url_parts.get_backend_name() == "sqlite":
+        # Pooled connections move between Streamlit session threads; wait on locks rather than fail
+        connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    
+    engine = create_engine(
+        url,
+        poolclass=MeteredQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+    
+    if url_parts.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", _configure_sqlite_connection)
+    
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        engine.pool.count("connections_created")
+    
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        engine.pool.count("checkouts")
+    
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        engine.pool.count("checkins")
+    
+    return engine
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Put a new SQLite connection in WAL mode and apply the SQLITE_* settings"""
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers carry on while one writer commits; NORMAL only syncs at checkpoints
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+# Database connection
+def get_db_connection():
+    """Return the process-wide engine for the current database URL (created on first use)"""
+    url = get_database_url()
+    engine = _engines.get(url)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(url)
+            if engine is None:
+                engine = _create_pooled_engine(url)
+                # Bring the schema up to date once per process, before anyone uses the engine
+                run_migrations(engine)
+                _engines[url] = engine
     return engine
 
+def dispose_db_engines():
+    """Close every pooled connection and forget the cached engines (e.g. after forking)"""
+    with _engine_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+def get_pool_metrics():
+    """Return checkout/wait counters and current pool occupancy for the current database"""
+    pool = get_db_connection().pool
+    if not isinstance(pool, MeteredQueuePool):
+        return {}
+    metrics = pool.get_metrics()
+    metrics["average_wait_ms"] = (metrics["total_wait_seconds"] / metrics["checkouts"] * 1000) if metrics["checkouts"] else 0.0
+    metrics["pool_size"] = pool.size()
+    metrics["checked_out"] = pool.checkedout()
+    metrics["checked_in"] = pool.checkedin()
+    metrics["overflow"] = pool.overflow()
+    return metrics
+
 
 # Define database models
 class Quote(Base):
     __tablename__ = 'quotes'
+    __table_args__ = (
+        # Listing and paging newest first, optionally narrowed by status or region/service
+        Index("ix_quotes_timestamp", "timestamp"),
+        Index("ix_quotes_status_timestamp", "status", "timestamp"),
+        Index("ix_quotes_region_service_type_timestamp", "region", "service_type", "timestamp"),
+        # Customer lookups and scheduling
+        Index("ix_quotes_customer_email", "customer_email"),
+        Index("ix_quotes_cleaning_date", "cleaning_date"),
+    )
     
     id = Column(Integer, primary_key=True)
     quote_id = Column(String, unique=True, nullable=False)
@@ -97,12 +265,268 @@ class Quote(Base):
     original_markup_percentage = Column(Float, nullable=True)
     original_markup = Column(Float, nullable=True)
 
+# Add-on flags counted in the daily rollup (each gets a <flag>_count column)
+ROLLUP_ADDON_COLUMNS = [
+    "oven_clean", "carpet_cleaning", "internal_windows",
+    "external_windows", "balcony_patio", "cleaning_materials"
+]
+
+class QuoteDailyRollup(Base):
+    """Per day/region/service/status totals for the dashboard, kept in step with quotes.
+    
+    Money and hours are stored as integers (pennies and minutes, rounded per
+    quote) so totals summed over any set of rollup rows equal the same sums
+    taken over the quotes table exactly.
+    """
+    __tablename__ = 'quote_daily_rollup'
+    
+    day = Column(Date, primary_key=True)
+    region = Column(String, primary_key=True)
+    service_type = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)  # "" for quotes without a status
+    
+    quote_count = Column(Integer, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    revenue_pennies = Column(BigInteger, nullable=False, default=0)
+    labor_minutes = Column(BigInteger, nullable=False, default=0)
+    oven_clean_count = Column(Integer, nullable=False, default=0)
+    carpet_cleaning_count = Column(Integer, nullable=False, default=0)
+    internal_windows_count = Column(Integer, nullable=False, default=0)
+    external_windows_count = Column(Integer, nullable=False, default=0)
+    balcony_patio_count = Column(Integer, nullable=False, default=0)
+    cleaning_materials_count = Column(Integer, nullable=False, default=0)
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+    
+    version = Column(Integer, primary_key=True)
+    description = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.now)
+
+def _create_quotes_table(connection):
+    Base.metadata.create_all(connection, tables=[Quote.__table__])
+
+def _create_quote_indexes(connection):
+    for index in Quote.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+def quote_revenue_pennies(table):
+    """SQL expression for a quote's total price in whole pennies"""
+    return sqlalchemy.cast(sqlalchemy.func.round(table.c.total_price * 100), BigInteger)
+
+def quote_labor_minutes(table):
+    """SQL expression for a quote's labor (hours x cleaners) in whole minutes"""
+    return sqlalchemy.cast(
+        sqlalchemy.func.round(table.c.hours_required * table.c.cleaners_required * 60), BigInteger)
+
+def _count_where(condition):
+    return sqlalchemy.func.coalesce(sqlalchemy.func.sum(sqlalchemy.case((condition, 1), else_=0)), 0)
+
+def _rollup_query(conditions=()):
+    """SELECT producing quote_daily_rollup rows from the quotes matching conditions"""
+    table = Quote.__table__
+    day = sqlalchemy.func.date(table.c.timestamp)
+    status = sqlalchemy.func.coalesce(table.c.status, "")
+    return select(
+        day.label("day"),
+        table.c.region,
+        table.c.service_type,
+        status.label("status"),
+        sqlalchemy.func.count().label("quote_count"),
+        _count_where(table.c.sent_to_customer.is_(True)).label("sent_count"),
+        sqlalchemy.func.coalesce(sqlalchemy.func.sum(quote_revenue_pennies(table)), 0).label("revenue_pennies"),
+        sqlalchemy.func.coalesce(sqlalchemy.func.sum(quote_labor_minutes(table)), 0).label("labor_minutes"),
+        *[_count_where(table.c[column].is_(True)).label(f"{column}_count") for column in ROLLUP_ADDON_COLUMNS]
+    ).where(table.c.timestamp.is_not(None), *conditions).group_by(day, table.c.region, table.c.service_type, status)
+
+# Key and measure columns of quote_daily_rollup
+ROLLUP_KEY_COLUMNS = ["day", "region", "service_type", "status"]
+ROLLUP_MEASURE_COLUMNS = [
+    "quote_count", "sent_count", "revenue_pennies", "labor_minutes",
+    *[f"{column}_count" for column in ROLLUP_ADDON_COLUMNS]
+]
+
+def _begin_sqlite_write(connection):
+    """Take SQLite's write lock now, before reading what the write will change
+    (waits up to the busy timeout if another session is writing)"""
+    if connection.dialect.name == "sqlite" and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+def _lock_rollup(connection):
+    """Keep every quote writer out of the rollup until commit (for rebuilds)"""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('quote_daily_rollup'))"))
+    _begin_sqlite_write(connection)
+
+def _lock_quote_rollup(connection, quote_id):
+    """Lock one quote's rollup contribution until commit; writers to other quotes carry on"""
+    if connection.dialect.name == "postgresql":
+        # Shared with other writers, exclusive with a rebuild; the pair lock is per quote
+        # (and covers quotes that don't exist yet, which a row lock can't)
+        connection.execute(text(
+            "SELECT pg_advisory_xact_lock_shared(hashtext('quote_daily_rollup')), "
+            "pg_advisory_xact_lock(hashtext('quote_daily_rollup'), hashtext(:quote_id))"
+        ), {"quote_id": quote_id})
+    _begin_sqlite_write(connection)
+
+def _contribution_columns():
+    """The rollup key and measures a single quote adds, computed as _rollup_query does"""
+    table = Quote.__table__
+    return [
+        sqlalchemy.func.date(table.c.timestamp).label("day"),
+        table.c.region,
+        table.c.service_type,
+        sqlalchemy.func.coalesce(table.c.status, "").label("status"),
+        sqlalchemy.case((table.c.sent_to_customer.is_(True), 1), else_=0).label("sent_count"),
+        quote_revenue_pennies(table).label("revenue_pennies"),
+        quote_labor_minutes(table).label("labor_minutes"),
+        *[sqlalchemy.case((table.c[column].is_(True), 1), else_=0).label(f"{column}_count")
+          for column in ROLLUP_ADDON_COLUMNS]
+    ]
+
+def _contribution(row):
+    """Turn a row of _contribution_columns into (rollup key, {measure: value}), or None if it isn't rolled up"""
+    if row is None or row.day is None:
+        return None
+    # SQLite hands date() back as text
+    key = (pd.Timestamp(row.day).date(), row.region, row.service_type, row.status)
+    measures = {column: int(row._mapping[column] or 0) for column in ROLLUP_MEASURE_COLUMNS if column != "quote_count"}
+    return key, dict(measures, quote_count=1)
+
+def quote_contribution_query(quote_id):
+    """SELECT of what a stored quote adds to the rollup"""
+    return select(*_contribution_columns()).where(Quote.__table__.c.quote_id == quote_id)
+
+def _quote_contribution(connection, quote_id):
+    """Return what a stored quote adds to the rollup (see _contribution)"""
+    return _contribution(connection.execute(quote_contribution_query(quote_id)).first())
+
+def _move_contribution(connection, old, new):
+    """Take a quote's old contribution out of the rollup and add its new one, as deltas in one upsert"""
+    deltas = {}
+    for contribution, sign in ((old, -1), (new, 1)):
+        if contribution is None:
+            continue
+        key, measures = contribution
+        totals = deltas.setdefault(key, dict.fromkeys(ROLLUP_MEASURE_COLUMNS, 0))
+        for column, value in measures.items():
+            totals[column] += sign * value
+    # A re-save that changes nothing the rollup counts leaves it alone
+    deltas = {key: totals for key, totals in deltas.items() if any(totals.values())}
+    if not deltas:
+        return
+    
+    stmt = rollup_delta_query(connection.dialect.name, deltas)
+    if stmt is None:
+        refresh_quote_rollup(connection, deltas)
+        return
+    # A row whose last quote moved away is removed, as a fresh aggregation wouldn't have it
+    for row in connection.execute(stmt).all():
+        if row.quote_count == 0:
+            connection.execute(empty_rollup_row_query(tuple(row)[:len(ROLLUP_KEY_COLUMNS)]))
+
+def rollup_delta_query(dialect_name, deltas):
+    """Upsert adding {rollup key: {measure: delta}} to the rollup and returning each row's new quote_count
+    (None on databases without INSERT ... ON CONFLICT)"""
+    dialect_insert = UPSERT_DIALECTS.get(dialect_name)
+    if dialect_insert is None:
+        return None
+    rollup = QuoteDailyRollup.__table__
+    # Rows in key order, so two writers moving quotes in opposite directions lock them in the same order
+    stmt = dialect_insert(rollup).values([dict(zip(ROLLUP_KEY_COLUMNS, key), **totals) for key, totals in sorted(deltas.items())])
+    return stmt.on_conflict_do_update(
+        index_elements=[rollup.c[column] for column in ROLLUP_KEY_COLUMNS],
+        set_={column: rollup.c[column] + stmt.excluded[column] for column in ROLLUP_MEASURE_COLUMNS}
+    ).returning(*[rollup.c[column] for column in ROLLUP_KEY_COLUMNS], rollup.c.quote_count)
+
+def empty_rollup_row_query(key):
+    """DELETE of the rollup row for key if no quotes are left in it"""
+    rollup = QuoteDailyRollup.__table__
+    return delete(rollup).where(
+        *[rollup.c[column] == value for column, value in zip(ROLLUP_KEY_COLUMNS, key)], rollup.c.quote_count == 0
+    )
+
+def rollup_refresh_query(key):
+    """SELECT producing the rollup row for one (day, region, service_type, status) key from quotes"""
+    table = Quote.__table__
+    day, region, service_type, status = key
+    day_start = datetime.combine(day, datetime.min.time())
+    return _rollup_query([
+        table.c.timestamp >= day_start,
+        table.c.timestamp < day_start + timedelta(days=1),
+        table.c.region == region,
+        table.c.service_type == service_type,
+        sqlalchemy.func.coalesce(table.c.status, "") == status
+    ])
+
+def refresh_quote_rollup(connection, keys):
+    """Recompute the rollup rows for the given (day, region, service_type, status) keys from quotes (hold _lock_rollup)"""
+    rollup = QuoteDailyRollup.__table__
+    for key in set(keys):
+        if key is None:
+            continue
+        day, region, service_type, status = key
+        connection.execute(delete(rollup).where(
+            rollup.c.day == day, rollup.c.region == region,
+            rollup.c.service_type == service_type, rollup.c.status == status
+        ))
+        connection.execute(insert(rollup).from_select([column.name for column in rollup.c], rollup_refresh_query(key)))
+
+def rebuild_quote_rollup(connection):
+    """Replace the whole rollup with a fresh aggregation of quotes and return the number of rows"""
+    rollup = QuoteDailyRollup.__table__
+    _lock_rollup(connection)
+    connection.execute(delete(rollup))
+    connection.execute(insert(rollup).from_select([column.name for column in rollup.c], _rollup_query()))
+    return connection.execute(select(sqlalchemy.func.count()).select_from(rollup)).scalar()
+
+def check_quote_rollup(connection):
+    """Return the rollup keys whose stored row differs from a fresh aggregation of quotes"""
+    rollup = QuoteDailyRollup.__table__
+    stored = {tuple(row[:4]): tuple(row[4:]) for row in connection.execute(select(rollup))}
+    fresh = {tuple(row[:4]): tuple(row[4:]) for row in connection.execute(_rollup_query())}
+    # SQLite hands date() back as text, the rollup column as a date
+    fresh = {(pd.Timestamp(key[0]).date(),) + key[1:]: values for key, values in fresh.items()}
+    return sorted(key for key in stored.keys() | fresh.keys() if stored.get(key) != fresh.get(key))
+
+def _create_quote_rollup(connection):
+    Base.metadata.create_all(connection, tables=[QuoteDailyRollup.__table__])
+    rebuild_quote_rollup(connection)
+
+# Schema migrations, applied in order and recorded in schema_version.
+# Append new steps with the next version number; never edit applied ones.
+MIGRATIONS = [
+    (1, "Create quotes table", _create_quotes_table),
+    (2, "Add secondary indexes on quotes", _create_quote_indexes),
+    (3, "Create and backfill quote_daily_rollup", _create_quote_rollup),
+]
+
+def get_schema_version(connection):
+    """Return the highest applied migration version (0 for a new database)"""
+    return connection.execute(select(sqlalchemy.func.max(SchemaVersion.version))).scalar() or 0
+
+def run_migrations(engine):
+    """Apply any pending MIGRATIONS and return the resulting schema version"""
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Serialise concurrent app processes starting up against the same database
+            connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('quotes_schema_version'))"))
+        SchemaVersion.__table__.create(connection, checkfirst=True)
+        
+        current_version = get_schema_version(connection)
+        for version, description, migrate in MIGRATIONS:
+            if version <= current_version:
+                continue
+            migrate(connection)
+            connection.execute(insert(SchemaVersion).values(version=version, description=description))
+            print(f"Applied database migration {version}: {description}")
+            current_version = version
+    return current_version
+
 # Initialize database
 def initialize_db():
-    """Initialize the database with necessary tables"""
-    engine = get_db_connection()
-    Base.metadata.create_all(engine)
-    return engine
+    """Initialize the database with necessary tables (migrations run once per process)"""
+    return get_db_connection()
 
 # Convert quote_data to database format
 def quote_data_to_db_format(quote_data):
@@ -185,13 +609,57 @@ def quote_data_to_db_format(quote_data):
     
     return db_data
 
+# Dialects with INSERT ... ON CONFLICT support
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+def upsert_quote_query(dialect_name, db_data):
+    """INSERT ... ON CONFLICT of a quote by quote_id, returning what it now adds to the rollup
+    (None on databases without it)"""
+    dialect_insert = UPSERT_DIALECTS.get(dialect_name)
+    if dialect_insert is None:
+        return None
+    stmt = dialect_insert(Quote).values(**db_data)
+    return stmt.on_conflict_do_update(
+        index_elements=[Quote.quote_id],
+        set_={column: stmt.excluded[column] for column in db_data if column != "quote_id"}
+    ).returning(*_contribution_columns())
+
+def update_quote_query(quote_id, **values):
+    """UPDATE of some columns of one quote"""
+    return update(Quote).where(Quote.quote_id == quote_id).values(**values)
+
+def upsert_quote(connection, db_data):
+    """Insert or update a quote by quote_id in one statement and return what it now adds to the rollup"""
+    stmt = upsert_quote_query(connection.dialect.name, db_data)
+    if stmt is None:
+        # Fallback for other databases: update, then insert if nothing matched
+        result = connection.execute(update_quote_query(db_data["quote_id"], **db_data))
+        if result.rowcount == 0:
+            connection.execute(insert(Quote).values(**db_data))
+        return _quote_contribution(connection, db_data["quote_id"])
+    return _contribution(connection.execute(stmt).first())
+
+def _update_quote(connection, quote_id, **values):
+    """Update columns of one quote, keeping the rollup in step"""
+    _lock_quote_rollup(connection, quote_id)
+    old = _quote_contribution(connection, quote_id)
+    stmt = update_quote_query(quote_id, **values)
+    if connection.dialect.update_returning:
+        new = _contribution(connection.execute(stmt.returning(*_contribution_columns())).first())
+    else:
+        connection.execute(stmt)
+        new = _quote_contribution(connection, quote_id)
+    _move_contribution(connection, old, new)
+
 # Save quote to database
 def save_quote_to_db(quote_data):
     """Save quote data to the database"""
     from utils.data_storage import generate_quote_id
     
-    # Initialize database
-    engine = initialize_db()
+    engine = get_db_connection()
     
     # Generate quote ID if not already present
     if "quote_id" not in quote_data:
@@ -202,63 +670,238 @@ def save_quote_to_db(quote_data):
     
     # Create a connection
     with engine.connect() as connection:
-        # Check if quote already exists
-        result = connection.execute(
-            text("SELECT * FROM quotes WHERE quote_id = :quote_id"),
-            {"quote_id": db_data["quote_id"]}
-        )
-        existing_quote = result.fetchone()
-        
-        if existing_quote:
-            # Update existing quote
-            stmt = update(Quote).where(Quote.quote_id == db_data["quote_id"]).values(**db_data)
-            connection.execute(stmt)
-        else:
-            # Insert new quote
-            stmt = insert(Quote).values(**db_data)
-            connection.execute(stmt)
-        
+        # The quote may move between rollup rows (e.g. a status change), so
+        # its old contribution comes out of one and the new one goes into the other
+        _lock_quote_rollup(connection, quote_data["quote_id"])
+        old = _quote_contribution(connection, quote_data["quote_id"])
+        _move_contribution(connection, old, upsert_quote(connection, db_data))
         connection.commit()
+    invalidate_quote_cache(quote_data["quote_id"])
     
     return quote_data["quote_id"]
 
-# Get all quotes from database
-def get_quotes_from_db():
-    """Get all quotes from the database and return as a pandas DataFrame"""
-    engine = get_db_connection()
+# Low-cardinality text columns, loaded as pandas categoricals when asked
+CATEGORY_COLUMNS = [
+    "status", "region", "service_type", "property_size", "cleanliness_level",
+    "pet_status", "cleaner_preference", "time_preference", "referral_source"
+]
+
+def _quote_conditions(filters=None, start_date=None, end_date=None, search=None):
+    """Build WHERE conditions for the quote query helpers"""
+    table = Quote.__table__
+    conditions = []
+    for column, value in (filters or {}).items():
+        if column not in table.c:
+            raise ValueError(f"Unknown quote column: {column}")
+        if isinstance(value, (list, tuple, set)):
+            conditions.append(table.c[column].in_(list(value)))
+        else:
+            conditions.append(table.c[column] == value)
+    if start_date is not None:
+        conditions.append(table.c.timestamp >= pd.Timestamp(start_date).to_pydatetime())
+    if end_date is not None:
+        conditions.append(table.c.timestamp < pd.Timestamp(end_date).to_pydatetime())
+    if search:
+        conditions.append(table.c.quote_id.icontains(search, autoescape=True))
+    return conditions
+
+# Get quotes from database
+def get_quotes_from_db(filters=None, columns=None, start_date=None, end_date=None,
+                       search=None, cursor=None, limit=None, categorical=False):
+    """Get quotes, newest first, as a pandas DataFrame.
+    
+    Everything is done in SQL: filters maps a column to a value or a list of
+    values, columns selects a subset of columns, start_date/end_date bound the
+    quote timestamp (end exclusive), search matches part of the quote ID, and
+    limit/cursor page through the results (cursor is the value returned by
+    get_next_cursor for the previous page). categorical=True loads the
+    CATEGORY_COLUMNS as pandas categoricals to save memory. With no
+    arguments every quote is returned.
+    """
+    query = quotes_query(filters, columns, start_date, end_date, search, cursor, limit)
     
     try:
-        # Query all quotes
-        query = "SELECT * FROM quotes ORDER BY timestamp DESC"
-        return pd.read_sql(query, engine)
+        quotes_df = pd.read_sql(query, get_db_connection())
     except Exception as e:
         print(f"Error retrieving quotes from database: {str(e)}")
         return pd.DataFrame()
+    
+    if categorical:
+        for column in CATEGORY_COLUMNS:
+            if column in quotes_df.columns:
+                quotes_df[column] = quotes_df[column].astype("category")
+    return quotes_df
+
+def quotes_query(filters=None, columns=None, start_date=None, end_date=None, search=None, cursor=None, limit=None):
+    """The SELECT get_quotes_from_db runs (same arguments)"""
+    table = Quote.__table__
+    
+    if columns:
+        unknown = [column for column in columns if column not in table.c]
+        if unknown:
+            raise ValueError(f"Unknown quote column(s): {', '.join(unknown)}")
+        # Paging needs the sort key of the last row
+        selected = list(dict.fromkeys(list(columns) + (["timestamp", "id"] if limit else [])))
+        query = select(*[table.c[column] for column in selected])
+    else:
+        query = select(table)
+    
+    conditions = _quote_conditions(filters, start_date, end_date, search)
+    if cursor is not None:
+        # Keyset pagination: rows strictly after the previous page's last (timestamp, id)
+        cursor_timestamp, cursor_id = cursor
+        cursor_timestamp = pd.Timestamp(cursor_timestamp).to_pydatetime()
+        conditions.append(sqlalchemy.or_(
+            table.c.timestamp < cursor_timestamp,
+            sqlalchemy.and_(table.c.timestamp == cursor_timestamp, table.c.id < cursor_id)
+        ))
+    if conditions:
+        query = query.where(*conditions)
+    
+    query = query.order_by(table.c.timestamp.desc(), table.c.id.desc())
+    if limit:
+        query = query.limit(limit)
+    return query
+
+def get_next_cursor(quotes_df, limit):
+    """Return the cursor for the page after quotes_df, or None if it was the last page"""
+    if limit is None or len(quotes_df) < limit:
+        return None
+    last_row = quotes_df.iloc[-1]
+    return (last_row["timestamp"], int(last_row["id"]))
+
+def _rollup_count_query(filters=None, start_date=None, end_date=None, search=None):
+    """count_quotes' query answered from quote_daily_rollup, or None if the rollup can't answer it
+    (a search, a filter on a column that isn't a rollup key, or a date that isn't midnight)"""
+    if search:
+        return None
+    rollup = QuoteDailyRollup.__table__
+    conditions = []
+    for column, value in (filters or {}).items():
+        if column not in ("region", "service_type", "status"):
+            return None
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        conditions.append(rollup.c[column].in_(values))
+    for bound in (start_date, end_date):
+        if bound is not None and pd.Timestamp(bound) != pd.Timestamp(bound).normalize():
+            return None
+    if start_date is not None:
+        conditions.append(rollup.c.day >= pd.Timestamp(start_date).date())
+    if end_date is not None:
+        conditions.append(rollup.c.day < pd.Timestamp(end_date).date())
+    return select(sqlalchemy.func.coalesce(sqlalchemy.func.sum(rollup.c.quote_count), 0)).where(*conditions)
+
+def count_quotes_query(filters=None, start_date=None, end_date=None, search=None):
+    """The SELECT count_quotes runs (same arguments)"""
+    query = _rollup_count_query(filters, start_date, end_date, search)
+    if query is None:
+        query = select(sqlalchemy.func.count()).select_from(Quote.__table__)
+        conditions = _quote_conditions(filters, start_date, end_date, search)
+        if conditions:
+            query = query.where(*conditions)
+    return query
+
+def count_quotes(filters=None, start_date=None, end_date=None, search=None):
+    """Count the quotes matching the same filters as get_quotes_from_db.
+    
+    Counts by region, service type, status and whole days are summed from
+    quote_daily_rollup (which leaves out quotes without a timestamp); the
+    rest are counted from quotes.
+    """
+    query = count_quotes_query(filters, start_date, end_date, search)
+    try:
+        with get_db_connection().connect() as connection:
+            return connection.execute(query).scalar()
+    except Exception as e:
+        print(f"Error counting quotes: {str(e)}")
+        return 0
+
+def filter_options_query(columns=("status", "service_type", "region")):
+    """The SELECT get_quote_filter_options runs"""
+    rollup = QuoteDailyRollup.__table__
+    return select(*[rollup.c[column] for column in columns]).distinct()
+
+def get_quote_filter_options(columns=("status", "service_type", "region")):
+    """Return the distinct values of each filter column, for building filter widgets.
+    
+    The values come from quote_daily_rollup in one query, so a page render
+    reads a few rows per day of history instead of scanning quotes. Columns
+    must be rollup keys (region, service_type, status).
+    """
+    engine = get_db_connection()
+    values = {column: set() for column in columns}
+    try:
+        with engine.connect() as connection:
+            for row in connection.execute(filter_options_query(columns)):
+                for column, value in zip(columns, row):
+                    # "" is the rollup's status for quotes without one
+                    if value:
+                        values[column].add(value)
+    except Exception as e:
+        print(f"Error retrieving quote filter options: {str(e)}")
+        return {}
+    return {column: sorted(column_values) for column, column_values in values.items()}
+
+# Single-quote lookups are cached briefly so rerenders of the details panel
+# don't go back to the database. Writes through this module invalidate the
+# entry; the TTL bounds staleness from writes made by other processes.
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "30"))
+QUOTE_CACHE_SIZE = int(os.getenv("QUOTE_CACHE_SIZE", "1024"))
+
+_quote_cache_lock = threading.Lock()
+_quote_cache = {}
+_quote_cache_stats = {"hits": 0, "misses": 0}
+
+# Built once; SQLAlchemy reuses the compiled statement for every lookup
+_quote_by_id_query = select(Quote.__table__).where(Quote.__table__.c.quote_id == sqlalchemy.bindparam("quote_id"))
+
+def invalidate_quote_cache(quote_id=None):
+    """Drop one quote (or every quote) from the get_quote_by_id cache"""
+    with _quote_cache_lock:
+        if quote_id is None:
+            _quote_cache.clear()
+        else:
+            _quote_cache.pop(quote_id, None)
+
+def get_quote_cache_stats():
+    """Return hit/miss counters and occupancy for the get_quote_by_id cache"""
+    with _quote_cache_lock:
+        return dict(_quote_cache_stats, size=len(_quote_cache), ttl=QUOTE_CACHE_TTL)
+
+def _fetch_quote(quote_id):
+    """Read one quote row as a dict (None if there is no such quote)"""
+    engine = get_db_connection()
+    with engine.connect() as connection:
+        row = connection.execute(_quote_by_id_query, {"quote_id": quote_id}).mappings().first()
+    return dict(row) if row is not None else None
 
 # Get a specific quote from database
 def get_quote_by_id(quote_id):
-    """Get a specific quote by ID"""
-    engine = get_db_connection()
+    """Get a specific quote by ID as a dict of column values (None if not found)"""
+    now = time.monotonic()
+    with _quote_cache_lock:
+        entry = _quote_cache.get(quote_id)
+        if entry is not None and entry[0] > now:
+            _quote_cache_stats["hits"] += 1
+            return dict(entry[1])
+        _quote_cache_stats["misses"] += 1
     
     try:
-        query = f"SELECT * FROM quotes WHERE quote_id = '{quote_id}'"
-        df = pd.read_sql(query, engine)
-        if len(df) > 0:
-            # Get the data and provide debug output
-            quote_data = df.iloc[0].to_dict()
-            print(f"Database returned quote {quote_id} with {len(quote_data)} fields")
-            # Check for important fields
-            important_fields = ["customer_name", "property_size", "service_type", "total_price"]
-            for field in important_fields:
-                if field not in quote_data or quote_data[field] is None:
-                    print(f"WARNING: Missing or None value for '{field}' in quote {quote_id}")
-            
-            return quote_data
-        print(f"WARNING: No data found for quote {quote_id}")
-        return None
+        quote_data = _fetch_quote(quote_id)
     except Exception as e:
         print(f"ERROR retrieving quote {quote_id}: {str(e)}")
         return None
+    if quote_data is None:
+        return None
+    
+    if QUOTE_CACHE_TTL > 0:
+        with _quote_cache_lock:
+            if len(_quote_cache) >= QUOTE_CACHE_SIZE:
+                # Evict the entry closest to expiry
+                del _quote_cache[min(_quote_cache, key=lambda key: _quote_cache[key][0])]
+            _quote_cache[quote_id] = (now + QUOTE_CACHE_TTL, quote_data)
+    # Callers get their own copy so edits can't leak into the cache
+    return dict(quote_data)
 
 # Update quote status
 def update_quote_status(quote_id, status):
@@ -267,31 +910,13 @@ def update_quote_status(quote_id, status):
     engine = get_db_connection()
     
     with engine.connect() as connection:
-        stmt = update(Quote).where(Quote.quote_id == quote_id).values(status=status)
-        connection.execute(stmt)
+        _update_quote(connection, quote_id, status=status)
         connection.commit()
+    invalidate_quote_cache(quote_id)
     
     # Update in CSV
-    try:
-        from utils.data_storage import initialize_csv_if_needed
-        import pandas as pd
-        import os
-        
-        # Initialize CSV file if it doesn't exist
-        initialize_csv_if_needed()
-        
-        # Get CSV path
-        csv_path = os.path.join("data", "quotes.csv")
-        
-        # Read the CSV file
-        df = pd.read_csv(csv_path)
-        
-        # Find the quote by ID
-        if quote_id in df["quote_id"].values:
-            df.loc[df["quote_id"] == quote_id, "status"] = status
-            df.to_csv(csv_path, index=False)
-    except Exception as e:
-        print(f"Error updating status in CSV: {str(e)}")
+    from utils.data_storage import update_csv_status
+    update_csv_status(quote_id, status)
     
     return True
 
@@ -304,9 +929,9 @@ def update_sent_to_customer(quote_id, sent=True):
     engine = get_db_connection()
     
     with engine.connect() as connection:
-        stmt = update(Quote).where(Quote.quote_id == quote_id).values(sent_to_customer=sent)
-        connection.execute(stmt)
+        _update_quote(connection, quote_id, sent_to_customer=sent)
         connection.commit()
+    invalidate_quote_cache(quote_id)
     
     # Update in CSV
     update_csv_sent_to_customer(quote_id, sent)
@@ -0,0 +1,70 @@
+"""
+Cross-process file locks and atomic file replacement
+
+Streamlit sessions share a process, but the scheduled backup and any
+second server process don't, so the quote store's thread locks are
+backed by flock() locks on a lock file: shared for readers, exclusive
+for writers. Where fcntl isn't available (Windows) only the thread
+locks apply.
+"""
+
+import os
+import tempfile
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+@contextlib.contextmanager
+def file_lock(path, shared=False):
+    """Hold a shared or exclusive lock on path (created if missing) for the duration of the block"""
+    if fcntl is None:
+        yield
+        return
+    descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(descriptor)
+
+def try_hold_lock(path):
+    """Take an exclusive lock on path without waiting; return the open descriptor holding it, or None if it is taken
+
+    The lock lasts until the descriptor is closed (or the process exits).
+    Raises OSError where fcntl isn't available.
+    """
+    if fcntl is None:
+        raise OSError("file locks are not available on this platform")
+    descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(descriptor)
+        return None
+    except BaseException:
+        os.close(descriptor)
+        raise
+    return descriptor
+
+@contextlib.contextmanager
+def atomic_write(path, mode="w", **open_args):
+    """Write to a temporary file beside path, then rename it over path once the block succeeds"""
+    directory, name = os.path.split(path)
+    # Dot-prefixed so directory scans (e.g. Parquet dataset discovery) skip it
+    descriptor, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory or ".")
+    try:
+        # mkstemp creates files readable by the owner only
+        os.chmod(temp_path, 0o644)
+        with os.fdopen(descriptor, mode, **open_args) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,60 @@
+"""
+Fixed-point money helpers
+
+With PRICING_MONEY_MODE=pennies the pricing engine works in integer
+pennies (and integer fixed-point multipliers/percentages) from the config
+values through to the total, rounding half up exactly once at each step.
+Prices are still returned as pounds so price_details keeps its shape.
+"""
+
+import os
+from decimal import Decimal, ROUND_HALF_UP
+
+# "float" (default) keeps the original binary-float arithmetic
+PRICING_MONEY_MODE = os.getenv("PRICING_MONEY_MODE", "float").lower()
+
+PENNIES_PER_POUND = 100
+
+# Hours, multipliers and percentages are held as integer 1/10000ths
+FIXED_POINT_SCALE = 10000
+
+def is_pennies_mode():
+    """Return True if prices are calculated in integer pennies"""
+    return PRICING_MONEY_MODE == "pennies"
+
+def to_fixed(value, scale=FIXED_POINT_SCALE):
+    """Convert a number to an integer count of 1/scale units, rounding half up"""
+    if value is None:
+        return None
+    # str() gives the shortest decimal for a float, so 2.675 rounds like the written value
+    return int((Decimal(str(value)) * scale).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def to_pennies(amount):
+    """Convert a pound amount to integer pennies, rounding half up"""
+    return to_fixed(amount, PENNIES_PER_POUND)
+
+def to_pounds(pennies):
+    """Convert integer pennies back to a pound amount"""
+    return pennies / PENNIES_PER_POUND
+
+def divide_half_up(numerator, denominator):
+    """Integer division rounding halves away from zero (denominator must be positive)"""
+    if numerator >= 0:
+        return (2 * numerator + denominator) // (2 * denominator)
+    return -((-2 * numerator + denominator) // (2 * denominator))
+
+def percentage_of_pennies(pennies, percentage):
+    """Return percentage% of an amount in pennies, rounded half up to the penny"""
+    return divide_half_up(pennies * to_fixed(percentage), 100 * FIXED_POINT_SCALE)
+
+def percentage_of(amount, percentage):
+    """Return percentage% of a pound amount (to the penny in pennies mode)"""
+    if not is_pennies_mode():
+        return amount * (percentage / 100)
+    return to_pounds(percentage_of_pennies(to_pennies(amount), percentage))
+
+def round_money(amount):
+    """Round a pound amount to the penny in pennies mode (unchanged otherwise)"""
+    if not is_pennies_mode():
+        return amount
+    return to_pounds(to_pennies(amount))
@@ -0,0 +1,175 @@
+"""
+Parquet storage for quotes
+
+The columnar alternative to data/quotes.csv, used by utils.data_storage
+when QUOTE_STORE_BACKEND=parquet. Quotes are kept as a Parquet dataset
+partitioned by month of timestamp (data/quotes_parquet/month=YYYY-MM/),
+with a typed schema so booleans, prices and timestamps come back as
+such instead of being re-inferred from text. Readers load only the
+columns they ask for, and date filters skip whole months.
+
+Rows move in and out of utils.data_storage as lists of strings in
+CSV_HEADERS order (the form the event log replays into); this module
+does the conversion both ways. Requires pyarrow.
+"""
+
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from utils.data_storage import CSV_HEADERS
+from utils.file_lock import atomic_write
+
+BOOLEAN_COLUMNS = [
+    "admin_created", "sent_to_customer", "oven_clean", "carpet_cleaning",
+    "internal_windows", "external_windows", "balcony_patio", "cleaning_materials"
+]
+INTEGER_COLUMNS = ["num_bathrooms", "num_reception_rooms", "carpet_rooms", "cleaners_required", "original_cleaners"]
+FLOAT_COLUMNS = [
+    "base_price", "extra_bathrooms_cost", "extra_reception_cost", "additional_services_cost", "materials_cost",
+    "subtotal", "markup_percentage", "markup", "total_price",
+    "hourly_rate", "hours_required", "region_multiplier",
+    "regular_client_discount_percentage", "regular_client_discount_amount",
+    "original_price", "original_hours", "original_markup_percentage", "original_markup"
+]
+
+def _column_type(column):
+    if column == "timestamp":
+        return pa.timestamp("us")
+    if column in BOOLEAN_COLUMNS:
+        return pa.bool_()
+    if column in INTEGER_COLUMNS:
+        return pa.int64()
+    if column in FLOAT_COLUMNS:
+        return pa.float64()
+    return pa.string()
+
+QUOTE_SCHEMA = pa.schema([(column, _column_type(column)) for column in CSV_HEADERS])
+
+# The month partition, as written in directory names
+PARTITION_SCHEMA = pa.schema([("month", pa.string())])
+NO_TIMESTAMP_MONTH = "unknown"
+
+def typed_frame(rows):
+    """Convert rows of strings in CSV_HEADERS order into a DataFrame with QUOTE_SCHEMA types"""
+    frame = pd.DataFrame(list(rows), columns=CSV_HEADERS, dtype=object).replace("", None)
+    for column in CSV_HEADERS:
+        if column == "timestamp":
+            frame[column] = pd.to_datetime(frame[column], errors="coerce")
+        elif column in BOOLEAN_COLUMNS:
+            frame[column] = frame[column].map(lambda value: None if value is None else str(value).lower() == "true")
+        elif column in INTEGER_COLUMNS or column in FLOAT_COLUMNS:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    return frame
+
+def string_rows(table):
+    """Return {quote_id: row of strings in CSV_HEADERS order} for a quotes table"""
+    timestamps = pc.strftime(table.column("timestamp").cast(pa.timestamp("s")), format="%Y-%m-%d %H:%M:%S")
+    table = table.set_column(table.schema.get_field_index("timestamp"), "timestamp", timestamps)
+    rows = {}
+    for values in zip(*[table.column(column).to_pylist() for column in CSV_HEADERS]):
+        row = ["" if value is None else str(value) for value in values]
+        rows[row[0]] = row
+    return rows
+
+def _to_table(frame):
+    return pa.Table.from_pandas(frame[CSV_HEADERS], schema=QUOTE_SCHEMA, preserve_index=False)
+
+def rows_frame(rows):
+    """Convert rows of strings into a DataFrame with the same dtypes read_quotes returns"""
+    return _to_table(typed_frame(rows)).to_pandas()
+
+def _months(table):
+    timestamps = table.column("timestamp").to_pandas()
+    return timestamps.dt.strftime("%Y-%m").fillna(NO_TIMESTAMP_MONTH).tolist()
+
+def _dataset(path):
+    return ds.dataset(path, schema=pa.unify_schemas([QUOTE_SCHEMA, PARTITION_SCHEMA]), format="parquet",
+                      partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"))
+
+def _partition_path(path, month):
+    return os.path.join(path, f"month={month}", "quotes.parquet")
+
+def _write_partition(path, month, table):
+    """Atomically replace one month's file (removing it when table is empty)"""
+    file_path = _partition_path(path, month)
+    if table.num_rows == 0:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with atomic_write(file_path, "wb") as file:
+        pq.write_table(table, file)
+
+def _filter(start_date=None, end_date=None, quote_ids=None, exclude_ids=None):
+    """Build a dataset filter; start_date is inclusive and end_date exclusive, as in get_quotes_from_db"""
+    expression = None
+
+    def both(condition):
+        return condition if expression is None else expression & condition
+
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        # The month condition prunes whole partitions before any file is opened
+        expression = both((ds.field("month") >= start.strftime("%Y-%m")) & (ds.field("timestamp") >= start))
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        expression = both((ds.field("month") <= end.strftime("%Y-%m")) & (ds.field("timestamp") < end))
+    if quote_ids is not None:
+        expression = both(ds.field("quote_id").isin(list(quote_ids)))
+    if exclude_ids:
+        expression = both(~ds.field("quote_id").isin(list(exclude_ids)))
+    return expression
+
+def write_dataset(path, rows):
+    """Write rows of strings as a new dataset at path, replacing any existing one"""
+    table = _to_table(typed_frame(rows))
+    temp_path = path + ".tmp"
+    months = pd.Series(_months(table))
+    for month in months.unique():
+        _write_partition(temp_path, month, table.filter(pa.array((months == month).tolist())))
+    os.makedirs(temp_path, exist_ok=True)
+    if os.path.exists(path):
+        os.rename(path, path + ".old")
+    os.rename(temp_path, path)
+    if os.path.exists(path + ".old"):
+        shutil.rmtree(path + ".old")
+
+def read_quotes(path, columns=None, start_date=None, end_date=None, exclude_ids=None):
+    """Load quotes as a typed DataFrame, reading only the given columns and the months in range"""
+    table = _dataset(path).to_table(
+        columns=list(columns) if columns is not None else CSV_HEADERS,
+        filter=_filter(start_date, end_date, exclude_ids=exclude_ids)
+    )
+    return table.to_pandas()
+
+def read_rows(path, quote_ids):
+    """Return {quote_id: row of strings} for the given quotes"""
+    if not quote_ids:
+        return {}
+    return string_rows(_dataset(path).to_table(columns=CSV_HEADERS, filter=_filter(quote_ids=quote_ids)))
+
+def replace_quotes(path, quote_ids, rows):
+    """Replace the stored versions of quote_ids with rows, rewriting only the months involved"""
+    dataset = _dataset(path)
+    current = dataset.to_table(columns=["month"], filter=_filter(quote_ids=quote_ids))
+    table = _to_table(typed_frame(rows))
+    new_months = pd.Series(_months(table), dtype=object)
+    # A re-saved quote gets a new timestamp, so it can move between months
+    for month in set(current.column("month").to_pylist()) | set(new_months):
+        existing_path = _partition_path(path, month)
+        if os.path.exists(existing_path):
+            existing = pq.read_table(existing_path, schema=QUOTE_SCHEMA)
+            replaced = pc.is_in(existing.column("quote_id"), value_set=pa.array(list(quote_ids), pa.string()))
+            existing = existing.filter(pc.invert(replaced))
+        else:
+            existing = QUOTE_SCHEMA.empty_table()
+        added = table.filter(pa.array((new_months == month).tolist(), pa.bool_()))
+        _write_partition(path, month, pa.concat_tables([existing, added]))
+
+def dataset_size(path):
+    """Return the bytes used by the dataset at path"""
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
@@ -0,0 +1,264 @@
+"""
+Precomputed price cube
+
+Optional mode (set PRICE_CUBE_ENABLED=true) that prices the whole quote
+input space once per pricing-config version so a quote can be answered
+with table lookups instead of running calculate_price.
+
+Only hours, cleaners and base price depend on the combination of service
+type, size, region, cleanliness, pets and the crew-affecting add-ons, so
+those live in one dense cube. Room, add-on and materials costs are simply
+added on top, so they are kept as small 1-D tables instead of multiplying
+the cube by every room count and flag. The totals are re-assembled in the
+same order as calculate_price, so results match it exactly.
+
+The cube is written to data/price_cube/<config version>/ and memory-mapped,
+and is rebuilt in a background thread whenever the config version changes.
+Building a new cube deletes the directories of older versions.
+"""
+
+import os
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from utils.pricing import get_compiled_pricing, get_pricing_config_version
+from utils.batch_pricing import calculate_prices_batch
+from utils.money import is_pennies_mode
+
+CUBE_DIR = os.path.join("data", "price_cube")
+
+# Largest room counts the quote form allows
+MAX_ROOMS = 10
+
+# Fields stored in the last axis of the labor cube
+LABOR_FIELDS = ("hours_required", "cleaners_required", "base_price")
+
+# Add-on flags that affect the cleaner allocation, in bit order
+CREW_FLAGS = ("oven_clean", "carpet_cleaning", "internal_windows", "external_windows")
+
+_cube_lock = threading.Lock()
+_cube_state = {"version": None, "cube": None, "building": None}
+
+def is_price_cube_enabled():
+    """Return True if the precomputed price cube mode is switched on"""
+    # The cube re-adds costs in float, so it isn't used when pricing in pennies
+    if is_pennies_mode():
+        return False
+    return os.getenv("PRICE_CUBE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+class PriceCube:
+    """Array-backed lookup tables covering every quote for one config version"""
+
+    def __init__(self, compiled, labor, extras):
+        self.compiled = compiled
+        # labor[service, size, region, cleanliness, pet, crew_flags, field]
+        self.labor = labor
+        self.extras = extras
+        # extras rows: bathroom cost, reception cost (by room count),
+        # additional services (by 5-bit add-on mask), materials (0/1)
+        self.bathroom_costs = extras[0, :MAX_ROOMS]
+        self.reception_costs = extras[1, :MAX_ROOMS]
+        self.additional_costs = extras[2, :32]
+        self.materials_costs = extras[3, :2]
+
+    @property
+    def nbytes(self):
+        """Size of the lookup tables in bytes"""
+        return self.labor.nbytes + self.extras.nbytes
+
+    def lookup(self, quote_data):
+        """Return price_details for a quote, or None if it falls outside the cube"""
+        compiled = self.compiled
+        property_info = quote_data["property_info"]
+        service_info = quote_data["service_info"]
+        additional_services = service_info["additional_services"]
+
+        service_code = compiled.service_codes.get(service_info["service_type"])
+        size_code = compiled.size_codes.get(property_info["property_size"])
+        region_code = compiled.region_codes.get(property_info["region"])
+        cleanliness_code = compiled.cleanliness_codes.get(service_info.get("cleanliness_level", "Normal"))
+        pet_code = compiled.pet_codes.get(service_info.get("pet_status", "No Pets"))
+        num_bathrooms = property_info["num_bathrooms"]
+        num_reception_rooms = property_info["num_reception_rooms"]
+
+        if None in (service_code, size_code, region_code, cleanliness_code, pet_code):
+            return None
+        if not (1 <= num_bathrooms <= MAX_ROOMS and 1 <= num_reception_rooms <= MAX_ROOMS):
+            return None
+        carpet_cleaning = bool(additional_services["carpet_cleaning"])
+        if carpet_cleaning and additional_services["carpet_rooms"] != 1:
+            return None
+
+        crew_mask = (bool(additional_services["oven_clean"])
+                     | carpet_cleaning << 1
+                     | bool(additional_services["internal_windows"]) << 2
+                     | bool(additional_services["external_windows"]) << 3)
+        addon_mask = crew_mask | bool(additional_services["balcony_patio"]) << 4
+
+        hours_required, cleaners_required, base_price = self.labor[
+            service_code, size_code, region_code, cleanliness_code, pet_code, crew_mask
+        ].tolist()
+        extra_bathrooms_cost = float(self.bathroom_costs[num_bathrooms - 1])
+        extra_reception_cost = float(self.reception_costs[num_reception_rooms - 1])
+        additional_services_cost = float(self.additional_costs[addon_mask])
+        materials_cost = float(self.materials_costs[int(bool(service_info["cleaning_materials"]))])
+
+        subtotal = base_price + extra_bathrooms_cost + extra_reception_cost + additional_services_cost + materials_cost
+        markup_percentage = compiled.markup_percentage
+        markup = subtotal * (markup_percentage / 100)
+
+        return {
+            "hourly_rate": compiled.hourly_rate,
+            "hours_required": hours_required,
+            "cleaners_required": int(cleaners_required),
+            "region_multiplier": compiled.region_multipliers[region_code],
+            "base_price": base_price,
+            "extra_bathrooms_cost": extra_bathrooms_cost,
+            "extra_reception_cost": extra_reception_cost,
+            "additional_services_cost": additional_services_cost,
+            "materials_cost": materials_cost,
+            "subtotal": subtotal,
+            "markup_percentage": markup_percentage,
+            "markup": markup,
+            "total_price": subtotal + markup,
+            "extra_costs": compiled.extra_costs
+        }
+
+def _labor_grid(compiled):
+    """Build a DataFrame enumerating every labor-cube cell in C order"""
+    shape = (len(compiled.service_types), len(compiled.property_sizes), len(compiled.regions),
+             len(compiled.cleanliness_levels), len(compiled.pet_statuses), 1 << len(CREW_FLAGS))
+    index = np.indices(shape).reshape(len(shape), -1)
+    grid = pd.DataFrame({
+        "service_type": np.asarray(compiled.service_types, dtype=object)[index[0]],
+        "property_size": np.asarray(compiled.property_sizes, dtype=object)[index[1]],
+        "region": np.asarray(compiled.regions, dtype=object)[index[2]],
+        "cleanliness_level": np.asarray(compiled.cleanliness_levels, dtype=object)[index[3]],
+        "pet_status": np.asarray(compiled.pet_statuses, dtype=object)[index[4]],
+        "num_bathrooms": 1,
+        "num_reception_rooms": 1
+    })
+    for bit, flag in enumerate(CREW_FLAGS):
+        grid[flag] = (index[5] >> bit & 1).astype(bool)
+    grid["carpet_rooms"] = grid["carpet_cleaning"].astype(np.int64)
+    return grid, shape
+
+def _extras_table(compiled):
+    """Build the additive cost tables, summed the same way calculate_price does"""
+    extras = np.zeros((4, 32), dtype=np.float64)
+    for rooms in range(1, MAX_ROOMS + 1):
+        extras[0, rooms - 1] = (rooms - 1) * compiled.extra_bathroom_cost if rooms > 1 else 0
+        extras[1, rooms - 1] = (rooms - 1) * compiled.extra_reception_cost if rooms > 1 else 0
+    for mask in range(32):
+        cost = 0
+        if mask & 1:
+            cost += compiled.oven_clean_cost
+        if mask & 2:
+            cost += compiled.carpet_cost_per_room * 1
+        if mask & 4:
+            cost += compiled.internal_windows_cost
+        if mask & 8:
+            cost += compiled.external_windows_cost
+        if mask & 16:
+            cost += compiled.balcony_patio_cost
+        extras[2, mask] = cost
+    extras[3, 1] = compiled.cleaning_materials_cost
+    return extras
+
+def build_price_cube(compiled):
+    """Enumerate the input space for a compiled config and return a PriceCube"""
+    grid, shape = _labor_grid(compiled)
+    prices = calculate_prices_batch(grid, compiled.config)
+    labor = np.stack([prices[field].to_numpy(dtype=np.float64) for field in LABOR_FIELDS], axis=-1)
+    return PriceCube(compiled, labor.reshape(shape + (len(LABOR_FIELDS),)), _extras_table(compiled))
+
+def _cube_path(version):
+    """Return the on-disk directory for a config version"""
+    return os.path.join(CUBE_DIR, version)
+
+def save_price_cube(cube, version):
+    """Write the cube to disk atomically so other processes can memory-map it"""
+    final_path = _cube_path(version)
+    tmp_path = f"{final_path}.tmp{os.getpid()}.{threading.get_ident()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    np.save(os.path.join(tmp_path, "labor.npy"), cube.labor)
+    np.save(os.path.join(tmp_path, "extras.npy"), cube.extras)
+    try:
+        os.rename(tmp_path, final_path)
+    except OSError:
+        # Another process finished first; its copy is identical
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+def prune_price_cubes(keep_version):
+    """Delete saved cubes (and leftover partial writes) for every config version but keep_version"""
+    if not os.path.isdir(CUBE_DIR):
+        return
+    for name in os.listdir(CUBE_DIR):
+        # Partial writes are named <version>.tmp<pid>.<thread>; one for keep_version may be in progress
+        if name.split(".tmp")[0] != keep_version:
+            # Processes that still have an old cube memory-mapped keep reading it until they drop it
+            shutil.rmtree(os.path.join(CUBE_DIR, name), ignore_errors=True)
+
+def load_price_cube(compiled, version):
+    """Memory-map a previously saved cube, or return None if there isn't one"""
+    path = _cube_path(version)
+    try:
+        labor = np.load(os.path.join(path, "labor.npy"), mmap_mode="r")
+        extras = np.load(os.path.join(path, "extras.npy"))
+    except (OSError, ValueError):
+        return None
+    return PriceCube(compiled, labor, extras)
+
+def _build_in_background(compiled, version):
+    """Build, save and publish the cube for a config version"""
+    try:
+        cube = build_price_cube(compiled)
+        save_price_cube(cube, version)
+        prune_price_cubes(version)
+        cube = load_price_cube(compiled, version) or cube
+        with _cube_lock:
+            if _cube_state["version"] == version:
+                _cube_state["cube"] = cube
+    except Exception as e:
+        print(f"Error building price cube: {str(e)}")
+    finally:
+        with _cube_lock:
+            if _cube_state["building"] == version:
+                _cube_state["building"] = None
+
+def get_price_cube():
+    """Return the cube for the current config, or None while it is being (re)built"""
+    version = get_pricing_config_version()
+    compiled = get_compiled_pricing()
+    if version is None:
+        return None
+
+    with _cube_lock:
+        if _cube_state["version"] == version:
+            return _cube_state["cube"]
+        # Config changed: drop the stale cube and look for a saved copy
+        _cube_state["version"] = version
+        _cube_state["cube"] = None
+
+    cube = load_price_cube(compiled, version)
+
+    with _cube_lock:
+        if _cube_state["version"] != version:
+            return None
+        if cube is not None:
+            _cube_state["cube"] = cube
+            return cube
+        if _cube_state["building"] != version:
+            _cube_state["building"] = version
+            threading.Thread(target=_build_in_background, args=(compiled, version), daemon=True).start()
+    return None
+
+def get_price_from_cube(quote_data):
+    """Return price_details from the cube, or None to fall back to calculate_price"""
+    if not is_price_cube_enabled():
+        return None
+    cube = get_price_cube()
+    if cube is None:
+        return None
+    return cube.lookup(quote_data)
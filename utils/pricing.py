@@ -1,13 +1,52 @@
 import os
 import json
 import math
+import hashlib
+import functools
+import threading
+from utils.money import (
+    is_pennies_mode, to_fixed, to_pennies, to_pounds, divide_half_up, FIXED_POINT_SCALE
+)
+
+# Process-wide cache of the parsed pricing config. The file is only re-read
+# when its mtime or size changes (or after invalidate_pricing_config_cache()),
+# so repeated quotes and emails don't hit the disk on every Streamlit rerun.
+# The cached dict is shared between callers and must be treated as read-only.
+_pricing_config_lock = threading.Lock()
+_pricing_config_cache = {
+    "signature": None,
+    "config": None,
+    "version": None,
+    "hits": 0,
+    "misses": 0,
+}
+
+def get_pricing_config_path():
+    """Return the path of the pricing configuration file"""
+    return os.path.join("config", "pricing_config.json")
+
+def _pricing_config_signature(config_path):
+    """Return the (mtime, size) signature of the config file, or None if missing"""
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
 
 def load_pricing_config():
-    """Load pricing configuration from JSON file"""
-    config_path = os.path.join("config", "pricing_config.json")
+    """Load pricing configuration from JSON file (cached until the file changes)"""
+    config_path = get_pricing_config_path()
+    signature = _pricing_config_signature(config_path)
+    
+    with _pricing_config_lock:
+        cache = _pricing_config_cache
+        if signature is not None and cache["signature"] == signature:
+            cache["hits"] += 1
+            return cache["config"]
+        cache["misses"] += 1
     
     # If config file doesn't exist, create it with default values
-    if not os.path.exists(config_path):
+    if signature is None:
         default_config = get_default_pricing_config()
         
         # Create config directory if it doesn't exist
@@ -18,15 +57,54 @@ def load_pricing_config():
         with open(config_path, "w") as file:
             json.dump(default_config, file, indent=4)
         
+        _store_pricing_config(_pricing_config_signature(config_path), default_config,
+                              json.dumps(default_config, sort_keys=True).encode("utf-8"))
         return default_config
     
     # Load config from file
     try:
-        with open(config_path, "r") as file:
-            return json.load(file)
+        with open(config_path, "rb") as file:
+            raw = file.read()
+        config = json.loads(raw)
     except Exception as e:
         print(f"Error loading pricing config: {str(e)}")
         return get_default_pricing_config()
+    
+    _store_pricing_config(signature, config, raw)
+    return config
+
+def _store_pricing_config(signature, config, raw):
+    """Store a freshly parsed config in the process-wide cache"""
+    with _pricing_config_lock:
+        _pricing_config_cache["signature"] = signature
+        _pricing_config_cache["config"] = config
+        _pricing_config_cache["version"] = hashlib.sha1(raw).hexdigest()[:12]
+
+def get_pricing_config_version():
+    """Return a short content hash identifying the currently loaded pricing config"""
+    load_pricing_config()
+    return _pricing_config_cache["version"]
+
+def invalidate_pricing_config_cache():
+    """Drop the cached pricing config (and memoized prices) so the next load re-reads the file"""
+    with _pricing_config_lock:
+        _pricing_config_cache["signature"] = None
+        _pricing_config_cache["config"] = None
+        _pricing_config_cache["version"] = None
+    _cached_price.cache_clear()
+
+def get_pricing_config_cache_stats():
+    """Return hit/miss counters for the pricing config cache"""
+    with _pricing_config_lock:
+        hits = _pricing_config_cache["hits"]
+        misses = _pricing_config_cache["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": (hits / total) if total else 0.0,
+        "version": _pricing_config_cache["version"],
+    }
 
 def get_default_pricing_config():
     """Return default pricing configuration"""
@@ -113,10 +191,195 @@ def get_default_pricing_config():
         }
     }
 
+# Maximum hours per working day (standard work day with breaks)
+MAX_WORK_DAY_HOURS = 7.5
+
+# Size categories used by the cleaner allocation rules
+SIZE_CATEGORY_SMALL = 0
+SIZE_CATEGORY_MEDIUM = 1
+SIZE_CATEGORY_LARGE = 2
+
+PROPERTY_SIZE_CATEGORIES = {
+    "1 Bedroom": SIZE_CATEGORY_SMALL,
+    "2 Bedroom": SIZE_CATEGORY_SMALL,
+    "3 Bedroom": SIZE_CATEGORY_MEDIUM,
+    "4 Bedroom": SIZE_CATEGORY_LARGE,
+    "5+ Bedroom": SIZE_CATEGORY_LARGE
+}
+
+class CompiledPricing:
+    """Pricing config flattened into integer codes and dense lookup tables.
+    
+    Built once per loaded config so that pricing a quote is a handful of
+    indexed loads instead of walking the nested string-keyed dictionaries.
+    """
+    
+    __slots__ = (
+        "config", "hourly_rate", "markup_percentage", "extra_costs",
+        "service_types", "service_codes", "property_sizes", "size_codes",
+        "regions", "region_codes", "cleanliness_levels", "cleanliness_codes",
+        "pet_statuses", "pet_codes", "hours", "cleaners", "size_categories",
+        "region_multipliers", "cleanliness_multipliers", "pet_multipliers",
+        "extra_bathroom_cost", "extra_reception_cost", "oven_clean_cost",
+        "carpet_cost_per_room", "internal_windows_cost", "external_windows_cost",
+        "balcony_patio_cost", "cleaning_materials_cost",
+        # Fixed-point copies used in pennies mode (see utils.money)
+        "hourly_rate_pennies", "markup_fixed", "hours_fixed", "region_multipliers_fixed",
+        "cleanliness_multipliers_fixed", "pet_multipliers_fixed",
+        "extra_bathroom_pennies", "extra_reception_pennies", "oven_clean_pennies",
+        "carpet_per_room_pennies", "internal_windows_pennies", "external_windows_pennies",
+        "balcony_patio_pennies", "cleaning_materials_pennies"
+    )
+    
+    def __init__(self, pricing_config):
+        self.config = pricing_config
+        self.hourly_rate = pricing_config["hourly_rate"]
+        self.markup_percentage = pricing_config["markup_percentage"]
+        self.extra_costs = pricing_config["extra_costs"]
+        
+        property_hours = pricing_config["property_hours"]
+        cleaners_required = pricing_config["cleaners_required"]
+        
+        # Intern the categorical values to small integer codes
+        self.service_types = tuple(property_hours.keys())
+        self.service_codes = {name: code for code, name in enumerate(self.service_types)}
+        
+        sizes = []
+        for table in (property_hours, cleaners_required):
+            for service_sizes in table.values():
+                for size in service_sizes:
+                    if size not in sizes:
+                        sizes.append(size)
+        self.property_sizes = tuple(sizes)
+        self.size_codes = {name: code for code, name in enumerate(self.property_sizes)}
+        
+        self.regions = tuple(pricing_config["region_multiplier"].keys())
+        self.region_codes = {name: code for code, name in enumerate(self.regions)}
+        self.cleanliness_levels = tuple(pricing_config["cleanliness_multiplier"].keys())
+        self.cleanliness_codes = {name: code for code, name in enumerate(self.cleanliness_levels)}
+        self.pet_statuses = tuple(pricing_config["pet_multiplier"].keys())
+        self.pet_codes = {name: code for code, name in enumerate(self.pet_statuses)}
+        
+        # Dense [service][size] tables; None marks a combination missing from the config
+        self.hours = tuple(
+            tuple(property_hours[service].get(size) for size in self.property_sizes)
+            for service in self.service_types
+        )
+        self.cleaners = tuple(
+            tuple(cleaners_required.get(service, {}).get(size) for size in self.property_sizes)
+            for service in self.service_types
+        )
+        self.size_categories = tuple(
+            PROPERTY_SIZE_CATEGORIES.get(size, SIZE_CATEGORY_MEDIUM) for size in self.property_sizes
+        )
+        
+        self.region_multipliers = tuple(pricing_config["region_multiplier"].values())
+        self.cleanliness_multipliers = tuple(pricing_config["cleanliness_multiplier"].values())
+        self.pet_multipliers = tuple(pricing_config["pet_multiplier"].values())
+        
+        extra_costs = self.extra_costs
+        self.extra_bathroom_cost = extra_costs.get("extra_bathroom")
+        self.extra_reception_cost = extra_costs.get("extra_reception_room")
+        self.oven_clean_cost = extra_costs.get("oven_clean")
+        self.carpet_cost_per_room = extra_costs.get("carpet_cleaning_per_room")
+        self.internal_windows_cost = extra_costs.get("internal_windows")
+        self.external_windows_cost = extra_costs.get("external_windows")
+        self.balcony_patio_cost = extra_costs.get("balcony_patio")
+        self.cleaning_materials_cost = extra_costs.get("cleaning_materials")
+        
+        # Money as integer pennies; hours, multipliers and markup as 1/10000ths
+        self.hourly_rate_pennies = to_pennies(self.hourly_rate)
+        self.markup_fixed = to_fixed(self.markup_percentage)
+        self.hours_fixed = tuple(tuple(to_fixed(hours) for hours in row) for row in self.hours)
+        self.region_multipliers_fixed = tuple(to_fixed(value) for value in self.region_multipliers)
+        self.cleanliness_multipliers_fixed = tuple(to_fixed(value) for value in self.cleanliness_multipliers)
+        self.pet_multipliers_fixed = tuple(to_fixed(value) for value in self.pet_multipliers)
+        self.extra_bathroom_pennies = to_pennies(self.extra_bathroom_cost)
+        self.extra_reception_pennies = to_pennies(self.extra_reception_cost)
+        self.oven_clean_pennies = to_pennies(self.oven_clean_cost)
+        self.carpet_per_room_pennies = to_pennies(self.carpet_cost_per_room)
+        self.internal_windows_pennies = to_pennies(self.internal_windows_cost)
+        self.external_windows_pennies = to_pennies(self.external_windows_cost)
+        self.balcony_patio_pennies = to_pennies(self.balcony_patio_cost)
+        self.cleaning_materials_pennies = to_pennies(self.cleaning_materials_cost)
+    
+    def base_hours(self, service_code, size_code):
+        """Return the single-cleaner hours for a service/size pair"""
+        hours = self.hours[service_code][size_code]
+        if hours is None:
+            raise KeyError(self.property_sizes[size_code])
+        return hours
+    
+    def default_cleaners(self, service_code, size_code):
+        """Return the configured default crew size for a service/size pair"""
+        cleaners = self.cleaners[service_code][size_code]
+        if cleaners is None:
+            raise KeyError(self.property_sizes[size_code])
+        return cleaners
+
+def minimum_cleaners(total_labor_hours, at_least=1):
+    """Return the smallest crew (of at least at_least) that keeps each cleaner within MAX_WORK_DAY_HOURS"""
+    cleaners = max(at_least, math.ceil(total_labor_hours / MAX_WORK_DAY_HOURS))
+    # Float rounding in the ceiling can be off by one crew member either way
+    if total_labor_hours / cleaners > MAX_WORK_DAY_HOURS:
+        cleaners += 1
+    elif cleaners > at_least and total_labor_hours / (cleaners - 1) <= MAX_WORK_DAY_HOURS:
+        cleaners -= 1
+    return cleaners
+
+def allocate_cleaners(total_labor_hours, property_size, service_type, additional_services):
+    """Return (cleaners_required, hours_per_cleaner) for a job's total labor hours"""
+    has_oven_clean = additional_services.get("oven_clean", False)
+    has_carpet_clean = additional_services.get("carpet_cleaning", False)
+    has_external_windows = additional_services.get("external_windows", False)
+    has_internal_windows = additional_services.get("internal_windows", False)
+    
+    is_large_property = PROPERTY_SIZE_CATEGORIES.get(property_size, SIZE_CATEGORY_MEDIUM) == SIZE_CATEGORY_LARGE
+    
+    # Base calculation of required cleaners to fit within a working day
+    crew_floor = math.ceil(total_labor_hours / MAX_WORK_DAY_HOURS)
+    
+    # 1. External windows always need an extra cleaner regardless of property size
+    if has_external_windows:
+        crew_floor += 1
+    
+    # 2. For oven cleaning with other services, add an extra cleaner
+    if has_oven_clean and (has_carpet_clean or has_external_windows):
+        crew_floor = max(crew_floor, 2)
+    
+    # 3. Deep cleans for large properties always need at least 2 cleaners
+    if is_large_property and service_type == "Deep Clean":
+        crew_floor = max(crew_floor, 2)
+    
+    # 4. Complex jobs with multiple additional services for larger properties need more cleaners
+    if is_large_property and (bool(has_oven_clean) + bool(has_carpet_clean) + bool(has_external_windows) + bool(has_internal_windows)) >= 2:
+        crew_floor = max(crew_floor, 2)
+    
+    # 5. Very high labor hour jobs need additional cleaners to fit within a working day
+    if total_labor_hours > 15:  # More than 2 full days for one person
+        crew_floor = max(crew_floor, 3)
+    elif total_labor_hours > 7.5:  # More than 1 full day for one person
+        crew_floor = max(crew_floor, 2)
+    
+    # Smallest crew from the floor up that keeps everyone within the working day
+    cleaners_required = minimum_cleaners(total_labor_hours, crew_floor)
+    return cleaners_required, total_labor_hours / cleaners_required
+
+_compiled_pricing_cache = {"compiled": None}
+
+def get_compiled_pricing():
+    """Return the CompiledPricing for the current config, rebuilding it when the config changes"""
+    pricing_config = load_pricing_config()
+    compiled = _compiled_pricing_cache["compiled"]
+    if compiled is None or compiled.config is not pricing_config:
+        compiled = CompiledPricing(pricing_config)
+        _compiled_pricing_cache["compiled"] = compiled
+    return compiled
+
 def calculate_price(quote_data):
     """Calculate the total price based on the quote data"""
-    # Load pricing configuration
-    pricing_config = load_pricing_config()
+    # Compiled lookup tables for the current pricing configuration
+    compiled = get_compiled_pricing()
     
     # Extract data from quote
     property_info = quote_data["property_info"]
@@ -128,112 +391,40 @@ def calculate_price(quote_data):
     service_type = service_info["service_type"]
     region = property_info["region"]
     
+    service_code = compiled.service_codes[service_type]
+    size_code = compiled.size_codes[property_size]
+    
     # Basic calculations
-    hourly_rate = pricing_config["hourly_rate"]
-    hours_required = pricing_config["property_hours"][service_type][property_size]
+    hourly_rate = compiled.hourly_rate
+    hours_required = compiled.base_hours(service_code, size_code)
     
     # Apply cleanliness multiplier if specified
-    cleanliness_level = service_info.get("cleanliness_level", "Normal")
-    cleanliness_multiplier = pricing_config["cleanliness_multiplier"].get(cleanliness_level, 1.0)
+    cleanliness_code = compiled.cleanliness_codes.get(service_info.get("cleanliness_level", "Normal"))
+    cleanliness_multiplier = 1.0 if cleanliness_code is None else compiled.cleanliness_multipliers[cleanliness_code]
     
     # Apply pet multiplier if specified
-    pet_status = service_info.get("pet_status", "No Pets")
-    pet_multiplier = pricing_config["pet_multiplier"].get(pet_status, 1.0)
+    pet_code = compiled.pet_codes.get(service_info.get("pet_status", "No Pets"))
+    pet_multiplier = 1.0 if pet_code is None else compiled.pet_multipliers[pet_code]
     
     # Adjust hours based on cleanliness and pets
-    adjusted_hours = hours_required * cleanliness_multiplier * pet_multiplier
-    hours_required = adjusted_hours
-    
-    # Get default calculated cleaners required
-    default_cleaners = pricing_config["cleaners_required"][service_type][property_size]
-    
-    # Apply customer's cleaner preference if specified
-    cleaner_preference = service_info.get("cleaner_preference", "No Preference")
+    hours_required = hours_required * cleanliness_multiplier * pet_multiplier
     
     # Total labor hours is the product of default cleaners and default hours
-    total_labor_hours = hours_required * default_cleaners
-    
-    # Maximum hours per working day (standard work day with breaks)
-    MAX_WORK_DAY_HOURS = 7.5
-    
-    # Base calculation of required cleaners to fit within a working day
-    base_recommended_cleaners = math.ceil(total_labor_hours / MAX_WORK_DAY_HOURS)
-    
-    # Additional cleaner requirements based on property size, service type and additional services
-    is_small_property = property_size in ["1 Bedroom", "2 Bedroom"]
-    is_medium_property = property_size in ["3 Bedroom"]
-    is_large_property = property_size in ["4 Bedroom", "5+ Bedroom"]
-    
-    has_oven_clean = additional_services.get("oven_clean", False)
-    has_carpet_clean = additional_services.get("carpet_cleaning", False)
-    has_external_windows = additional_services.get("external_windows", False)
-    has_internal_windows = additional_services.get("internal_windows", False)
+    total_labor_hours = hours_required * compiled.default_cleaners(service_code, size_code)
     
-    is_regular_clean = service_type == "Regular Clean"
-    is_one_off_clean = service_type == "One-Off Clean" 
-    is_deep_clean = service_type == "Deep Clean"
+    # Choose the crew so each cleaner's share fits within a working day
+    cleaners_required, hours_required = allocate_cleaners(
+        total_labor_hours, property_size, service_type, additional_services
+    )
     
-    # Start with base recommended cleaners from hours calculation
-    recommended_cleaners = base_recommended_cleaners
+    region_code = compiled.region_codes[region]
+    region_multiplier = compiled.region_multipliers[region_code]
     
-    # Apply service-specific cleaner requirements based on professional cleaning standards
-    # With a MAX_WORK_DAY_HOURS of 7.5 hours per cleaner
-    
-    # Default base logic: If job takes more than 7.5 hours for one cleaner, add more cleaners
-    # This follows the research showing two cleaners can halve the total time on-site
-    
-    # Use cleaner allocation table from professional cleaning services:
-    # Based on input data showing standard cleaning times and cleaner requirements
-    
-    property_size_mapping = {
-        "1 Bedroom": "small",
-        "2 Bedroom": "small",
-        "3 Bedroom": "medium",
-        "4 Bedroom": "large",
-        "5+ Bedroom": "large"
-    }
-    
-    property_category = property_size_mapping.get(property_size, "medium")
-    
-    # 1. External windows always need an extra cleaner regardless of property size
-    if has_external_windows:
-        recommended_cleaners += 1
-    
-    # 2. For oven cleaning with other services, add an extra cleaner
-    if has_oven_clean and (has_carpet_clean or has_external_windows):
-        recommended_cleaners = max(recommended_cleaners, 2)
-    
-    # 3. Deep cleans for large properties always need at least 2 cleaners
-    if is_deep_clean and property_category == "large":
-        recommended_cleaners = max(recommended_cleaners, 2)
-    
-    # 4. Complex jobs with multiple additional services for larger properties need more cleaners
-    if property_category == "large" and sum([has_oven_clean, has_carpet_clean, has_external_windows, has_internal_windows]) >= 2:
-        recommended_cleaners = max(recommended_cleaners, 2)
-        
-    # 5. Very high labor hour jobs need additional cleaners to fit within a working day
-    # Based on 7.5 hour maximum day:
-    if total_labor_hours > 15:  # More than 2 full days for one person
-        recommended_cleaners = max(recommended_cleaners, 3)
-    elif total_labor_hours > 7.5:  # More than 1 full day for one person
-        recommended_cleaners = max(recommended_cleaners, 2)
-    
-    # Use the system-recommended number of cleaners
-    # We've removed the cleaner preference option as requested
-    cleaners_required = recommended_cleaners
-    
-    # Adjust hours to maintain total labor hours
-    # When multiple cleaners are assigned, divide the total hours among them
-    hours_required = total_labor_hours / cleaners_required
-    
-    # Ensure total hours per cleaner doesn't exceed max workday
-    if hours_required > MAX_WORK_DAY_HOURS:
-        # If it still exceeds max hours, add more cleaners until it fits
-        while hours_required > MAX_WORK_DAY_HOURS:
-            cleaners_required += 1
-            hours_required = total_labor_hours / cleaners_required
-    
-    region_multiplier = pricing_config["region_multiplier"][region]
+    if is_pennies_mode():
+        return _calculate_price_pennies(
+            compiled, quote_data, service_code, size_code, region_code,
+            cleanliness_code, pet_code, cleaners_required, hours_required
+        )
     
     # Calculate base price
     base_price = hourly_rate * hours_required * cleaners_required * region_multiplier
@@ -242,42 +433,42 @@ def calculate_price(quote_data):
     extra_bathrooms = property_info["num_bathrooms"] - 1
     extra_bathrooms_cost = 0
     if extra_bathrooms > 0:
-        extra_bathrooms_cost = extra_bathrooms * pricing_config["extra_costs"]["extra_bathroom"]
+        extra_bathrooms_cost = extra_bathrooms * compiled.extra_bathroom_cost
     
     # Extra costs for additional reception rooms (if more than 1)
     extra_reception_rooms = property_info["num_reception_rooms"] - 1
     extra_reception_cost = 0
     if extra_reception_rooms > 0:
-        extra_reception_cost = extra_reception_rooms * pricing_config["extra_costs"]["extra_reception_room"]
+        extra_reception_cost = extra_reception_rooms * compiled.extra_reception_cost
     
     # Costs for additional services
     additional_services_cost = 0
     
     if additional_services["oven_clean"]:
-        additional_services_cost += pricing_config["extra_costs"]["oven_clean"]
+        additional_services_cost += compiled.oven_clean_cost
     
     if additional_services["carpet_cleaning"]:
-        additional_services_cost += pricing_config["extra_costs"]["carpet_cleaning_per_room"] * additional_services["carpet_rooms"]
+        additional_services_cost += compiled.carpet_cost_per_room * additional_services["carpet_rooms"]
     
     if additional_services["internal_windows"]:
-        additional_services_cost += pricing_config["extra_costs"]["internal_windows"]
+        additional_services_cost += compiled.internal_windows_cost
     
     if additional_services["external_windows"]:
-        additional_services_cost += pricing_config["extra_costs"]["external_windows"]
+        additional_services_cost += compiled.external_windows_cost
     
     if additional_services["balcony_patio"]:
-        additional_services_cost += pricing_config["extra_costs"]["balcony_patio"]
+        additional_services_cost += compiled.balcony_patio_cost
     
     # Costs for cleaning materials
     materials_cost = 0
     if service_info["cleaning_materials"]:
-        materials_cost = pricing_config["extra_costs"]["cleaning_materials"]
+        materials_cost = compiled.cleaning_materials_cost
     
     # Calculate subtotal
     subtotal = base_price + extra_bathrooms_cost + extra_reception_cost + additional_services_cost + materials_cost
     
     # Apply markup
-    markup_percentage = pricing_config["markup_percentage"]
+    markup_percentage = compiled.markup_percentage
     markup = subtotal * (markup_percentage / 100)
     total_price = subtotal + markup
     
@@ -296,5 +487,142 @@ def calculate_price(quote_data):
         "markup_percentage": markup_percentage,
         "markup": markup,
         "total_price": total_price,
-        "extra_costs": pricing_config["extra_costs"]
-    }
\ No newline at end of file
+        "extra_costs": compiled.extra_costs
+    }
+
+def _calculate_price_pennies(compiled, quote_data, service_code, size_code, region_code,
+                             cleanliness_code, pet_code, cleaners_required, hours_required):
+    """Money part of calculate_price in integer pennies (crew and hours are worked out as usual)"""
+    property_info = quote_data["property_info"]
+    service_info = quote_data["service_info"]
+    additional_services = service_info["additional_services"]
+    
+    # Total labor in 1/10000 hours, rounded once
+    cleanliness_fixed = FIXED_POINT_SCALE if cleanliness_code is None else compiled.cleanliness_multipliers_fixed[cleanliness_code]
+    pet_fixed = FIXED_POINT_SCALE if pet_code is None else compiled.pet_multipliers_fixed[pet_code]
+    labor_fixed = divide_half_up(
+        compiled.hours_fixed[service_code][size_code] * int(compiled.default_cleaners(service_code, size_code))
+        * cleanliness_fixed * pet_fixed,
+        FIXED_POINT_SCALE * FIXED_POINT_SCALE
+    )
+    
+    # Base price is rate x total labor x region, whatever the crew split
+    base_price = divide_half_up(
+        compiled.hourly_rate_pennies * labor_fixed * compiled.region_multipliers_fixed[region_code],
+        FIXED_POINT_SCALE * FIXED_POINT_SCALE
+    )
+    
+    extra_bathrooms = property_info["num_bathrooms"] - 1
+    extra_bathrooms_cost = extra_bathrooms * compiled.extra_bathroom_pennies if extra_bathrooms > 0 else 0
+    extra_reception_rooms = property_info["num_reception_rooms"] - 1
+    extra_reception_cost = extra_reception_rooms * compiled.extra_reception_pennies if extra_reception_rooms > 0 else 0
+    
+    additional_services_cost = 0
+    if additional_services["oven_clean"]:
+        additional_services_cost += compiled.oven_clean_pennies
+    if additional_services["carpet_cleaning"]:
+        additional_services_cost += compiled.carpet_per_room_pennies * additional_services["carpet_rooms"]
+    if additional_services["internal_windows"]:
+        additional_services_cost += compiled.internal_windows_pennies
+    if additional_services["external_windows"]:
+        additional_services_cost += compiled.external_windows_pennies
+    if additional_services["balcony_patio"]:
+        additional_services_cost += compiled.balcony_patio_pennies
+    
+    materials_cost = compiled.cleaning_materials_pennies if service_info["cleaning_materials"] else 0
+    
+    subtotal = base_price + extra_bathrooms_cost + extra_reception_cost + additional_services_cost + materials_cost
+    markup = divide_half_up(subtotal * compiled.markup_fixed, 100 * FIXED_POINT_SCALE)
+    
+    return {
+        "hourly_rate": compiled.hourly_rate,
+        "hours_required": hours_required,
+        "cleaners_required": cleaners_required,
+        "region_multiplier": compiled.region_multipliers[region_code],
+        "base_price": to_pounds(base_price),
+        "extra_bathrooms_cost": to_pounds(extra_bathrooms_cost),
+        "extra_reception_cost": to_pounds(extra_reception_cost),
+        "additional_services_cost": to_pounds(additional_services_cost),
+        "materials_cost": to_pounds(materials_cost),
+        "subtotal": to_pounds(subtotal),
+        "markup_percentage": compiled.markup_percentage,
+        "markup": to_pounds(markup),
+        "total_price": to_pounds(subtotal + markup),
+        "extra_costs": compiled.extra_costs
+    }
+
+# Maximum number of distinct quotes kept by calculate_price_cached
+PRICE_CACHE_SIZE = int(os.getenv("PRICE_CACHE_SIZE", "4096"))
+
+def quote_price_signature(quote_data):
+    """Return a hashable signature of the fields that affect a quote's price (no customer details)"""
+    property_info = quote_data["property_info"]
+    service_info = quote_data["service_info"]
+    additional_services = service_info["additional_services"]
+    return (
+        service_info["service_type"],
+        property_info["property_size"],
+        property_info["region"],
+        int(property_info["num_bathrooms"]),
+        int(property_info["num_reception_rooms"]),
+        service_info.get("cleanliness_level", "Normal"),
+        service_info.get("pet_status", "No Pets"),
+        bool(additional_services["oven_clean"]),
+        bool(additional_services["carpet_cleaning"]),
+        int(additional_services["carpet_rooms"]),
+        bool(additional_services["internal_windows"]),
+        bool(additional_services["external_windows"]),
+        bool(additional_services["balcony_patio"]),
+        bool(service_info["cleaning_materials"])
+    )
+
+def _quote_from_signature(signature):
+    """Rebuild the minimal quote_data calculate_price needs from a signature"""
+    (service_type, property_size, region, num_bathrooms, num_reception_rooms,
+     cleanliness_level, pet_status, oven_clean, carpet_cleaning, carpet_rooms,
+     internal_windows, external_windows, balcony_patio, cleaning_materials) = signature
+    return {
+        "property_info": {
+            "region": region,
+            "property_size": property_size,
+            "num_bathrooms": num_bathrooms,
+            "num_reception_rooms": num_reception_rooms
+        },
+        "service_info": {
+            "service_type": service_type,
+            "cleanliness_level": cleanliness_level,
+            "pet_status": pet_status,
+            "cleaning_materials": cleaning_materials,
+            "additional_services": {
+                "oven_clean": oven_clean,
+                "carpet_cleaning": carpet_cleaning,
+                "carpet_rooms": carpet_rooms,
+                "internal_windows": internal_windows,
+                "external_windows": external_windows,
+                "balcony_patio": balcony_patio
+            }
+        }
+    }
+
+@functools.lru_cache(maxsize=PRICE_CACHE_SIZE)
+def _cached_price(signature, config_version):
+    """Price a signature; config_version is part of the key so config edits never serve stale prices"""
+    return calculate_price(_quote_from_signature(signature))
+
+def calculate_price_cached(quote_data):
+    """Memoized calculate_price for identical quotes under the same pricing config"""
+    price_details = _cached_price(quote_price_signature(quote_data), get_pricing_config_version())
+    # Callers adjust the returned details (admin discounts etc.), so hand out a copy
+    return dict(price_details)
+
+def get_price_cache_stats():
+    """Return hit/miss counters and occupancy for calculate_price_cached"""
+    info = _cached_price.cache_info()
+    total = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": (info.hits / total) if total else 0.0,
+        "size": info.currsize,
+        "max_size": info.maxsize
+    }
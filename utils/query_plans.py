@@ -0,0 +1,137 @@
+"""
+Query plan diagnostics
+
+Runs EXPLAIN (EXPLAIN QUERY PLAN on SQLite) for every query the app sends
+to the quotes and rollup tables and flags the ones that read the whole
+quotes table. The statements are built by the same functions in
+utils.database and utils.analytics that the app calls, and compiled for
+the connected database with sample values inlined, so the check follows
+the queries as they change.
+
+Plans depend on table statistics: on a small or freshly loaded Postgres
+table the planner may prefer a sequential scan, so run this against a
+database of realistic size (after ANALYZE).
+"""
+
+import datetime
+from utils import analytics
+from utils.database import (
+    _quote_by_id_query,
+    _rollup_query,
+    count_quotes_query,
+    empty_rollup_row_query,
+    filter_options_query,
+    get_db_connection,
+    quote_contribution_query,
+    quotes_query,
+    rollup_delta_query,
+    rollup_refresh_query,
+    update_quote_query,
+    upsert_quote_query
+)
+
+# Sample values the statements are compiled with
+SAMPLE_QUOTE_ID = "Q1700000000"
+SAMPLE_REGION = "Bedfordshire"
+SAMPLE_SERVICE_TYPE = "Deep Clean"
+SAMPLE_START = datetime.date(2025, 1, 1)
+SAMPLE_END = datetime.date(2025, 2, 1)
+SAMPLE_CURSOR = (datetime.datetime(2025, 1, 1, 12, 0), 1000)
+SAMPLE_ROLLUP_KEY = (SAMPLE_START, SAMPLE_REGION, SAMPLE_SERVICE_TYPE, "Quoted")
+
+def app_queries(dialect_name):
+    """Return (name, statement, whole-table read expected) for every query the app sends"""
+    dashboard_all = analytics.dashboard_filters()
+    dashboard_filtered = analytics.dashboard_filters(SAMPLE_START, SAMPLE_END, region=SAMPLE_REGION)
+    queries = [
+        # Quotes page and exports
+        ("get_quotes_from_db: all quotes, newest first (exports, backups)", quotes_query(), True),
+        ("quotes page: first page", quotes_query(limit=50), False),
+        ("quotes page: next page by status (keyset)",
+         quotes_query(filters={"status": ["Scheduled"]}, cursor=SAMPLE_CURSOR, limit=50), False),
+        ("quotes page: by region and service type",
+         quotes_query(filters={"region": [SAMPLE_REGION], "service_type": [SAMPLE_SERVICE_TYPE]}, limit=50), False),
+        ("quotes page: created in a date range",
+         quotes_query(start_date=SAMPLE_START, end_date=SAMPLE_END, limit=50), False),
+        ("quotes page: quote ID search", quotes_query(search="1700", limit=50), False),
+        ("quotes page: total (rollup)", count_quotes_query(), False),
+        ("quotes page: total by status and date range (rollup)",
+         count_quotes_query(filters={"status": ["Scheduled"]}, start_date=SAMPLE_START, end_date=SAMPLE_END), False),
+        # A substring match can't use an index
+        ("quotes page: total for a quote ID search", count_quotes_query(search="1700"), True),
+        ("filter options (rollup)", filter_options_query(), False),
+        ("quotes for a customer", quotes_query(filters={"customer_email": "customer@example.com"}), False),
+        ("jobs on a cleaning date", quotes_query(filters={"cleaning_date": "2025-06-01"}), False),
+        ("get_quote_by_id", _quote_by_id_query.params(quote_id=SAMPLE_QUOTE_ID), False),
+        # Quote writes and the rollup deltas they apply
+        ("quote write: old rollup contribution", quote_contribution_query(SAMPLE_QUOTE_ID), False),
+        ("update_quote_status", update_quote_query(SAMPLE_QUOTE_ID, status="Quoted"), False),
+        ("update_sent_to_customer", update_quote_query(SAMPLE_QUOTE_ID, sent_to_customer=True), False),
+        ("rollup: remove an emptied row", empty_rollup_row_query(SAMPLE_ROLLUP_KEY), False),
+        ("rollup: refresh one row from quotes", rollup_refresh_query(SAMPLE_ROLLUP_KEY), False),
+        ("rollup: rebuild", _rollup_query(), True),
+        # Dashboard
+        ("dashboard: date range", analytics.quote_date_range_query(), False),
+        ("dashboard: summary metrics", analytics.summary_metrics_query(dashboard_all), False),
+        ("dashboard: summary metrics for a region and dates", analytics.summary_metrics_query(dashboard_filtered), False),
+        ("dashboard: daily revenue", analytics.daily_revenue_query(dashboard_filtered), False),
+        ("dashboard: breakdown by service type", analytics.breakdown_query("service_type", dashboard_filtered), False),
+        ("dashboard: add-on counts", analytics.addon_counts_query(dashboard_filtered), False),
+        ("dashboard: referral sources in a date range",
+         analytics.breakdown_query("referral_source", dashboard_filtered), False),
+        ("dashboard: referral sources, all time", analytics.breakdown_query("referral_source", dashboard_all), True),
+        ("dashboard: other referrals in a date range", analytics.other_referrals_query(dashboard_filtered), False),
+    ]
+    # Upserts use each database's INSERT ... ON CONFLICT
+    upsert = upsert_quote_query(dialect_name, {"quote_id": SAMPLE_QUOTE_ID, "status": "Quoted"})
+    if upsert is not None:
+        queries.append(("save_quote_to_db: upsert", upsert, False))
+    deltas = rollup_delta_query(dialect_name, {SAMPLE_ROLLUP_KEY: {"quote_count": 1, "revenue_pennies": 10000}})
+    if deltas is not None:
+        queries.append(("quote write: rollup deltas", deltas, False))
+    return queries
+
+def compile_sql(connection, statement):
+    """Render a statement as (SQL, driver parameters) for the connection's database
+
+    Values are inlined; the only parameters left are the ones SQLAlchemy
+    won't inline (those in a RETURNING clause).
+    """
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    params = compiled.construct_params()
+    if compiled.positiontup is not None:
+        return str(compiled), tuple(params[name] for name in compiled.positiontup)
+    return str(compiled), params
+
+def explain(connection, sql, params=()):
+    """Return the plan for a query as a list of text lines"""
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [row[-1] for row in rows]
+    rows = connection.exec_driver_sql(f"EXPLAIN {sql}", params).fetchall()
+    return [row[0] for row in rows]
+
+def is_full_scan(plan_lines):
+    """Return True if a plan reads the whole quotes table (or all of one of its indexes)"""
+    for line in plan_lines:
+        stripped = line.strip()
+        # Postgres: "Seq Scan on quotes"; SQLite: "SCAN quotes", or "SCAN quotes USING
+        # COVERING INDEX ..." which reads every index entry (vs "SCAN quotes USING INDEX ..."
+        # walked in order until a LIMIT is met, or "SEARCH quotes ...")
+        if "Seq Scan on quotes" in stripped:
+            return True
+        if stripped.startswith("SCAN quotes") and ("USING" not in stripped or "COVERING INDEX" in stripped):
+            return True
+    return False
+
+def check_query_plans(engine=None):
+    """Explain every app_queries entry; return a list of (name, plan_lines, full_scan, expected)"""
+    engine = engine or get_db_connection()
+    results = []
+    with engine.connect() as connection:
+        for name, statement, full_scan_expected in app_queries(connection.dialect.name):
+            plan_lines = explain(connection, *compile_sql(connection, statement))
+            results.append((name, plan_lines, is_full_scan(plan_lines), full_scan_expected))
+        # EXPLAIN never executes, but don't leave anything open either way
+        connection.rollback()
+    return results
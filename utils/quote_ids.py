@@ -0,0 +1,125 @@
+"""
+Quote ID generation
+
+IDs are "Q" followed by 21 digits:
+    seconds since the epoch (10) + milliseconds (3) + sequence (4) + node (4)
+e.g. Q176000000012300042051. The sequence counts IDs minted by this
+process within the millisecond and the node is claimed by each process,
+so sessions, batch imports and other processes creating quotes in the
+same second no longer collide. IDs sort as strings in creation order
+(within a process strictly, across processes to the millisecond), after
+the older Q<seconds> IDs.
+
+A process claims its node by holding an exclusive lock on
+data/quote_id_nodes/<node>.lock (QUOTE_ID_NODE_DIR) until it exits, so no
+two running processes that share the data directory have the same node.
+A node is only reused once its holder has exited, by which time the
+clock has moved past every ID the holder minted; a holder that has run
+ahead of the clock (bulk imports) records where it got to in the lock
+file, and the next holder starts from there. Where the lock can't be
+taken (no fcntl, or the directory isn't writable) the node is drawn at
+random instead.
+
+If more than 10,000 IDs are needed in one millisecond the sequence
+carries on into the next millisecond, as it does if the clock steps
+back, so a process never repeats or reorders an ID.
+"""
+
+import os
+import time
+import threading
+from utils.file_lock import try_hold_lock
+
+SEQUENCE_LIMIT = 10 ** 4
+NODE_LIMIT = 10 ** 4
+
+QUOTE_ID_NODE_DIR = os.getenv("QUOTE_ID_NODE_DIR", os.path.join("data", "quote_id_nodes"))
+
+def _random_node():
+    return int.from_bytes(os.urandom(4), "big") % NODE_LIMIT
+
+def _claim_node():
+    """Return (node, lock descriptor) for a node no other running process holds, or (random node, None)"""
+    start = _random_node()
+    try:
+        os.makedirs(QUOTE_ID_NODE_DIR, exist_ok=True)
+        # Starting at a random node keeps the search short when many processes start together
+        for step in range(NODE_LIMIT):
+            node = (start + step) % NODE_LIMIT
+            descriptor = try_hold_lock(os.path.join(QUOTE_ID_NODE_DIR, f"{node:04d}.lock"))
+            if descriptor is not None:
+                return node, descriptor
+        print("Every quote ID node is in use; using a random node")
+    except OSError as e:
+        print(f"Could not claim a quote ID node ({str(e)}); using a random node")
+    return start, None
+
+# Lock files hold the first millisecond free for the node's next holder, when a holder has run ahead of the clock
+_HIGH_WATER_WIDTH = 20
+
+def _read_high_water(descriptor):
+    value = os.pread(descriptor, _HIGH_WATER_WIDTH, 0).strip()
+    return int(value) if value.isdigit() else 0
+
+def _write_high_water(descriptor, millisecond):
+    os.pwrite(descriptor, f"{millisecond:0{_HIGH_WATER_WIDTH}d}".encode("ascii"), 0)
+
+_id_lock = threading.Lock()
+# The node is claimed when the first ID is minted, not at import
+_id_state = {"node": None, "node_lock": None, "millisecond": 0, "sequence": 0}
+
+def _reset_after_fork():
+    """Give a forked child its own node (and a lock no other thread can be holding)"""
+    global _id_lock
+    _id_lock = threading.Lock()
+    if _id_state["node_lock"] is not None:
+        # The parent's descriptor still holds its node; the child's copy isn't needed
+        os.close(_id_state["node_lock"])
+    _id_state.update(node=None, node_lock=None, millisecond=0, sequence=0)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _reserve(count):
+    """Reserve count IDs; return them as runs of (millisecond, first sequence, length)"""
+    runs = []
+    with _id_lock:
+        if _id_state["node"] is None:
+            _id_state["node"], _id_state["node_lock"] = _claim_node()
+            if _id_state["node_lock"] is not None:
+                _id_state["millisecond"] = _read_high_water(_id_state["node_lock"])
+        now = time.time_ns() // 1_000_000
+        if now > _id_state["millisecond"]:
+            _id_state["millisecond"] = now
+            _id_state["sequence"] = 0
+        while count:
+            if _id_state["sequence"] >= SEQUENCE_LIMIT:
+                _id_state["millisecond"] += 1
+                _id_state["sequence"] = 0
+            length = min(count, SEQUENCE_LIMIT - _id_state["sequence"])
+            runs.append((_id_state["millisecond"], _id_state["sequence"], length))
+            _id_state["sequence"] += length
+            count -= length
+        if _id_state["millisecond"] > now and _id_state["node_lock"] is not None:
+            _write_high_water(_id_state["node_lock"], _id_state["millisecond"] + 1)
+        node = _id_state["node"]
+    return runs, node
+
+def _prefix(millisecond):
+    seconds, milliseconds = divmod(millisecond, 1000)
+    return f"Q{seconds:010d}{milliseconds:03d}"
+
+def generate_quote_id():
+    """Generate a unique, time-ordered quote ID"""
+    [(millisecond, sequence, _)], node = _reserve(1)
+    return f"{_prefix(millisecond)}{sequence:04d}{node:04d}"
+
+def generate_quote_ids(count):
+    """Generate count unique quote IDs in ascending order (for bulk imports)"""
+    runs, node = _reserve(count)
+    suffix = f"{node:04d}"
+    quote_ids = []
+    for millisecond, first, length in runs:
+        prefix = _prefix(millisecond)
+        quote_ids.extend([f"{prefix}{sequence:04d}{suffix}" for sequence in range(first, first + length)])
+    return quote_ids
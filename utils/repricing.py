@@ -0,0 +1,154 @@
+"""
+What-if repricing
+
+Streams the quotes table through the batch pricer twice (current config
+and a candidate config) and summarises what would change: revenue, crew
+sizes and the spread of price changes by region and service type.
+
+Both sides are priced from each quote's inputs, so the comparison shows
+the effect of the config change alone rather than admin overrides or
+discounts stored against individual quotes.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from utils.pricing import CompiledPricing, get_compiled_pricing
+from utils.batch_pricing import calculate_prices_batch
+
+# Rows fetched from the database per chunk
+REPRICING_CHUNK_SIZE = int(os.getenv("REPRICING_CHUNK_SIZE", "100000"))
+
+# Columns calculate_prices_batch needs, plus the segment keys
+PRICING_INPUT_COLUMNS = [
+    "region", "property_size", "service_type", "cleanliness_level", "pet_status",
+    "num_bathrooms", "num_reception_rooms",
+    "oven_clean", "carpet_cleaning", "carpet_rooms", "internal_windows",
+    "external_windows", "balcony_patio", "cleaning_materials"
+]
+
+SEGMENT_COLUMNS = ["region", "service_type"]
+
+# Percentage price change buckets for the distribution table
+PRICE_CHANGE_BINS = [-np.inf, -20, -10, -5, -0.005, 0.005, 5, 10, 20, np.inf]
+PRICE_CHANGE_LABELS = [
+    "Down > 20%", "Down 10-20%", "Down 5-10%", "Down < 5%", "No change",
+    "Up < 5%", "Up 5-10%", "Up 10-20%", "Up > 20%"
+]
+
+def _priceable(chunk, compiled):
+    """Return a boolean mask of rows the compiled config can price"""
+    mask = np.array(chunk["service_type"].isin(compiled.service_types)
+                    & chunk["property_size"].isin(compiled.property_sizes)
+                    & chunk["region"].isin(compiled.regions))
+    if mask.any():
+        service_codes = chunk["service_type"].map(compiled.service_codes).fillna(0).to_numpy(dtype=np.int64)
+        size_codes = chunk["property_size"].map(compiled.size_codes).fillna(0).to_numpy(dtype=np.int64)
+        # calculate_prices_batch needs both the hours and the crew size for a service/size
+        configured = np.array([
+            [hours is not None and cleaners is not None for hours, cleaners in zip(hours_row, cleaners_row)]
+            for hours_row, cleaners_row in zip(compiled.hours, compiled.cleaners)
+        ])
+        mask &= configured[service_codes, size_codes]
+    return mask
+
+def summarize_repricing(chunks, candidate_config, current_config=None):
+    """Compare current and candidate prices over an iterable of quote DataFrames.
+
+    Returns a dict with the quote count, revenue under each config, the
+    revenue delta, crew size changes, a per region/service breakdown and
+    a distribution of percentage price changes.
+    """
+    current = get_compiled_pricing() if current_config is None else CompiledPricing(current_config)
+    candidate = CompiledPricing(candidate_config)
+
+    num_quotes = 0
+    num_unpriced = 0
+    crew_increases = 0
+    crew_decreases = 0
+    distribution = np.zeros(len(PRICE_CHANGE_LABELS), dtype=np.int64)
+    segments = []
+
+    for chunk in chunks:
+        mask = _priceable(chunk, current) & _priceable(chunk, candidate)
+        num_unpriced += int((~mask).sum())
+        chunk = chunk[mask]
+        if chunk.empty:
+            continue
+
+        before = calculate_prices_batch(chunk, current.config)
+        after = calculate_prices_batch(chunk, candidate.config)
+        num_quotes += len(chunk)
+
+        crew_change = after["cleaners_required"].to_numpy() - before["cleaners_required"].to_numpy()
+        crew_increases += int((crew_change > 0).sum())
+        crew_decreases += int((crew_change < 0).sum())
+
+        change_pct = np.where(before["total_price"] > 0,
+                              (after["total_price"] - before["total_price"]) / before["total_price"] * 100, 0.0)
+        distribution += np.histogram(change_pct, bins=PRICE_CHANGE_BINS)[0]
+
+        frame = chunk[SEGMENT_COLUMNS].assign(
+            current_revenue=before["total_price"],
+            candidate_revenue=after["total_price"],
+            crew_changes=crew_change != 0,
+            min_change_pct=change_pct,
+            max_change_pct=change_pct
+        )
+        segments.append(frame.groupby(SEGMENT_COLUMNS).agg(
+            quotes=("current_revenue", "size"),
+            current_revenue=("current_revenue", "sum"),
+            candidate_revenue=("candidate_revenue", "sum"),
+            crew_changes=("crew_changes", "sum"),
+            min_change_pct=("min_change_pct", "min"),
+            max_change_pct=("max_change_pct", "max")
+        ))
+
+    if segments:
+        # Combine the per-chunk partial aggregates
+        by_segment = pd.concat(segments).groupby(level=SEGMENT_COLUMNS).agg({
+            "quotes": "sum",
+            "current_revenue": "sum",
+            "candidate_revenue": "sum",
+            "crew_changes": "sum",
+            "min_change_pct": "min",
+            "max_change_pct": "max"
+        }).reset_index()
+    else:
+        by_segment = pd.DataFrame(columns=SEGMENT_COLUMNS + [
+            "quotes", "current_revenue", "candidate_revenue", "crew_changes", "min_change_pct", "max_change_pct"
+        ])
+    by_segment["revenue_delta"] = by_segment["candidate_revenue"] - by_segment["current_revenue"]
+
+    current_revenue = float(by_segment["current_revenue"].sum())
+    candidate_revenue = float(by_segment["candidate_revenue"].sum())
+    revenue_delta = candidate_revenue - current_revenue
+
+    return {
+        "quotes": num_quotes,
+        "unpriced_quotes": num_unpriced,
+        "current_revenue": current_revenue,
+        "candidate_revenue": candidate_revenue,
+        "revenue_delta": revenue_delta,
+        "revenue_delta_pct": revenue_delta / current_revenue * 100 if current_revenue else 0.0,
+        "crew_changes": crew_increases + crew_decreases,
+        "crew_increases": crew_increases,
+        "crew_decreases": crew_decreases,
+        "by_segment": by_segment,
+        "price_change_distribution": pd.DataFrame({
+            "change": PRICE_CHANGE_LABELS,
+            "quotes": distribution
+        })
+    }
+
+def simulate_repricing(candidate_config, chunksize=REPRICING_CHUNK_SIZE):
+    """Reprice every stored quote against candidate_config and summarise the impact"""
+    from utils.database import get_db_connection
+
+    engine = get_db_connection()
+    query = f"SELECT {', '.join(PRICING_INPUT_COLUMNS)} FROM quotes"
+
+    # stream_results keeps Postgres from buffering the whole table client-side
+    with engine.connect().execution_options(stream_results=True) as connection:
+        chunks = pd.read_sql(query, connection, chunksize=chunksize)
+        return summarize_repricing(chunks, candidate_config)